@@ -1,7 +1,7 @@
 from django.contrib import admin
 
 from account.models import Account, AlertRecipient, Organization
-from caracal.common.models import RealTimeAccount, RealTimeIndividual, RealTimePosition, RealTimePositionHash
+from caracal.common.models import RealTimeAccount, RealTimeIndividual, RealTimePosition, RealTimePositionHash, RealTimePositionRollup
 
 
 @admin.register(Account)
@@ -64,6 +64,15 @@ class RealTimePositionAdmin(admin.ModelAdmin):
                        'datetime_recorded', 'temp_c']
 
 
+@admin.register(RealTimePositionRollup)
+class RealTimePositionRollupAdmin(admin.ModelAdmin):
+    list_display = ['datetime_start', 'period', 'individual', 'num_positions', 'distance_km']
+    search_fields = ['individual__device_id']
+    list_filter = ['period']
+    ordering = ['-datetime_start']
+    readonly_fields = ['datetime_updated']
+
+
 @admin.register(RealTimePositionHash)
 class RealTimePositionHashAdmin(admin.ModelAdmin):
     list_display = ['hash', 'datetime_created', 'account', 'individual']
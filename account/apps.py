@@ -1,5 +1,16 @@
 from django.apps import AppConfig
+from django.db.models.signals import post_delete, post_save
 
 
 class AccountConfig(AppConfig):
     name = 'account'
+
+    def ready(self):
+        from account.models import Account, Organization
+        from auth.principals import principals
+
+        # logout, custom_access_jwt_id rotation and subscription changes all save one of these
+        post_save.connect(principals.invalidate_account_instance, sender=Account)
+        post_delete.connect(principals.invalidate_account_instance, sender=Account)
+        post_save.connect(principals.invalidate_organization_instance, sender=Organization)
+        post_delete.connect(principals.invalidate_organization_instance, sender=Organization)
@@ -0,0 +1,79 @@
+from datetime import timedelta
+from django.core.management.base import BaseCommand
+from django.db import connection, transaction
+
+from caracal.common.models import get_utc_datetime_now, RealTimePosition, RealTimePositionHash
+from custom_source.models import Record
+from jackal.models import Call, Contact, Location, Log, Text
+
+
+PLAN_SETTINGS = ['enable_indexscan', 'enable_indexonlyscan', 'enable_bitmapscan']
+VARIANTS = [('without indexes', 'off'), ('with indexes', 'on')]
+
+
+class Command(BaseCommand):
+    help = 'Prints the query plans of the hot position and recording queries without and with index scans.'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--hours', type=int, default=24, help='Time window of the position queries.')
+
+    def handle(self, *args, **options):
+
+        queries = _get_queries(options['hours'])
+        if not queries:
+            print('No data to explain')
+            return
+
+        # the first round warms the cache for both variants and the second runs them in the opposite order,
+        # so only the second round is printed
+        plans = dict()
+        for variants in [VARIANTS, VARIANTS[::-1]]:
+            for title, enabled in variants:
+                plans[title] = _explain(queries, enabled)
+
+        for title, _ in VARIANTS:
+            _print_plans(title, plans[title])
+
+
+def _get_queries(hours):
+
+    then = get_utc_datetime_now() - timedelta(hours=hours)
+    queries = dict()
+
+    position = RealTimePosition.objects.order_by().last()
+    if position is not None:
+        queries['individual positions'] = position.individual.rt_positions\
+            .filter(datetime_recorded__gte=then).order_by('datetime_recorded')
+        queries['account position count'] = RealTimePositionHash.objects\
+            .filter(account=position.account, datetime_recorded__gte=then).values('pk')
+
+    record = Record.objects.order_by().last()
+    if record is not None:
+        queries['device records'] = record.device.records\
+            .filter(datetime_recorded__gte=then).order_by('datetime_recorded')
+
+    location = Location.objects.order_by().last()
+    if location is not None:
+        phone = location.phone
+        for model in [Call, Contact, Location, Log, Text]:
+            queries[f'phone {model.__name__.lower()}s'] = model.objects.filter(phone=phone)\
+                .order_by('-datetime_recorded')[:50]
+
+    return queries
+
+
+def _explain(queries, enabled):
+    # index scans are switched off for this transaction only, dropping the indexes would lock the tables
+    with transaction.atomic():
+        with connection.cursor() as cursor:
+            for setting in PLAN_SETTINGS:
+                cursor.execute(f'SET LOCAL {setting} = {enabled}')
+
+        return {name: queryset.explain(analyze=True, buffers=True) for name, queryset in queries.items()}
+
+
+def _print_plans(title, plans):
+    print(f'===== {title} =====')
+    for name, plan in plans.items():
+        print(f'--- {name}')
+        print(plan)
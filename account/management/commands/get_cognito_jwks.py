@@ -3,7 +3,8 @@ from django.conf import settings
 from django.core.management.base import BaseCommand
 import json
 import os
-import requests
+
+from caracal.common import http
 
 
 class Command(BaseCommand):
@@ -20,7 +21,7 @@ class Command(BaseCommand):
             try:
                 jwks_url = "https://cognito-idp.%s.amazonaws.com/%s/.well-known/jwks.json" % \
                            (settings.AWS_REGION, os.environ[pool_id_envar])
-                res = requests.get(jwks_url)
+                res = http.get(jwks_url)
                 res = res.json()
 
                 for jwk in res.get('keys', list()):
@@ -0,0 +1,29 @@
+from django.conf import settings
+from django.core.management.base import BaseCommand
+
+from caracal.common import partitions
+from caracal.common.models import get_utc_datetime_now
+
+
+class Command(BaseCommand):
+    help = 'Creates future monthly position partitions and detaches partitions older than the retention period.'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--months-ahead', type=int, default=settings.PARTITION_MONTHS_AHEAD)
+        parser.add_argument('--retention-months', type=int, default=settings.PARTITION_RETENTION_MONTHS,
+                            help='Detach partitions older than this many months, omit to keep all.')
+        parser.add_argument('--drop', action='store_true', help='Drop detached partitions rather than keeping them for archiving.')
+
+    def handle(self, *args, **options):
+
+        this_month = partitions.get_month_start(get_utc_datetime_now())
+        end_month = partitions.add_months(this_month, options['months_ahead'])
+
+        for table in partitions.PARTITIONED_TABLES:
+            for name in partitions.create_partitions(table, this_month, end_month):
+                print(f'Created {name}')
+
+            if options['retention_months'] is not None:
+                before_month = partitions.add_months(this_month, -options['retention_months'])
+                for name in partitions.detach_partitions(table, before_month, drop=options['drop']):
+                    print(f'{"Dropped" if options["drop"] else "Detached"} {name}')
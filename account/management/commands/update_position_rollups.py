@@ -0,0 +1,29 @@
+from django.core.management.base import BaseCommand, CommandError
+from django.utils.dateparse import parse_datetime
+
+from caracal.common import rollups
+from caracal.common.models import get_utc_datetime_now
+
+
+class Command(BaseCommand):
+    help = 'Updates the hourly and daily position rollups of individuals, run at least hourly.'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--lookback-hours', type=int, default=2,
+                            help='Rebuild hours that received positions within this many hours.')
+        parser.add_argument('--start', help='Backfill hours recorded from this ISO 8601 datetime instead.')
+        parser.add_argument('--end', help='End of the backfill, defaults to now.')
+
+    def handle(self, *args, **options):
+        if options['start'] is None:
+            num_hours = rollups.update_position_rollups(options['lookback_hours'])
+            print(f'Updated {num_hours} hourly position rollups')
+            return
+
+        start = parse_datetime(options['start'])
+        end = parse_datetime(options['end']) if options['end'] else get_utc_datetime_now()
+        if start is None or end is None or start.tzinfo is None or end.tzinfo is None:
+            raise CommandError('start and end must be ISO 8601 datetimes with a timezone, e.g. 2020-01-01T00:00:00Z')
+
+        num_hours = rollups.backfill_position_rollups(start, end)
+        print(f'Backfilled {num_hours} hourly position rollups')
@@ -0,0 +1,52 @@
+from django.conf import settings
+from django.db import migrations, models
+import uuid
+
+from caracal.common import partitions
+
+
+TABLE = 'account_realtimeposition'
+
+
+def partition_realtimeposition(apps, schema_editor):
+    with schema_editor.connection.cursor() as cursor:
+        partitions.partition_table(cursor, TABLE, settings.PARTITION_MONTHS_AHEAD)
+
+        cursor.execute(f'ALTER TABLE {TABLE} ADD CONSTRAINT {TABLE}_pkey PRIMARY KEY (id, datetime_recorded)')
+        cursor.execute(f'ALTER TABLE {TABLE} ADD CONSTRAINT {TABLE}_individual_id_position_datetime_recorded_uniq '
+                       f'UNIQUE (individual_id, position, datetime_recorded)')
+        cursor.execute(f'ALTER TABLE {TABLE} ADD CONSTRAINT {TABLE}_account_id_fk FOREIGN KEY (account_id) '
+                       f'REFERENCES account_realtimeaccount (id) DEFERRABLE INITIALLY DEFERRED')
+        cursor.execute(f'ALTER TABLE {TABLE} ADD CONSTRAINT {TABLE}_individual_id_fk FOREIGN KEY (individual_id) '
+                       f'REFERENCES account_realtimeindividual (id) DEFERRABLE INITIALLY DEFERRED')
+        cursor.execute(f'CREATE INDEX {TABLE}_account_id ON {TABLE} (account_id)')
+        cursor.execute(f'CREATE INDEX {TABLE}_individual_id ON {TABLE} (individual_id)')
+        cursor.execute(f'CREATE INDEX {TABLE}_position_id ON {TABLE} USING GIST (position)')
+        cursor.execute(f'CREATE INDEX {TABLE}_uid ON {TABLE} (uid)')
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('account', '0043_auto_20200104_1753'),
+    ]
+
+    operations = [
+        migrations.SeparateDatabaseAndState(
+            database_operations=[
+                migrations.RunPython(partition_realtimeposition),
+            ],
+            state_operations=[
+                migrations.AlterField(
+                    model_name='realtimeposition',
+                    name='uid',
+                    field=models.UUIDField(db_index=True, default=uuid.uuid4, editable=False),
+                ),
+                migrations.AlterField(
+                    model_name='realtimeposition',
+                    name='datetime_recorded',
+                    field=models.DateTimeField(),
+                ),
+            ],
+        ),
+    ]
@@ -0,0 +1,28 @@
+import django.contrib.postgres.indexes
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('account', '0044_partition_realtimeposition'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='realtimeposition',
+            index=models.Index(fields=['individual', 'datetime_recorded'], name='rt_position_indiv_dt_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='realtimeposition',
+            index=django.contrib.postgres.indexes.BrinIndex(fields=['datetime_recorded'], name='rt_position_dt_brin'),
+        ),
+        migrations.AddIndex(
+            model_name='realtimepositionhash',
+            index=models.Index(fields=['account', 'datetime_recorded'], name='rt_pos_hash_account_dt_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='realtimepositionhash',
+            index=django.contrib.postgres.indexes.BrinIndex(fields=['datetime_created'], name='rt_pos_hash_created_brin'),
+        ),
+    ]
@@ -0,0 +1,40 @@
+import caracal.common.models
+import django.contrib.gis.db.models.fields
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('account', '0045_position_indexes'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='RealTimePositionRollup',
+            fields=[
+                ('id', models.AutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('period', models.CharField(choices=[('hour', 'hour'), ('day', 'day')], max_length=10)),
+                ('datetime_start', models.DateTimeField()),
+                ('datetime_updated', models.DateTimeField(default=caracal.common.models.get_utc_datetime_now)),
+                ('num_positions', models.IntegerField()),
+                ('datetime_first', models.DateTimeField()),
+                ('datetime_last', models.DateTimeField()),
+                ('first_position', django.contrib.gis.db.models.fields.PointField(spatial_index=False, srid=4326)),
+                ('last_position', django.contrib.gis.db.models.fields.PointField(spatial_index=False, srid=4326)),
+                ('distance_km', models.FloatField()),
+                ('min_lon', models.FloatField()),
+                ('min_lat', models.FloatField()),
+                ('max_lon', models.FloatField()),
+                ('max_lat', models.FloatField()),
+                ('num_temps', models.IntegerField(default=0)),
+                ('temp_c_mean', models.FloatField(null=True)),
+                ('individual', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='rt_position_rollups', to='account.RealTimeIndividual')),
+            ],
+            options={
+                'ordering': ['datetime_start'],
+                'unique_together': {('individual', 'period', 'datetime_start')},
+            },
+        ),
+    ]
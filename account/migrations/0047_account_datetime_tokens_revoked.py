@@ -0,0 +1,16 @@
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('account', '0046_realtimepositionrollup'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='account',
+            name='datetime_tokens_revoked',
+            field=models.DateTimeField(null=True),
+        ),
+    ]
@@ -0,0 +1,21 @@
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('account', '0047_account_datetime_tokens_revoked'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='account',
+            name='is_email_verified',
+            field=models.BooleanField(default=False),
+        ),
+        migrations.AddField(
+            model_name='account',
+            name='datetime_email_verified_checked',
+            field=models.DateTimeField(null=True),
+        ),
+    ]
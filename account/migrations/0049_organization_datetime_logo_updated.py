@@ -0,0 +1,16 @@
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('account', '0048_account_email_verified'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='organization',
+            name='datetime_logo_updated',
+            field=models.DateTimeField(null=True),
+        ),
+    ]
@@ -1,4 +1,6 @@
 
+from botocore.exceptions import BotoCoreError, ClientError
+from datetime import timedelta
 from django.conf import settings
 from django.contrib.auth.models import AbstractBaseUser, BaseUserManager, PermissionsMixin
 import django.db.models as m
@@ -8,7 +10,7 @@ import uuid
 
 from auth import cognito
 from caracal.common import constants
-from caracal.common.aws_utils.cognito import create_user, confirm_account
+from caracal.common.aws_utils.cognito import create_user, confirm_account, get_is_email_verified
 
 
 class Organization(m.Model):
@@ -24,6 +26,7 @@ class Organization(m.Model):
     short_name = m.CharField(max_length=50, blank=False, null=False, unique=True)
     timezone = m.CharField(max_length=50, default='Africa/Kigali')
     logo_object_key = m.CharField(max_length=255, blank=True, null=True)
+    datetime_logo_updated = m.DateTimeField(null=True) # logos overwrite the same key, this versions their urls
 
     # billing
     custom_records_limit = m.IntegerField(default=settings.BILLING_CUSTOM_RECORDS_LIMIT_INDIV)
@@ -120,6 +123,11 @@ class Account(AbstractBaseUser, PermissionsMixin):
     registration_method = m.CharField(max_length=50, choices=constants.REGISTRATION_METHODS, default='email', null=True)
     custom_access_jwt_id = m.UUIDField(null=True)
     custom_refresh_jwt_id = m.UUIDField(null=True)
+    datetime_tokens_revoked = m.DateTimeField(null=True) # Cognito tokens issued before are rejected
+
+    # Cognito's email_verified, unverified accounts are rechecked after ACCOUNT_EMAIL_VERIFIED_TTL_SECONDS
+    is_email_verified = m.BooleanField(default=False)
+    datetime_email_verified_checked = m.DateTimeField(null=True)
 
     # Temp Google tokens
     temp_google_oauth_access_token = m.TextField(null=True)
@@ -135,6 +143,30 @@ class Account(AbstractBaseUser, PermissionsMixin):
     def __str__(self):
         return "%s - %s" % (self.name, self.email)
 
+    def get_is_email_verified(self):
+        "Returns the stored verification state, asking Cognito only if unverified and last checked over the ttl ago."
+
+        if self.is_email_verified:
+            return True
+
+        checked = self.datetime_email_verified_checked
+        if checked is not None and timezone.now() - checked < timedelta(seconds=settings.ACCOUNT_EMAIL_VERIFIED_TTL_SECONDS):
+            return False
+
+        try:
+            is_email_verified = get_is_email_verified(self.email)
+        except (BotoCoreError, ClientError) as e:
+            print(f'could not check email verification: {e}')
+            return False
+
+        self.set_email_verified(is_email_verified)
+        return is_email_verified
+
+    def set_email_verified(self, is_email_verified):
+        self.is_email_verified = is_email_verified
+        self.datetime_email_verified_checked = timezone.now()
+        self.save(update_fields=['is_email_verified', 'datetime_email_verified_checked'])
+
     class Meta:
         ordering = ['email']
         verbose_name = 'account'
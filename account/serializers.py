@@ -8,7 +8,7 @@ import uuid
 
 from account.models import Account, AlertRecipient, Organization
 from caracal.common import constants, image
-from caracal.common.aws_utils import cognito, dynamodb, s3
+from caracal.common.aws_utils import dynamodb, s3
 from caracal.common.fields import CaseInsensitiveEmailField
 
 
@@ -88,7 +88,7 @@ class ForceOrganizationUpdateSerializer(serializers.Serializer):
         account.organization.name = name
         account.organization.short_name = short_name
         account.organization.update_required = False
-        account.organization.save()
+        account.organization.save(update_fields=['name', 'short_name', 'update_required'])
 
         password = str(uuid.uuid4()).split('-')[0]
         dynamodb.create_dynamodb_credentials(validated_data['organization_short_name'], 'admin', password, ['all'])
@@ -119,12 +119,13 @@ class GetProfileSerializer(serializers.ModelSerializer):
     logo_url = serializers.SerializerMethodField()
     def get_logo_url(self, obj):
         if obj.organization.logo_object_key:
-            url = s3.get_presigned_url(obj.organization.logo_object_key, settings.S3_USER_DATA_BUCKET, 7200)
+            url = s3.get_presigned_url(obj.organization.logo_object_key, settings.S3_USER_DATA_BUCKET, 7200,
+                                       version=obj.organization.datetime_logo_updated)
             return url
 
     is_email_verified = serializers.SerializerMethodField()
     def get_is_email_verified(self, account):
-        return cognito.get_is_email_verified(account.email)
+        return account.get_is_email_verified()
 
     class Meta:
         model = Account
@@ -203,28 +204,40 @@ class UpdateAccountSerializer(serializers.Serializer):
 
     def update(self, account, validated_data):
 
-        # account
+        # account, Cognito marks a changed email unverified
+        if validated_data.get('email', account.email) != account.email:
+            account.is_email_verified = False
+            account.datetime_email_verified_checked = None
+
         account.email = validated_data.get('email', account.email)
         account.name = validated_data.get('name', account.name)
         account.phone_number = validated_data.get('phone_number', account.phone_number)
         account.datetime_updated = datetime.utcnow().replace(tzinfo=tz.utc)
-        account.save()
+
+        # the account may be a cached copy, so only what this changes is written over the row
+        account.save(update_fields=['email', 'is_email_verified', 'datetime_email_verified_checked', 'name',
+                                    'phone_number', 'datetime_updated'])
 
         # organization
         account.organization.name = validated_data.get('organization_name', account.organization.name)
         account.organization.timezone = validated_data.get('timezone', account.organization.timezone)
 
+        organization_fields = ['name', 'timezone']
+
         logo = validated_data.get('logo')
         if logo is not None:
             object_key = save_logo(logo, account)
             account.organization.logo_object_key = object_key
+            account.organization.datetime_logo_updated = datetime.utcnow().replace(tzinfo=tz.utc)
+            organization_fields += ['logo_object_key', 'datetime_logo_updated']
 
         short_name = validated_data.get('organization_short_name')
         if short_name is not None and short_name != account.organization.short_name:
             account.organization.short_name = short_name
+            organization_fields.append('short_name')
             # TODO: update short_name elsewhere...
 
-        account.organization.save()
+        account.organization.save(update_fields=organization_fields)
 
         return account
 
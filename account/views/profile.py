@@ -180,6 +180,8 @@ class VerifyEmailView(views.APIView):
                 cognito.verify_email(account.email)
                 message = 'Your email has been verified!'
 
+            account.set_email_verified(True)
+
         except Account.DoesNotExist:
             message = 'User not found.'
         except KeyError:
@@ -1,6 +1,7 @@
 
 import datetime
 from django.conf import settings
+from django.utils import timezone
 from google.oauth2 import id_token
 from google.auth.transport import requests as google_requests
 from rest_framework import permissions, status, generics, views
@@ -80,6 +81,7 @@ class GoogleAuthView(generics.GenericAPIView):
 
         user.custom_access_jwt_id = access_jwt_id
         user.custom_refresh_jwt_id = refresh_jwt_id
+        user.datetime_tokens_revoked = timezone.now()
         user.save()
 
         # fixme: this is gross
@@ -1,5 +1,6 @@
 
 from django.conf import settings
+from django.utils import timezone
 from drf_yasg.utils import swagger_auto_schema
 from rest_framework import permissions, status, generics, views
 from rest_framework.authentication import get_authorization_header
@@ -86,6 +87,11 @@ class LogoutView(views.APIView):
     }, security=[], operation_id='account - logout')
     def post(self, request):
         cognito.sign_out_user(request.user.email)
+
+        # tokens are verified locally so record the logout for the authentication backend
+        request.user.datetime_tokens_revoked = timezone.now()
+        request.user.save(update_fields=['datetime_tokens_revoked'])
+
         return Response(status=status.HTTP_200_OK)
 
 
@@ -20,4 +20,3 @@ class ActivityChangeAdmin(admin.ModelAdmin):
     list_filter = ['is_active']
     ordering = ['-datetime_created']
     readonly_fields = ['datetime_created']
-
@@ -32,4 +32,4 @@ class ActivityChange(models.Model):
     message = models.CharField(max_length=200)
 
     class Meta:
-        ordering = ['-datetime_created']
\ No newline at end of file
+        ordering = ['-datetime_created']
@@ -0,0 +1,48 @@
+from datetime import timedelta
+from django.conf import settings
+from django.db.models import Count, Q, Sum
+
+from caracal.common import rollups
+from caracal.common.models import get_utc_datetime_now, RealTimePosition, RealTimePositionRollup
+
+
+def get_position_counts(organization, then):
+    """
+    Returns the number of positions since then per active account type, e.g. {'elephant': 10}. Both paths count
+    RealTimePosition rows, so OVERVIEW_METRICS_USE_ROLLUPS only changes how the count is made, not its value.
+    """
+
+    counts = {
+        account_type: 0 for account_type in
+        organization.rt_accounts.filter(is_active=True).values_list('type', flat=True).distinct()
+    }
+
+    positions = RealTimePosition.objects.filter(account__organization=organization, account__is_active=True)
+
+    if settings.OVERVIEW_METRICS_USE_ROLLUPS:
+        # whole hours from the individuals' hourly rollups, the partial hour after then and the current hour from
+        # the raw positions
+        this_hour = rollups.get_hour_start(get_utc_datetime_now())
+        first_hour = rollups.get_hour_start(then)
+        if first_hour < then:
+            first_hour += timedelta(hours=1)
+
+        hourly = RealTimePositionRollup.objects.filter(
+            individual__account__organization=organization, individual__account__is_active=True,
+            period=rollups.HOUR, datetime_start__gte=first_hour, datetime_start__lt=this_hour
+        )
+        rows = [
+            {'account__type': row['individual__account__type'], 'num': row['num']}
+            for row in hourly.values('individual__account__type').annotate(num=Sum('num_positions'))
+        ]
+
+        raw = Q(datetime_recorded__gte=then, datetime_recorded__lt=min(first_hour, this_hour)) | \
+              Q(datetime_recorded__gte=max(then, this_hour))
+        rows += list(positions.filter(raw).values('account__type').annotate(num=Count('pk')))
+    else:
+        rows = positions.filter(datetime_recorded__gte=then).values('account__type').annotate(num=Count('pk'))
+
+    for row in rows:
+        counts[row['account__type']] = counts.get(row['account__type'], 0) + row['num']
+
+    return counts
@@ -4,10 +4,10 @@ from django.utils import timezone
 from rest_framework import permissions, status, generics, views
 from rest_framework.response import Response
 
-from activity import serializers
+from activity import rollups, serializers
 from activity.models import ActivityAlert, ActivityChange
 from auth.backends import CognitoAuthentication
-from caracal.common.models import RealTimePositionHash
+from caracal.common.pagination import CreatedKeysetPagination
 
 
 class DeleteAlertView(generics.GenericAPIView):
@@ -51,6 +51,7 @@ class GetChangesView(generics.ListAPIView):
 
     authentication_classes = [CognitoAuthentication]
     permission_classes = [permissions.IsAuthenticated]
+    pagination_class = CreatedKeysetPagination
     serializer_class = serializers.GetChangesSerializer
 
     def get_queryset(self):
@@ -81,14 +82,9 @@ class GetOverviewMetricsView(views.APIView):
 
         data = {}
 
-        # Collars
-        accounts = organization.rt_accounts.filter(is_active=True)
-        for account in accounts:
-            key = f'num_{account.type}_positions'
-            # initialize and increment number of positions grouped by type (elephant, radio, etc.)
-            if key not in data.keys():
-                data[key] = 0
-            data[key] += RealTimePositionHash.objects.filter(account=account, datetime_recorded__gte=then).count()
+        # number of positions grouped by type (elephant, radio, etc.)
+        for account_type, num_positions in rollups.get_position_counts(organization, then).items():
+            data[f'num_{account_type}_positions'] = num_positions
 
         # Alerts
         data['num_alerts'] = organization.alerts.count()
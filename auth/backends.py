@@ -1,15 +1,13 @@
 from datetime import datetime, timedelta, timezone
 from django.conf import settings
 from django.utils.encoding import smart_text
-import json
 import jwt
-import os
 from rest_framework import exceptions, status
 from rest_framework.authentication import BaseAuthentication, get_authorization_header
-from sentry_sdk import capture_message
 import time
 
-from auth import cognito
+from auth import jwks
+from auth.principals import get_subscription_error, Principal, principals
 from account.models import Account
 
 # use _ and stuff
@@ -22,6 +20,24 @@ class CognitoAuthentication(BaseAuthentication):
         if jwt_value is None:
             return None
 
+        principal = principals.get(jwt_value)
+        if principal is None:
+            principal = self.get_principal(jwt_value)
+
+        # handle delinquent payments
+
+        # allow if trying to add subscription or update payment...
+        if request.path in ['/billing/update_plan_and_payment_method/', '/billing/update_payment_method/']:
+            return principal.account, jwt_value
+
+        if principal.subscription_error is not None:
+            raise exceptions.AuthenticationFailed(principal.subscription_error)
+
+        return principal.account, jwt_value
+
+    def get_principal(self, jwt_value):
+        "Verifies the token, loads the account and caches both with the subscription decision."
+
         try: # custom auth
 
             payload = jwt.decode(jwt_value, settings.SECRET_KEY, True) # cognito auth will throw exception
@@ -31,15 +47,17 @@ class CognitoAuthentication(BaseAuthentication):
                     'error': 'invalid_iss'
                 })
 
-            CognitoAuthentication.verify_custom_token_valid(payload)
             CognitoAuthentication.verify_expiry(payload)
 
-            uid = payload.get('sub', None).replace('-', '')
+            uid = payload.get('sub', None)
             if uid is None:
                 raise exceptions.AuthenticationFailed({
                     'error': 'sub_claim_required'
                 })
 
+            user = Account.objects.select_related('organization').filter(uid_cognito=uid).first()
+            CognitoAuthentication.verify_custom_token_valid(user, payload)
+
         except jwt.exceptions.ExpiredSignatureError: # custom auth
             raise exceptions.AuthenticationFailed({
                 'error': 'access_token_expired'
@@ -47,59 +65,27 @@ class CognitoAuthentication(BaseAuthentication):
 
         except (jwt.exceptions.DecodeError, jwt.exceptions.InvalidAlgorithmError): # aws cognito auth
 
-            CognitoAuthentication.verify_cognito_token_valid(jwt_value)
-            CognitoAuthentication.verify_cognito_kid(jwt_value)
+            payload = CognitoAuthentication.verify_cognito_token(jwt_value)
 
             # verify uid or username exists (both same in Cognito)
-            unverified_payload = jwt.decode(jwt_value, None, False)
-            uid = unverified_payload.get('sub', unverified_payload.get('username', None)).replace('-', '')
+            uid = payload.get('sub', payload.get('username', None))
             if uid is None:
                 raise exceptions.AuthenticationFailed({
                     'error': 'sub_claim_required'
                 })
 
-            CognitoAuthentication.verify_expiry(unverified_payload)
-
-        user = Account.objects.filter(uid_cognito=uid).first()
-        if user is None:
-            raise exceptions.AuthenticationFailed({
-                'error': 'no_user_with_sub'
-            })
-
-        # handle delinquent payments
-
-        # allow if trying to add subscription or update payment...
-        if request.path in ['/billing/update_plan_and_payment_method/', '/billing/update_payment_method/']:
-            return user, jwt_value
-
-        subscription_status = user.organization.stripe_subscription_status
-
-        if subscription_status == 'past_due':
-            # If organization is trialing, enforce a hard stop if past due.
-            # is_trialing means the user is currently trialing or their trial expired.
-            # is_trialing is False if the user has successfully paid for a non-zero invoice.
-            if user.organization.is_trialing:
+            user = Account.objects.select_related('organization').filter(uid_cognito=uid.replace('-', '')).first()
+            if user is None:
                 raise exceptions.AuthenticationFailed({
-                    'error': 'trial_expired',
-                    'message': 'Your trial has expired. Please select a plan to continue.'
+                    'error': 'no_user_with_sub'
                 })
-            else:
-                # TODO: enforce some buffer time
-                return user, jwt_value
 
-        elif subscription_status in ['incomplete', 'incomplete_expired']:
-            raise exceptions.AuthenticationFailed({
-                'error': 'payment_failed',
-                'message': 'Please update your payment details to resume service.'
-            })
+            CognitoAuthentication.verify_not_revoked(user, payload.get('iat'))
 
-        elif subscription_status == 'canceled':
-            raise exceptions.AuthenticationFailed({
-                'error': 'subscription_canceled',
-                'message': 'Your subscription has been canceled. Please select a plan to continue.'
-            })
+        subscription_error = get_subscription_error(user.organization)
+        principals.set(jwt_value, user, payload.get('exp'), subscription_error)
 
-        return user, jwt_value
+        return Principal(user, payload.get('exp'), subscription_error)
 
 
     def get_jwt_value(self, request): # this cannot be static
@@ -129,40 +115,28 @@ class CognitoAuthentication(BaseAuthentication):
         return auth[1]
 
     @staticmethod
-    def verify_cognito_token_valid(jwt_value):
-        # verify that access_token is still valid (i.e. user hasn't logged out or been revoked)
-        cognito_idp_client = cognito.get_cognito_idp_client()
+    def verify_cognito_token(jwt_value):
+        "Verifies the access token locally against the user pool's JWKs and returns its claims."
         try:
-            cognito_idp_client.get_user(AccessToken=jwt_value.decode('utf-8'))
-        except cognito_idp_client.exceptions.NotAuthorizedException:
+            return jwks.verify_cognito_token(jwt_value)
+        except jwks.InvalidToken as e:
             raise exceptions.AuthenticationFailed({
-                'error': 'access_token_revoked'
-            })
-        except cognito_idp_client.exceptions.UserNotFoundException:
-            raise exceptions.AuthenticationFailed({
-                'error': 'account_not_found'
-            })
-        except cognito_idp_client.exceptions.ResourceNotFoundException:
-            capture_message("resource_not_found: possible user pool issue", level="error")
-            raise exceptions.AuthenticationFailed({
-                'error': 'resource_not_found'
+                'error': e.error
             })
 
     @staticmethod
-    def verify_custom_token_valid(payload):
+    def verify_custom_token_valid(user, payload):
 
-        uid = payload.get('sub', None)
-        try:
-            user = Account.objects.get(uid_cognito=uid)
-            if user.custom_access_jwt_id is None or str(user.custom_access_jwt_id) != payload.get('jti', None):
-                raise exceptions.AuthenticationFailed({
-                    'error': 'access_token_revoked'
-                })
-        except Account.DoesNotExist:
+        if user is None:
             raise exceptions.AuthenticationFailed({
                 'error': 'user_not_found'
             })
 
+        if user.custom_access_jwt_id is None or str(user.custom_access_jwt_id) != payload.get('jti', None):
+            raise exceptions.AuthenticationFailed({
+                'error': 'access_token_revoked'
+            })
+
 
     @staticmethod
     def verify_expiry(unverified_payload):
@@ -177,37 +151,11 @@ class CognitoAuthentication(BaseAuthentication):
             })
 
     @staticmethod
-    def verify_cognito_kid(jwt_value):
-        """
-        Verifies that the kid in the access_token header matches a well-known kid in Cognito
-        :param jwt_value:
-        :return:
-        """
-        try:
-            jwt_kid = jwt.get_unverified_header(jwt_value).get('kid')
-        except jwt.exceptions.DecodeError:
-            raise exceptions.AuthenticationFailed({
-                'error': 'invalid_jwt'
-            })
-
-        if jwt_kid is None:
-            raise exceptions.AuthenticationFailed({
-                'error': 'kid_required'
-            })
-
-        jwk_path = os.path.join(settings.BASE_DIR, 'account', 'resources', 'jwks.json')
-        if not os.path.isfile(jwk_path):
-            capture_message("jwks_missing: jwks.json does not exist. run get_all_jwks", level="error")
-            raise exceptions.AuthenticationFailed({
-                'error': 'jwks_missing'
-            })
-
-        with open(jwk_path) as f:
-            keys = json.loads(f.read())['keys']
-        keys = [key['kid'] for key in keys]
-
-        if not jwt_kid in keys:
-            capture_message("invalid_kid: make sure JWKs retrieved (get_all_jwks)", level="error")
+    def verify_not_revoked(user, issued_at):
+        # tokens issued before the last logout through the api. iat is in whole seconds, so a token issued in
+        # the same second as the logout is allowed, as are tokens within the clock skew between us and Cognito
+        if issued_at is not None and user.datetime_tokens_revoked is not None and \
+                issued_at < int(user.datetime_tokens_revoked.timestamp()) - settings.COGNITO_REVOCATION_CLOCK_SKEW_SECONDS:
             raise exceptions.AuthenticationFailed({
-                'error': 'invalid_kid'
+                'error': 'access_token_revoked'
             })
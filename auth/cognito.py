@@ -26,12 +26,7 @@ def confirm_user(email):
 
 
 def get_cognito_idp_client():
-    kwargs = {
-        'aws_access_key_id': settings.AWS_ACCESS_KEY_ID,
-        'aws_secret_access_key': settings.AWS_SECRET_ACCESS_KEY,
-        'region_name': settings.AWS_REGION
-    }
-    return boto3.client('cognito-idp', **kwargs)
+    return get_boto_client('cognito-idp')
 
 
 # TODO: refactor this to use exceptions like ql
@@ -0,0 +1,190 @@
+from cachetools import TTLCache
+from django.conf import settings
+import hashlib
+from jose import jwt as jose_jwt
+from jose.exceptions import ExpiredSignatureError, JWTError
+import json
+import os
+import requests
+from sentry_sdk import capture_message
+import threading
+import time
+
+from auth import cognito
+from caracal.common import http
+
+
+class InvalidToken(Exception):
+    "Raised with the error code returned to the client."
+
+    def __init__(self, error):
+        super().__init__(error)
+        self.error = error
+
+
+class JWKSet:
+    """
+    Cognito signing keys in memory by kid. Seeded from account/resources/jwks.json and refreshed from the
+    user pool in a background thread when a token has an unknown kid. Only one refresh runs at a time and
+    refreshes are rate limited so tokens with made up kids cannot hammer Cognito.
+    """
+
+    def __init__(self):
+        self._keys = None
+        self._lock = threading.Lock()
+        self._refreshed = threading.Event()
+        self._refreshing = False
+        self._last_refresh = 0
+
+    def get_key(self, kid):
+        "Returns the jwk for the kid or None, waiting briefly for a refresh if the kid is unknown."
+
+        keys = self._get_keys()
+        if kid in keys:
+            return keys[kid]
+
+        event = self.refresh()
+        if event is not None:
+            event.wait(settings.COGNITO_JWKS_REFRESH_WAIT_SECONDS)
+
+        return self._get_keys().get(kid)
+
+    def refresh(self):
+        "Starts a background refresh unless one is running or ran recently. Returns an event set once it finishes."
+
+        with self._lock:
+            if self._refreshing:
+                return self._refreshed
+            if time.time() - self._last_refresh < settings.COGNITO_JWKS_MIN_REFRESH_SECONDS:
+                return None
+
+            self._refreshing = True
+            self._last_refresh = time.time()
+            self._refreshed = threading.Event()
+            event = self._refreshed
+
+        threading.Thread(target=self._refresh, args=(event,), daemon=True).start()
+        return event
+
+    def _get_keys(self):
+        if self._keys is None:
+            with self._lock:
+                if self._keys is None:
+                    self._keys = _read_jwks_file()
+        return self._keys
+
+    def _refresh(self, event):
+        try:
+            res = http.get(get_cognito_jwks_url())
+            res.raise_for_status()
+            keys = {key['kid']: key for key in res.json().get('keys', list())}
+        except (requests.exceptions.RequestException, ValueError) as e:
+            print(f'jwks refresh failed: {e}')
+            capture_message('jwks_refresh_failed: could not fetch the user pool jwks', level='error')
+        else:
+            with self._lock:
+                self._keys = {**(self._keys or dict()), **keys}
+        finally:
+            with self._lock:
+                self._refreshing = False
+            event.set()
+
+
+class RevocationCache:
+    """
+    Caches Cognito's answer to whether an access token is still valid so get_user is called at most once
+    per token per ttl. Logouts through the API are caught immediately by Account.datetime_tokens_revoked,
+    this only bounds how long a token revoked elsewhere (i.e. the Cognito console) keeps working.
+    """
+
+    def __init__(self):
+        self._cache = TTLCache(maxsize=settings.COGNITO_REVOCATION_CACHE_MAX_SIZE,
+                               ttl=settings.COGNITO_REVOCATION_CACHE_TTL_SECONDS)
+        self._lock = threading.Lock()
+
+    def check(self, jwt_value):
+        key = hashlib.sha256(jwt_value).hexdigest()
+        with self._lock:
+            error = self._cache.get(key, False)
+
+        if error is False:
+            error = _get_cognito_user_error(jwt_value)
+            with self._lock:
+                self._cache[key] = error
+
+        if error is not None:
+            raise InvalidToken(error)
+
+    def clear(self):
+        with self._lock:
+            self._cache.clear()
+
+
+cognito_jwks = JWKSet()
+cognito_revocations = RevocationCache()
+
+
+def get_cognito_issuer():
+    return f'https://cognito-idp.{settings.AWS_REGION}.amazonaws.com/{settings.COGNITO_USER_POOL_ID}'
+
+
+def get_cognito_jwks_url():
+    return f'{get_cognito_issuer()}/.well-known/jwks.json'
+
+
+def verify_cognito_token(jwt_value):
+    "Verifies the signature, issuer, client and expiry of a Cognito access token locally and returns its claims."
+
+    try:
+        kid = jose_jwt.get_unverified_header(jwt_value).get('kid')
+    except JWTError:
+        raise InvalidToken('invalid_jwt')
+
+    if kid is None:
+        raise InvalidToken('kid_required')
+
+    key = cognito_jwks.get_key(kid)
+    if key is None:
+        capture_message('invalid_kid: kid not in the user pool jwks', level='error')
+        raise InvalidToken('invalid_kid')
+
+    try:
+        claims = jose_jwt.decode(jwt_value, key, algorithms=['RS256'], issuer=get_cognito_issuer(),
+                                 options={'verify_aud': False})
+    except ExpiredSignatureError:
+        raise InvalidToken('access_token_expired')
+    except JWTError:
+        raise InvalidToken('invalid_jwt')
+
+    # access tokens have client_id instead of aud
+    if claims.get('token_use') != 'access' or claims.get('client_id') != settings.COGNITO_APP_ID:
+        raise InvalidToken('invalid_jwt')
+
+    if settings.COGNITO_REVOCATION_CACHE_TTL_SECONDS:
+        cognito_revocations.check(jwt_value)
+
+    return claims
+
+
+def _get_cognito_user_error(jwt_value):
+    cognito_idp_client = cognito.get_cognito_idp_client()
+    try:
+        cognito_idp_client.get_user(AccessToken=jwt_value.decode('utf-8'))
+    except cognito_idp_client.exceptions.NotAuthorizedException:
+        return 'access_token_revoked'
+    except cognito_idp_client.exceptions.UserNotFoundException:
+        return 'account_not_found'
+    except cognito_idp_client.exceptions.ResourceNotFoundException:
+        capture_message('resource_not_found: possible user pool issue', level='error')
+        return 'resource_not_found'
+
+    return None
+
+
+def _read_jwks_file():
+    jwk_path = os.path.join(settings.BASE_DIR, 'account', 'resources', 'jwks.json')
+    if not os.path.isfile(jwk_path):
+        return dict()
+
+    with open(jwk_path) as f:
+        return {key['kid']: key for key in json.loads(f.read())['keys']}
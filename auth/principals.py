@@ -0,0 +1,114 @@
+from cachetools import TTLCache
+from collections import namedtuple
+import copy
+from django.conf import settings
+import hashlib
+import threading
+import time
+
+
+Principal = namedtuple('Principal', ['account', 'expiry', 'subscription_error'])
+
+
+class PrincipalCache:
+    """
+    In-process cache of token -> Principal so authenticated requests do not query the account and organization.
+    Entries expire with the token or after PRINCIPAL_CACHE_TTL_SECONDS, whichever is first. Saving or deleting
+    an account or organization invalidates its entries in this process, other processes pick it up once the ttl expires.
+    """
+
+    def __init__(self):
+        self._cache = TTLCache(maxsize=settings.PRINCIPAL_CACHE_MAX_SIZE,
+                               ttl=settings.PRINCIPAL_CACHE_TTL_SECONDS or 1)
+        self._lock = threading.Lock()
+
+    def get(self, jwt_value):
+        "Returns the Principal with a copy of the account, which views are free to modify, or None."
+
+        if not settings.PRINCIPAL_CACHE_TTL_SECONDS:
+            return None
+
+        with self._lock:
+            principal = self._cache.get(_get_key(jwt_value))
+
+        if principal is None or principal.expiry <= time.time():
+            return None
+
+        return principal._replace(account=copy.deepcopy(principal.account))
+
+    def set(self, jwt_value, account, expiry, subscription_error):
+        "Caches the account, which should have its organization loaded, until the token expiry in epoch seconds."
+
+        if not settings.PRINCIPAL_CACHE_TTL_SECONDS or expiry is None:
+            return
+
+        with self._lock:
+            self._cache[_get_key(jwt_value)] = Principal(copy.deepcopy(account), expiry, subscription_error)
+
+    def invalidate(self, jwt_value):
+        with self._lock:
+            self._cache.pop(_get_key(jwt_value), None)
+
+    def invalidate_account(self, account_id):
+        with self._lock:
+            for key, principal in list(self._cache.items()):
+                if principal.account.pk == account_id:
+                    self._cache.pop(key, None)
+
+    def invalidate_organization(self, organization_id):
+        with self._lock:
+            for key, principal in list(self._cache.items()):
+                if principal.account.organization_id == organization_id:
+                    self._cache.pop(key, None)
+
+    def clear(self):
+        with self._lock:
+            self._cache.clear()
+
+    def invalidate_account_instance(self, sender, instance, **kwargs):
+        "Signal receiver for post_save and post_delete of Account."
+        self.invalidate_account(instance.pk)
+
+    def invalidate_organization_instance(self, sender, instance, **kwargs):
+        "Signal receiver for post_save and post_delete of Organization."
+        self.invalidate_organization(instance.pk)
+
+
+principals = PrincipalCache()
+
+
+def get_subscription_error(organization):
+    "Returns the AuthenticationFailed detail if the organization's subscription blocks access, otherwise None."
+
+    subscription_status = organization.stripe_subscription_status
+
+    if subscription_status == 'past_due':
+        # If organization is trialing, enforce a hard stop if past due.
+        # is_trialing means the user is currently trialing or their trial expired.
+        # is_trialing is False if the user has successfully paid for a non-zero invoice.
+        if organization.is_trialing:
+            return {
+                'error': 'trial_expired',
+                'message': 'Your trial has expired. Please select a plan to continue.'
+            }
+        else:
+            # TODO: enforce some buffer time
+            return None
+
+    elif subscription_status in ['incomplete', 'incomplete_expired']:
+        return {
+            'error': 'payment_failed',
+            'message': 'Please update your payment details to resume service.'
+        }
+
+    elif subscription_status == 'canceled':
+        return {
+            'error': 'subscription_canceled',
+            'message': 'Your subscription has been canceled. Please select a plan to continue.'
+        }
+
+    return None
+
+
+def _get_key(jwt_value):
+    return hashlib.sha256(jwt_value).hexdigest()
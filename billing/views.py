@@ -105,7 +105,7 @@ class UpdatePaidSubscriptionView(generics.GenericAPIView):
         stripe_utils.update_subscription(subscription_id, new_plan_id, current_subscription['item_id'])
 
         organization.stripe_plan_id = new_plan_id
-        organization.save()
+        organization.save(update_fields=['stripe_plan_id'])
 
         return Response(status=status.HTTP_200_OK)
 
@@ -183,7 +183,7 @@ class UpdatePlanAndPaymentMethodView(generics.GenericAPIView):
                 return Response(subscription_res, status=status.HTTP_400_BAD_REQUEST)
 
             organization.stripe_plan_id = plan_id
-            organization.save()
+            organization.save(update_fields=['stripe_plan_id'])
 
         return Response(status=status.HTTP_201_CREATED)
 
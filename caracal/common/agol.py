@@ -1,13 +1,19 @@
-from datetime import datetime, timezone
+from cachetools import LRUCache
+from collections import namedtuple
+from concurrent.futures import as_completed, ThreadPoolExecutor
+from datetime import datetime, timedelta, timezone
 from django.conf import settings
 import json
 import requests
 from rest_framework import status
 from rest_framework.response import Response
 import simple_arcgis_wrapper as saw
+import threading
+import time
 
-from caracal.common import google
-from outputs.models import AgolAccount
+from caracal.common import google, http
+from caracal.common.models import get_utc_datetime_now
+from outputs.models import AgolAccount, AgolFeatureIndex
 
 
 AGOL_ROOT = "https://www.arcgis.com/sharing/rest"
@@ -17,6 +23,175 @@ WKID = 4326
 CARACAL_SERVICE_NAME = "Caracal"
 CARACAL_SERVICE_DESCRIPTION = "Caracal data integration outputs"
 
+EDIT_OPERATIONS = {"adds": "added", "updates": "updated", "deletes": "deleted"}
+MISSING_FEATURE_ERROR_CODE = 1019 # applyEdits result error for an OBJECTID not in the layer
+
+EditReport = namedtuple("EditReport", ["added", "updated", "deleted", "missing", "failed"])
+
+
+class AgolClient:
+    """
+    An ArcgisAPI for one AgolAccount whose access token refreshes are shared by concurrent callers and
+    written back to the AgolAccount with their expiry.
+    """
+
+    def __init__(self, agol_account):
+        self.agol_account_id = agol_account.pk
+        self.refresh_token = agol_account.oauth_refresh_token
+        self.expiry = agol_account.oauth_access_token_expiry
+        self._lock = threading.Lock()
+
+        access_token = agol_account.oauth_access_token
+        if not access_token and self.refresh_token:
+            access_token = self._request_access_token()
+
+        self.arcgis = saw.ArcgisAPI(
+            access_token=access_token,
+            refresh_token=self.refresh_token,
+            username=agol_account.username,
+            client_id=settings.AGOL_CLIENT_ID,
+        )
+        # the requester refreshes on expired token errors and in is_refresh_token_active
+        self.arcgis.requester._refresh_access_token = self.refresh
+        # the requester calls self.session.request, so every ArcGIS call gets the shared session's timeouts,
+        # circuit breaker and metrics
+        self.arcgis.requester.session = http.session
+
+    def refresh(self):
+        "Refreshes the access token unless another caller refreshed it while this one waited."
+
+        previous_token = self.arcgis.requester.access_token
+        with self._lock:
+            if self.arcgis.requester.access_token != previous_token:
+                return
+            self.arcgis.requester.access_token = self._request_access_token()
+
+    def sync(self, agol_account):
+        "Adopts a newer token refreshed by another process and refreshes ahead of expiry."
+
+        with self._lock:
+            if agol_account.oauth_access_token_expiry is not None and \
+                    (self.expiry is None or agol_account.oauth_access_token_expiry > self.expiry):
+                self.arcgis.requester.access_token = agol_account.oauth_access_token
+                self.expiry = agol_account.oauth_access_token_expiry
+
+        margin = timedelta(seconds=settings.AGOL_TOKEN_REFRESH_MARGIN_SECONDS)
+        if self.expiry is not None and self.expiry - margin <= get_utc_datetime_now():
+            try:
+                self.refresh()
+            except saw.exceptions.ArcGISException as e: # the request itself will fail as before
+                print(f'agol token refresh failed: {e}')
+
+        agol_account.oauth_access_token = self.arcgis.requester.access_token
+        agol_account.oauth_access_token_expiry = self.expiry
+
+    def _request_access_token(self):
+        res = http.post(f"{AGOL_ROOT}/oauth2/token", data={
+            "client_id": settings.AGOL_CLIENT_ID,
+            "refresh_token": self.refresh_token,
+            "grant_type": "refresh_token",
+        })
+
+        try:
+            content = res.json()
+        except ValueError:
+            raise saw.exceptions.ArcGISException("ArcGIS response error. Try again later.")
+
+        if content.get("error"):
+            raise saw.exceptions.ArcGISException(content["error"]["message"])
+
+        access_token = content["access_token"]
+        self.expiry = get_utc_datetime_now() + timedelta(seconds=content["expires_in"])
+
+        AgolAccount.objects.filter(pk=self.agol_account_id)\
+            .update(oauth_access_token=access_token, oauth_access_token_expiry=self.expiry)
+
+        return access_token
+
+
+class AgolClients:
+    "Process-wide AgolClient per AgolAccount, rebuilt if the account has been reconnected with a new refresh token."
+
+    def __init__(self):
+        self._clients = LRUCache(maxsize=settings.AGOL_CLIENT_CACHE_MAX_SIZE)
+        self._lock = threading.Lock()
+
+    def get(self, agol_account):
+        "Returns the ArcgisAPI for the account and sets the account's token fields to the client's."
+
+        with self._lock:
+            client = self._clients.get(agol_account.pk)
+
+        if client is None or client.refresh_token != agol_account.oauth_refresh_token:
+            client = AgolClient(agol_account)
+            with self._lock:
+                self._clients[agol_account.pk] = client
+
+        client.sync(agol_account)
+        return client.arcgis
+
+    def invalidate(self, agol_account_id):
+        with self._lock:
+            self._clients.pop(agol_account_id, None)
+
+
+agol_clients = AgolClients()
+
+
+def apply_edits(layer_id, agol_account, adds=None, updates=None, deletes=None):
+    """
+    Applies edits to a layer in chunks of AGOL_EDIT_CHUNK_SIZE run by a pool of AGOL_EDIT_MAX_WORKERS.
+    adds are {"attributes": ..., "geometry": ...} features, updates are (id, attributes, geometry) tuples
+    and deletes are OBJECTIDs. Chunks that fail as a whole are retried with backoff, features that AGOL
+    rejects are reported in EditReport.failed as (operation, id, message) unless they no longer exist,
+    those are in EditReport.missing.
+    """
+
+    feature_updates = list()
+    for object_id, attributes, geometry in updates or list():
+        if attributes is None and geometry is None:
+            continue
+        feature_update = {"attributes": {**(attributes or dict()), "OBJECTID": object_id}}
+        if geometry is not None:
+            feature_update["geometry"] = geometry
+        feature_updates.append(feature_update)
+
+    chunk_size = settings.AGOL_EDIT_CHUNK_SIZE
+    chunks = [("adds", (adds or list())[i:i + chunk_size]) for i in range(0, len(adds or list()), chunk_size)]
+    chunks += [("updates", feature_updates[i:i + chunk_size]) for i in range(0, len(feature_updates), chunk_size)]
+    chunks += [("deletes", (deletes or list())[i:i + chunk_size]) for i in range(0, len(deletes or list()), chunk_size)]
+
+    report = EditReport(added=list(), updated=list(), deleted=list(), missing=list(), failed=list())
+    if not chunks:
+        return report
+
+    arcgis = agol_clients.get(agol_account)
+    edits_url = f"{agol_account.feature_service_url}/{layer_id}/applyEdits"
+
+    with ThreadPoolExecutor(max_workers=min(settings.AGOL_EDIT_MAX_WORKERS, len(chunks))) as executor:
+        futures = {executor.submit(_apply_edits_chunk, arcgis, edits_url, operation, chunk): (operation, chunk)
+                   for operation, chunk in chunks}
+
+        for future in as_completed(futures):
+            operation, chunk = futures[future]
+            try:
+                results = future.result()
+            except saw.exceptions.ArcGISException as e:
+                report.failed.extend([(operation, _get_edit_id(operation, edit), str(e)) for edit in chunk])
+                continue
+
+            for result in results:
+                error = result.get("error") or dict()
+                if result.get("success"):
+                    getattr(report, EDIT_OPERATIONS[operation]).append(result["objectId"])
+                elif error.get("code") == MISSING_FEATURE_ERROR_CODE:
+                    report.missing.append(result.get("objectId"))
+                else:
+                    message = error.get("description", "edit failed")
+                    report.failed.append((operation, result.get("objectId"), message))
+
+    return report
+
 
 def create_custom_source_feature_layer(
     title, description, feature_service, agol_account
@@ -159,12 +334,7 @@ def create_realtime_feature_layer(title, feature_service, agol_account):
 
 def _create_feature_layer(title, fields, feature_service, agol_account, description=""):
 
-    arcgis = saw.ArcgisAPI(
-        access_token=agol_account.oauth_access_token,
-        refresh_token=agol_account.oauth_refresh_token,
-        username=agol_account.username,
-        client_id=settings.AGOL_CLIENT_ID,
-    )
+    arcgis = agol_clients.get(agol_account)
 
     feature_layer = arcgis.services.create_feature_layer(
         layer_type="point",
@@ -182,12 +352,7 @@ def _create_feature_layer(title, fields, feature_service, agol_account, descript
 
 def _create_table(title, fields, feature_service, agol_account, description=""):
 
-    arcgis = saw.ArcgisAPI(
-        access_token=agol_account.oauth_access_token,
-        refresh_token=agol_account.oauth_refresh_token,
-        username=agol_account.username,
-        client_id=settings.AGOL_CLIENT_ID,
-    )
+    arcgis = agol_clients.get(agol_account)
 
     table = arcgis.services.create_table(
         name=title,
@@ -201,12 +366,7 @@ def _create_table(title, fields, feature_service, agol_account, description=""):
 
 def delete_feature_layers(layer_ids, feature_service_url, agol_account):
 
-    arcgis = saw.ArcgisAPI(
-        access_token=agol_account.oauth_access_token,
-        refresh_token=agol_account.oauth_refresh_token,
-        username=agol_account.username,
-        client_id=settings.AGOL_CLIENT_ID,
-    )
+    arcgis = agol_clients.get(agol_account)
 
     return arcgis.services.delete_feature_layers(layer_ids, feature_service_url)
 
@@ -243,14 +403,23 @@ def get_jackal_features(device_id, layer_id, agol_account):
     )
 
 
-def _get_features(out_fields, where, layer_id, agol_account):
+def _get_object_ids(where, layer_id, agol_account):
+
+    arcgis = agol_clients.get(agol_account)
 
-    arcgis = saw.ArcgisAPI(
-        access_token=agol_account.oauth_access_token,
-        refresh_token=agol_account.oauth_refresh_token,
-        username=agol_account.username,
-        client_id=settings.AGOL_CLIENT_ID,
+    res = arcgis.requester.POST(
+        f"{agol_account.feature_service_url}/{layer_id}/query",
+        {"where": where, "returnIdsOnly": "true"}
     )
+    if res.get("error"):
+        raise saw.exceptions.ArcGISException(res["error"].get("message", "query error"))
+
+    return res.get("objectIds") or list()
+
+
+def _get_features(out_fields, where, layer_id, agol_account):
+
+    arcgis = agol_clients.get(agol_account)
 
     return arcgis.services.get_features(
         out_fields=out_fields,
@@ -260,14 +429,34 @@ def _get_features(out_fields, where, layer_id, agol_account):
     )
 
 
-def get_or_create_caracal_feature_service(agol_account):
+def get_device_object_ids(device_id, agol_connection):
+    """
+    Returns the OBJECTIDs of a device's features in the connection's layer from the local index. Only features
+    added since the index was last updated are queried, OBJECTIDs are assigned in increasing order. The index
+    starts over if the connection's layer has been recreated.
+    """
 
-    arcgis = saw.ArcgisAPI(
-        access_token=agol_account.oauth_access_token,
-        refresh_token=agol_account.oauth_refresh_token,
-        username=agol_account.username,
-        client_id=settings.AGOL_CLIENT_ID,
+    index, _ = AgolFeatureIndex.objects.get_or_create(connection=agol_connection, device_id=device_id)
+    if index.agol_layer_id != agol_connection.agol_layer_id:
+        index.reset(agol_connection.agol_layer_id)
+
+    escaped_device_id = device_id.replace("'", "''")
+
+    # returnIdsOnly is not capped at the layer's max record count so one query returns every new feature
+    object_ids = _get_object_ids(
+        where=f"DeviceId = '{escaped_device_id}' AND OBJECTID > {index.max_object_id}",
+        layer_id=agol_connection.agol_layer_id,
+        agol_account=agol_connection.agol_account,
     )
+    if object_ids:
+        record_device_object_ids(device_id, object_ids, agol_connection, index=index)
+
+    return index.get_object_ids()
+
+
+def get_or_create_caracal_feature_service(agol_account):
+
+    arcgis = agol_clients.get(agol_account)
 
     feature_service = arcgis.services.get_feature_service(
         name=CARACAL_SERVICE_NAME, owner_username=agol_account.username
@@ -280,7 +469,7 @@ def get_or_create_caracal_feature_service(agol_account):
         
     agol_account.feature_service_url = feature_service.url
     agol_account.feature_service_id = feature_service.id
-    agol_account.save()
+    agol_account.save(update_fields=['feature_service_url', 'feature_service_id']) # tokens may be newer in the db
 
     return feature_service
 
@@ -288,28 +477,79 @@ def get_or_create_caracal_feature_service(agol_account):
 def is_account_connected(agol_account):
     "Checks if account is connect by checking if refresh token is active."
 
-    arcgis = saw.ArcgisAPI(
-        access_token=agol_account.oauth_access_token,
-        refresh_token=agol_account.oauth_refresh_token,
-        username=agol_account.username,
-        client_id=settings.AGOL_CLIENT_ID,
-    )
+    arcgis = agol_clients.get(agol_account)
 
     return arcgis.requester.is_refresh_token_active()
 
 
-def update_features(updates, layer_id, agol_account):
-    "docs"
+def record_device_object_ids(device_id, object_ids, agol_connection, index=None):
+    "Adds the OBJECTIDs of features added for a device to the connection's index."
 
-    # TODO: validate updates?
+    if index is None:
+        index, _ = AgolFeatureIndex.objects.get_or_create(connection=agol_connection, device_id=device_id)
 
-    arcgis = saw.ArcgisAPI(
-        access_token=agol_account.oauth_access_token,
-        refresh_token=agol_account.oauth_refresh_token,
-        username=agol_account.username,
-        client_id=settings.AGOL_CLIENT_ID,
-    )
+    index.add_object_ids(object_ids)
+    index.datetime_updated = get_utc_datetime_now()
+    index.save()
 
-    return arcgis.services.update_features(
-        updates, layer_id, agol_account.feature_service_url
-    )
+
+def update_device_features(device_id, attributes, agol_connection):
+    """
+    Sets the attributes on every feature of the device in the connection's layer. Features deleted in AGOL are
+    dropped from the index rather than counted as failures. Returns the number of features that failed.
+    """
+
+    object_ids = get_device_object_ids(device_id, agol_connection)
+
+    print(f"Updating {len(object_ids)} features")
+    updates = [(object_id, attributes, None) for object_id in object_ids]
+    report = apply_edits(agol_connection.agol_layer_id, agol_connection.agol_account, updates=updates)
+
+    if report.missing:
+        index = AgolFeatureIndex.objects.get(connection=agol_connection, device_id=device_id)
+        index.remove_object_ids(report.missing)
+        index.save()
+
+    if report.failed:
+        print(f"{len(report.failed)} of {len(updates)} feature updates failed")
+
+    return len(report.failed)
+
+
+def update_features(updates, layer_id, agol_account):
+    "Updates are (id, attributes, geometry) tuples, returns {id: success}."
+
+    report = apply_edits(layer_id, agol_account, updates=updates)
+    if report.failed:
+        print(f"{len(report.failed)} of {len(updates)} feature updates failed")
+
+    # features that no longer exist have nothing left to update
+    results = {object_id: True for object_id in report.updated + report.missing}
+    results.update({object_id: False for _, object_id, _ in report.failed})
+    return results
+
+
+def _apply_edits_chunk(arcgis, edits_url, operation, chunk):
+
+    if operation == "deletes":
+        data = {"deletes": ",".join([str(object_id) for object_id in chunk])}
+    else:
+        data = {operation: json.dumps(chunk)}
+    data["rollbackOnFailure"] = "false"
+
+    for attempt in range(settings.AGOL_EDIT_MAX_RETRIES + 1):
+        try:
+            res = arcgis.requester.POST(edits_url, dict(data))
+            if res.get("error"):
+                raise saw.exceptions.ArcGISException(res["error"].get("message", "applyEdits error"))
+            return res.get(f"{operation[:-1]}Results", list())
+        except (saw.exceptions.ArcGISException, requests.exceptions.RequestException) as e:
+            if attempt == settings.AGOL_EDIT_MAX_RETRIES:
+                raise saw.exceptions.ArcGISException(str(e))
+            time.sleep(settings.AGOL_EDIT_RETRY_BACKOFF_SECONDS * 2 ** attempt)
+
+
+def _get_edit_id(operation, edit):
+    if operation == "deletes":
+        return edit
+    return edit.get("attributes", dict()).get("OBJECTID")
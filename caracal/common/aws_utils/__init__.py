@@ -1,14 +1,80 @@
 
 import boto3
+from botocore.config import Config
 from django.conf import settings
+import threading
+import time
+
+from caracal.common.metrics import metrics
+
+
+_clients = dict()
+_clients_lock = threading.Lock()
 
 
 def get_boto_client(service):
+    """
+    Returns the process-wide client for the service. boto3 clients are thread safe and keep their connection
+    pool alive between calls, so they are created once rather than per call.
+    """
+
+    client = _clients.get(service)
+    if client is not None:
+        return client
+
+    with _clients_lock:
+        client = _clients.get(service)
+        if client is None:
+            client = _clients[service] = _create_client(service)
+
+    return client
+
+
+def clear_boto_clients():
+    with _clients_lock:
+        _clients.clear()
+
+
+def _create_client(service):
+
+    config = Config(
+        connect_timeout=settings.AWS_CONNECT_TIMEOUT_SECONDS,
+        read_timeout=settings.AWS_READ_TIMEOUT_SECONDS,
+        max_pool_connections=settings.AWS_MAX_POOL_CONNECTIONS,
+        retries={'max_attempts': settings.AWS_MAX_RETRY_ATTEMPTS}
+    )
+
+    # sessions are not thread safe, so each client gets its own
+    session = boto3.session.Session(
+        aws_access_key_id=settings.AWS_ACCESS_KEY_ID,
+        aws_secret_access_key=settings.AWS_SECRET_ACCESS_KEY,
+        region_name=settings.AWS_REGION
+    )
+    client = session.client(service, config=config)
+
+    client.meta.events.register('before-call', _start_call_timer)
+    client.meta.events.register('after-call', _record_call)
+    client.meta.events.register('after-call-error', _record_call_error)
+
+    return client
+
+
+def _get_call_name(model):
+    return f'{model.service_model.service_name}.{model.name}'
+
+
+def _record_call(model, context, http_response=None, **kwargs):
+    start = context.pop('caracal_call_start', None)
+    if start is None:
+        return
+
+    error = http_response is None or http_response.status_code >= 300
+    metrics.record('aws', _get_call_name(model), (time.monotonic() - start) * 1000, error=error)
+
+
+def _record_call_error(model, context, **kwargs):
+    _record_call(model, context)
 
-    params = {
-        'aws_access_key_id': settings.AWS_ACCESS_KEY_ID,
-        'aws_secret_access_key': settings.AWS_SECRET_ACCESS_KEY,
-        'region_name': settings.AWS_REGION
-    }
 
-    return boto3.client(service, **params)
+def _start_call_timer(model, context, **kwargs):
+    context['caracal_call_start'] = time.monotonic()
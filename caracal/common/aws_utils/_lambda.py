@@ -1,25 +1,48 @@
 
+from concurrent.futures import ThreadPoolExecutor
+from django.conf import settings
 import json
+import threading
 
 from caracal.common.aws_utils import get_boto_client
 
 
+_functions = dict() # function name: {'arn', 'name'}, names include the stage
+_permitted = set() # (function name, source arn) known to have the invoke permission
+_lock = threading.Lock()
+
+
 def get_lambda_function(function_name):
+    "Returns the function's arn and name, looked up once per process since they never change."
+
+    function = _functions.get(function_name)
+    if function is not None:
+        return function
 
     client = get_boto_client('lambda')
 
     fn_response = client.get_function(FunctionName=function_name)
 
-    return {
+    function = {
         'arn': fn_response['Configuration']['FunctionArn'],
         'name': fn_response['Configuration']['FunctionName']
     }
 
+    with _lock:
+        _functions[function_name] = function
+
+    return function
+
+
+def clear_lambda_caches():
+    with _lock:
+        _functions.clear()
+        _permitted.clear()
+
 
 def schedule_lambda_function(fn_arn, fn_name, rule_input, rule_name, rate_minutes):
 
     events_client = get_boto_client('events')
-    lambda_client = get_boto_client('lambda')
 
     # 1. Create/update rule
     rule_response = events_client.put_rule(
@@ -31,19 +54,9 @@ def schedule_lambda_function(fn_arn, fn_name, rule_input, rule_name, rate_minute
     # use wildcard rule and default statement so policy size is not exceeded
     rule_parts = rule_response['RuleArn'].split('rule/')
     source_arn = f'{rule_parts[0]}rule/*'
-    statement_id = f'{fn_name}-event'
 
     # 2. Allow rule to trigger Lambda function
-    try:
-        lambda_client.add_permission(
-            FunctionName=fn_name,
-            StatementId=statement_id,
-            Action='lambda:InvokeFunction',
-            Principal='events.amazonaws.com',
-            SourceArn=source_arn
-        )
-    except lambda_client.exceptions.ResourceConflictException:
-        print("permission already exists")
+    _add_invoke_permission(fn_name, source_arn)
 
     # 3. Map rule to Lambda function - need to call this even if permission already added
     events_client.put_targets(
@@ -58,3 +71,53 @@ def schedule_lambda_function(fn_arn, fn_name, rule_input, rule_name, rate_minute
     )
 
 
+def schedule_lambda_functions(schedules):
+    """
+    Schedules several functions concurrently, schedules are dicts of schedule_lambda_function's kwargs.
+    Either all rules are created or, if any fails, all of them are deleted and the error is raised.
+    """
+
+    def schedule(kwargs):
+        try:
+            schedule_lambda_function(**kwargs)
+        except Exception as e:
+            return e
+
+    with ThreadPoolExecutor(max_workers=settings.AWS_MAX_SCHEDULE_WORKERS) as executor:
+        errors = [e for e in executor.map(schedule, schedules) if e is not None]
+
+    if len(errors) > 0:
+        for kwargs in schedules:
+            _delete_rule_quietly(kwargs['rule_name'])
+        raise errors[0]
+
+
+def _add_invoke_permission(fn_name, source_arn):
+    if (fn_name, source_arn) in _permitted:
+        return
+
+    lambda_client = get_boto_client('lambda')
+    try:
+        lambda_client.add_permission(
+            FunctionName=fn_name,
+            StatementId=f'{fn_name}-event',
+            Action='lambda:InvokeFunction',
+            Principal='events.amazonaws.com',
+            SourceArn=source_arn
+        )
+    except lambda_client.exceptions.ResourceConflictException:
+        print("permission already exists")
+
+    with _lock:
+        _permitted.add((fn_name, source_arn))
+
+
+def _delete_rule_quietly(rule_name):
+    events_client = get_boto_client('events')
+    try:
+        events_client.remove_targets(Rule=rule_name, Ids=["1"])
+        events_client.delete_rule(Name=rule_name)
+    except events_client.exceptions.ResourceNotFoundException:
+        pass
+    except Exception as e: # the original error is raised instead
+        print(f'could not roll back rule {rule_name}: {e}')
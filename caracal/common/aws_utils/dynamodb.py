@@ -51,15 +51,16 @@ def get_dynamodb_credentials(short_name):
 
 
 def get_global_config():
+    "Scans the whole config table, use caracal.common.global_config for the cached config."
 
     client = get_boto_client('dynamodb')
+    paginator = client.get_paginator('scan')
 
-    data = client.scan(
-        TableName=settings.DYNAMO_CONFIG_TABLE_NAME,
-    )
+    config = dict()
+    for page in paginator.paginate(TableName=settings.DYNAMO_CONFIG_TABLE_NAME, ConsistentRead=True):
+        items = dynamodb_json_util.loads(page['Items'])
+        config.update({item['name']: item['value'] for item in items})
 
-    items = dynamodb_json_util.loads(data['Items'])
-    config = {item['name']: item['value'] for item in items}
     return config
 
 
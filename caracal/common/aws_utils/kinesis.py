@@ -1,18 +1,53 @@
 
+from botocore.exceptions import BotoCoreError, ClientError
 import json
 
 from caracal.common.aws_utils import get_boto_client
 
 
-def put_firehose_record(payload, stream_name):
+FIREHOSE_MAX_BATCH_RECORDS = 500 # put_record_batch limit
 
-    # newline is the record deliminator so remove it from inside the record
-    data = json.dumps(payload).replace('\n', '')
+
+def put_firehose_record(payload, stream_name):
 
     client = get_boto_client('firehose')
     client.put_record(
         DeliveryStreamName=stream_name,
         Record={
-            'Data': data + '\n'
+            'Data': _get_record_data(payload)
         }
     )
+
+
+def put_firehose_records(payloads, stream_name):
+    "Puts records in batches and returns the indexes of the records that were not delivered."
+
+    client = get_boto_client('firehose')
+
+    failed_indexes = list()
+    for start in range(0, len(payloads), FIREHOSE_MAX_BATCH_RECORDS):
+        batch = payloads[start:start + FIREHOSE_MAX_BATCH_RECORDS]
+
+        # earlier batches are already delivered, so a failed call only fails this batch's records
+        try:
+            response = client.put_record_batch(
+                DeliveryStreamName=stream_name,
+                Records=[{'Data': _get_record_data(payload)} for payload in batch]
+            )
+        except (BotoCoreError, ClientError) as e:
+            print(f'{stream_name}: could not put batch of {len(batch)}: {e}')
+            failed_indexes.extend(range(start, start + len(batch)))
+            continue
+
+        if response['FailedPutCount'] > 0:
+            for i, record_response in enumerate(response['RequestResponses']):
+                if 'ErrorCode' in record_response:
+                    failed_indexes.append(start + i)
+
+    return failed_indexes
+
+
+def _get_record_data(payload):
+    # newline is the record deliminator so remove it from inside the record
+    data = json.dumps(payload).replace('\n', '')
+    return data + '\n'
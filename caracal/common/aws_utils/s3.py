@@ -1,33 +1,58 @@
 
+from cachetools import LRUCache
+from django.conf import settings
+import threading
+import time
+
 from caracal.common.aws_utils import get_boto_client
 
 
+_presigned_urls = LRUCache(maxsize=settings.S3_PRESIGN_CACHE_MAX_SIZE) # (bucket, key, expiration, version): (url, reuse until)
+_presigned_urls_lock = threading.Lock()
+
+
 def get_files(prefix, suffix, bucket_name):
 
+    return list(iter_object_keys(prefix, bucket_name, suffix=suffix))
+
+
+def iter_object_keys(prefix, bucket_name, suffix=None):
+    "Yields the url encoded keys under the prefix one page at a time, following continuation tokens."
+
     s3_client = get_boto_client('s3')
+    paginator = s3_client.get_paginator('list_objects_v2')
 
-    response = s3_client.list_objects(
-        Bucket=bucket_name,
-        EncodingType='url',
-        Prefix=prefix
-    )
+    for page in paginator.paginate(Bucket=bucket_name, EncodingType='url', Prefix=prefix):
+        for content in page.get('Contents', list()):
+            if suffix is None or content['Key'].endswith(suffix):
+                yield content['Key']
 
-    is_truncated = response['IsTruncated']
-    next_marker = response.get('NextMarker') # if is_truncated, use next_marker
-    contents = response.get('Contents', None)
-    if contents is not None:
-        objects = [c['Key'] for c in contents if c['Key'].endswith(suffix)]
-        return objects
-    else:
-        return []
 
+def get_presigned_url(object_key, bucket, expiration_secs, version=None, reuse=True):
+    """
+    Returns the same url for the object until S3_PRESIGN_REUSE_FRACTION of its lifetime has passed so browsers
+    can cache the object. Objects overwritten under the same key need a version, i.e. when they were written,
+    so every process signs a new url once it changes, or reuse=False if there is no version to hand.
+    """
 
-def get_presigned_url(object_key, bucket, expiration_secs):
+    cache_key = (bucket, object_key, expiration_secs, version)
+    if reuse:
+        with _presigned_urls_lock:
+            url, reuse_until = _presigned_urls.get(cache_key, (None, 0))
+        if time.time() < reuse_until:
+            return url
 
     client = get_boto_client('s3')
 
+    reuse_until = time.time() + expiration_secs * settings.S3_PRESIGN_REUSE_FRACTION
     url = client.generate_presigned_url('get_object', Params={'Bucket': bucket, 'Key': object_key},
                                         ExpiresIn=expiration_secs)
+    if not reuse:
+        return url
+
+    with _presigned_urls_lock:
+        _presigned_urls[cache_key] = (url, reuse_until)
+
     return url
 
 
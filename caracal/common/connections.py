@@ -2,7 +2,8 @@ from datetime import datetime, timezone
 from django.conf import settings
 
 from caracal.common import agol
-from caracal.common.aws_utils import cloudwatch, _lambda
+from caracal.common.aws_utils import _lambda
+from jobs import queue, schedules
 from outputs.models import AgolAccount, DataConnection
 
 
@@ -21,13 +22,16 @@ def delete_realtime_agol(agol_account=None, realtime_account=None, connection=No
 
     agol_account = connection.agol_account
 
-    agol.delete_feature_layers(
-        layer_ids=[connection.agol_layer_id], #, connection.agol_individual_layer_id],
-        feature_service_url=agol_account.feature_service_url,
-        agol_account=agol_account,
-    )
+    # the layer and rule are missing if the provisioning job has not run yet
+    if connection.agol_layer_id is not None:
+        agol.delete_feature_layers(
+            layer_ids=[connection.agol_layer_id], #, connection.agol_individual_layer_id],
+            feature_service_url=agol_account.feature_service_url,
+            agol_account=agol_account,
+        )
 
-    cloudwatch.delete_cloudwatch_rule(connection.cloudwatch_update_rule_name)
+    if connection.cloudwatch_update_rule_name is not None:
+        schedules.delete_schedule(connection.cloudwatch_update_rule_name)
 
     connection.delete()
 
@@ -42,7 +46,7 @@ def delete_realtime_kml(realtime_account):
             ","
         )
         for rule_name in update_kml_rule_names:
-            cloudwatch.delete_cloudwatch_rule(rule_name)
+            schedules.delete_schedule(rule_name)
 
     realtime_account.cloudwatch_update_kml_rule_names = None
     realtime_account.save()
@@ -56,41 +60,14 @@ def schedule_realtime_outputs(
     organization = user.organization
 
     if data.get("output_agol", False) and agol_account is not None:
-        # create a connection and schedule update
+        # create a connection, the AGOL layer and update schedule are created by a job
         connection = DataConnection.objects.create(
             organization=organization,
             account=user,
             realtime_account=realtime_account,
             agol_account=agol_account,
         )
-
-        _schedule_realtime_agol(
-            type=_type,
-            source=source,
-            realtime_account=realtime_account,
-            connection=connection,
-            organization=organization,
-        )
-
-        feature_service = agol.get_or_create_caracal_feature_service(agol_account)
-        layer_everything = agol.create_realtime_feature_layer(
-            title=realtime_account.title,
-            feature_service=feature_service,
-            agol_account=agol_account,
-        )
-
-        """
-        individual_layer_title = f"{realtime_account.title} - Individuals"
-        layer_individuals = agol.create_realtime_feature_layer(
-            title=individual_layer_title,
-            feature_service=feature_service,
-            agol_account=agol_account,
-        )
-        connection.agol_individual_layer_id = layer_individuals.id
-        """
-
-        connection.agol_layer_id = layer_everything.id
-        connection.save()
+        _enqueue_provision_realtime_agol(connection)
 
     if data.get("output_kml", False):
         _schedule_realtime_kml(
@@ -141,49 +118,83 @@ def update_realtime_outputs(data, realtime_account, user):
 
             if output_agol:
 
-                # create a connection and schedule update
+                # create a connection, the AGOL layer and update schedule are created by a job
                 connection = DataConnection.objects.create(
                     organization=user.organization,
                     account=user,
                     realtime_account=realtime_account,
-                    agol_account=user.agol_account,
+                    agol_account=agol_account,
                 )
+                _enqueue_provision_realtime_agol(connection)
 
-                # schedule the Lambda AGOL update
-                _schedule_realtime_agol(
-                    type=realtime_account.type,
-                    source=realtime_account.source,
-                    realtime_account=realtime_account,
-                    connection=connection,
-                    organization=user.organization,
-                )
+            else:
+                delete_realtime_agol(connection=connection)
 
-                # create the AGOL resources (service and layers)
-                feature_service = agol.get_or_create_caracal_feature_service(
-                    agol_account
-                )
-                layer_everything = agol.create_realtime_feature_layer(
-                    title=realtime_account.title,
-                    feature_service=feature_service,
-                    agol_account=agol_account,
-                )
 
-                """
-                individual_layer_title = f"{realtime_account.title} - Individuals"
-                layer_individuals = agol.create_realtime_feature_layer(
-                    title=individual_layer_title,
-                    feature_service=feature_service,
-                    agol_account=agol_account,
-                )
-                connection.agol_individual_layer_id = layer_individuals.id
-                """
+def provision_realtime_agol(connection_id):
+    """
+    Creates the AGOL layer and schedules the Lambda AGOL update of a connection. Runs as a job, so whatever
+    already exists is skipped and resources created for a connection deleted in the meantime are removed.
+    """
 
-                # update the connection
-                connection.agol_layer_id = layer_everything.id
-                connection.save()
+    try:
+        connection = DataConnection.objects.select_related(
+            "agol_account", "organization", "realtime_account"
+        ).get(pk=connection_id)
+    except DataConnection.DoesNotExist:
+        print("connection deleted before provisioning, no problem")
+        return
 
-            else:
-                delete_realtime_agol(connection=connection)
+    realtime_account = connection.realtime_account
+    agol_account = connection.agol_account
+
+    if connection.agol_layer_id is None:
+        feature_service = agol.get_or_create_caracal_feature_service(agol_account)
+        layer_everything = agol.create_realtime_feature_layer(
+            title=realtime_account.title,
+            feature_service=feature_service,
+            agol_account=agol_account,
+        )
+
+        """
+        individual_layer_title = f"{realtime_account.title} - Individuals"
+        layer_individuals = agol.create_realtime_feature_layer(
+            title=individual_layer_title,
+            feature_service=feature_service,
+            agol_account=agol_account,
+        )
+        connection.agol_individual_layer_id = layer_individuals.id
+        """
+
+        # the connection was deleted while the layer was created
+        if not DataConnection.objects.filter(pk=connection_id).update(agol_layer_id=layer_everything.id):
+            agol.delete_feature_layers(
+                layer_ids=[layer_everything.id],
+                feature_service_url=agol_account.feature_service_url,
+                agol_account=agol_account,
+            )
+            return
+
+    if connection.cloudwatch_update_rule_name is None:
+        rule_name = _schedule_realtime_agol(
+            type=realtime_account.type,
+            source=realtime_account.source,
+            realtime_account=realtime_account,
+            connection=connection,
+            organization=connection.organization,
+        )
+
+        if not DataConnection.objects.filter(pk=connection_id).update(cloudwatch_update_rule_name=rule_name):
+            schedules.delete_schedule(rule_name)
+
+
+def _enqueue_provision_realtime_agol(connection):
+    return queue.enqueue(
+        "outputs.provision_realtime_agol",
+        {"connection_id": connection.pk},
+        organization=connection.organization,
+        idempotency_key=f"outputs.provision_realtime_agol:{connection.pk}",
+    )
 
 
 def _get_realtime_update_agol_rule_name(
@@ -227,7 +238,7 @@ def _get_realtime_update_kml_rule_name(
 
 
 def _schedule_realtime_agol(type, source, realtime_account, connection, organization):
-    "Schedules Lambda function that gets data from RDS and outputs to AGOL."
+    "Schedules Lambda function that gets data from RDS and outputs to AGOL, returns the rule name."
 
     # TODO: schedule individual
 
@@ -243,7 +254,7 @@ def _schedule_realtime_agol(type, source, realtime_account, connection, organiza
         short_name, realtime_account.uid, settings.STAGE, type, source
     )
 
-    _lambda.schedule_lambda_function(
+    schedules.schedule_lambda_function(
         update_agol_function["arn"],
         update_agol_function["name"],
         update_agol_input,
@@ -251,8 +262,7 @@ def _schedule_realtime_agol(type, source, realtime_account, connection, organiza
         settings.AGOL_UPDATE_RATE_MINUTES,
     )
 
-    connection.cloudwatch_update_rule_name = rule_name
-    connection.save()
+    return rule_name
 
 
 def _schedule_realtime_kml(type, source, realtime_account, organization):
@@ -261,7 +271,7 @@ def _schedule_realtime_kml(type, source, realtime_account, organization):
     function_name = f"caracal_{settings.STAGE.lower()}_update_realtime_kml"
     update_kml_function = _lambda.get_lambda_function(function_name)
 
-    rule_names = list()
+    rule_names, kml_schedules = list(), list()
     for period in settings.KML_PERIOD_HOURS:
 
         rate_minutes = int(period / 2.5)  # longer for larger periods
@@ -278,13 +288,15 @@ def _schedule_realtime_kml(type, source, realtime_account, organization):
         )
         rule_names.append(rule_name)
 
-        _lambda.schedule_lambda_function(
-            update_kml_function["arn"],
-            update_kml_function["name"],
-            update_kml_input,
-            rule_name,
-            rate_minutes,
-        )
+        kml_schedules.append({
+            "fn_arn": update_kml_function["arn"],
+            "fn_name": update_kml_function["name"],
+            "rule_input": update_kml_input,
+            "rule_name": rule_name,
+            "rate_minutes": rate_minutes,
+        })
+
+    schedules.schedule_lambda_functions(kml_schedules)
 
     realtime_account.cloudwatch_update_kml_rule_names = ",".join(rule_names)
     realtime_account.save()
@@ -32,6 +32,8 @@ OUTPUT_TYPES = [('output_agol', 'output_agol'),
 
 REGISTRATION_METHODS = [('email', 'email'), ('google', 'google')]
 
+ROLLUP_PERIODS = [('hour', 'hour'), ('day', 'day')]
+
 RT_ACCOUNT_SOURCES = [('collar', 'collar'), ('radio', 'radio')]
 
 SEXES = [('male', 'male'), ('female', 'female')]
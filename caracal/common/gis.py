@@ -1,13 +1,161 @@
+from django.contrib.gis.db.models import LineStringField
+from django.contrib.postgres.aggregates.mixins import OrderableAggMixin
+from django.db.models import Aggregate, FloatField, Func
+import numpy as np
 
 
+EARTH_RADIUS_KM = 6371.0088 # mean radius
+PATH_CHUNK_SIZE = 10000
+
+
+class GeographyLengthKm(Func):
+    "Geodesic length in km of a geometry in a geographic SRID."
+
+    template = 'ST_Length(%(expressions)s::geography) / 1000'
+    output_field = FloatField()
+
+
+class MakeLine(OrderableAggMixin, Aggregate):
+    "Aggregates points into a line, i.e. MakeLine('position', ordering='datetime_recorded')."
+
+    function = 'ST_MakeLine'
+    template = '%(function)s(%(distinct)s%(expressions)s %(ordering)s)'
+    output_field = LineStringField()
+
+
+class PathAccumulator:
+    """
+    Accumulates path metrics over chunks of a time ordered track so the whole track never has to be in memory.
+    Chunks are joined with the last point of the previous chunk.
+    """
+
+    def __init__(self):
+        self.num_points = 0
+        self.distance_km = 0.0
+        self.max_speed_kmh = None
+        self.bbox = None # [min_lon, min_lat, max_lon, max_lat]
+        self.first_time = None
+        self.last_time = None
+        self._last = None # (lon, lat, time)
+
+    def add(self, lons, lats, times=None):
+        lons, lats = np.asarray(lons, dtype=float), np.asarray(lats, dtype=float)
+        times = np.asarray(times, dtype=float) if times is not None else None
+        if lons.size == 0:
+            return
+
+        chunk_bbox = [lons.min(), lats.min(), lons.max(), lats.max()]
+        if self.bbox is None:
+            self.bbox = chunk_bbox
+        else:
+            self.bbox = [min(self.bbox[0], chunk_bbox[0]), min(self.bbox[1], chunk_bbox[1]),
+                         max(self.bbox[2], chunk_bbox[2]), max(self.bbox[3], chunk_bbox[3])]
+
+        if self._last is not None:
+            lons = np.insert(lons, 0, self._last[0])
+            lats = np.insert(lats, 0, self._last[1])
+            if times is not None:
+                times = np.insert(times, 0, self._last[2])
+
+        metrics = get_path_metrics(lons, lats, times)
+        self.distance_km += metrics['distance_km']
+        if metrics['max_speed_kmh'] is not None:
+            self.max_speed_kmh = max(self.max_speed_kmh or 0.0, metrics['max_speed_kmh'])
+
+        if times is not None:
+            self.first_time = times[0] if self.first_time is None else self.first_time
+            self.last_time = times[-1]
+
+        self.num_points += lons.size - (1 if self._last is not None else 0)
+        self._last = (lons[-1], lats[-1], times[-1] if times is not None else None)
+
+    def get_metrics(self):
+        "Duration and mean speed are None without times, the mean speed also when no time elapsed."
+
+        duration_hours = float(self.last_time - self.first_time) / 3600 if self.first_time is not None else None
+        return {
+            'num_points': self.num_points,
+            'distance_km': round(self.distance_km, 2),
+            'duration_hours': round(duration_hours, 2) if duration_hours is not None else None,
+            'mean_speed_kmh': round(self.distance_km / duration_hours, 2) if duration_hours else None,
+            'max_speed_kmh': round(self.max_speed_kmh, 2) if self.max_speed_kmh is not None else None,
+            'bbox': [round(float(value), 6) for value in self.bbox] if self.bbox is not None else None,
+        }
+
+
+def annotate_lon_lat(queryset, position_field='position'):
+    "Annotates lon and lat so rows can be read without building GEOS points."
+
+    return queryset.annotate(
+        lon=Func(position_field, function='ST_X', output_field=FloatField()),
+        lat=Func(position_field, function='ST_Y', output_field=FloatField())
+    )
+
+
+def get_haversine_km(lons1, lats1, lons2, lats2):
+    "Great circle distances in km between arrays of points in degrees."
+
+    lons1, lats1, lons2, lats2 = map(np.radians, [lons1, lats1, lons2, lats2])
+
+    a = np.sin((lats2 - lats1) / 2) ** 2 + \
+        np.cos(lats1) * np.cos(lats2) * np.sin((lons2 - lons1) / 2) ** 2
+
+    return 2 * EARTH_RADIUS_KM * np.arcsin(np.sqrt(np.clip(a, 0, 1)))
+
+
+def get_path_metrics(lons, lats, times=None):
+    """
+    Metrics for a time ordered track. times are epoch seconds, speeds are only calculated when they are given
+    and segments with no elapsed time are skipped.
+    """
+
+    lons, lats = np.asarray(lons, dtype=float), np.asarray(lats, dtype=float)
+
+    segment_lengths_km = get_haversine_km(lons[:-1], lats[:-1], lons[1:], lats[1:])
+
+    speeds_kmh = None
+    if times is not None:
+        segment_hours = np.diff(np.asarray(times, dtype=float)) / 3600
+        moving = segment_hours > 0
+        speeds_kmh = segment_lengths_km[moving] / segment_hours[moving]
+
+    return {
+        'segment_lengths_km': segment_lengths_km,
+        'speeds_kmh': speeds_kmh,
+        'distance_km': float(segment_lengths_km.sum()),
+        'max_speed_kmh': float(speeds_kmh.max()) if speeds_kmh is not None and speeds_kmh.size > 0 else None,
+        'bbox': [lons.min(), lats.min(), lons.max(), lats.max()] if lons.size > 0 else None,
+    }
+
 
 def get_path_distance_km(points):
+    "Geodesic length in km of a list of GEOS points."
+
+    if len(points) < 2:
+        return 0
+
+    lons = [point.x for point in points]
+    lats = [point.y for point in points]
+
+    return round(get_path_metrics(lons, lats)['distance_km'], 2)
+
+
+def get_queryset_path_metrics(queryset, position_field='position', chunk_size=PATH_CHUNK_SIZE):
+    "Streams the positions of a queryset ordered by datetime_recorded through a PathAccumulator."
+
+    rows = annotate_lon_lat(queryset.filter(datetime_recorded__isnull=False), position_field)\
+        .order_by('datetime_recorded').values_list('lon', 'lat', 'datetime_recorded')
+
+    accumulator = PathAccumulator()
+
+    chunk = list()
+    for row in rows.iterator(chunk_size=chunk_size):
+        chunk.append((row[0], row[1], row[2].timestamp()))
+        if len(chunk) == chunk_size:
+            accumulator.add(*zip(*chunk))
+            chunk = list()
 
-    distance = 0
-    previous_point = None
-    for point in points:
-        if previous_point is not None:
-            distance += previous_point.distance(point) * 100
-        previous_point = point
+    if chunk:
+        accumulator.add(*zip(*chunk))
 
-    return round(distance, 2)
\ No newline at end of file
+    return accumulator.get_metrics()
@@ -0,0 +1,76 @@
+from botocore.exceptions import BotoCoreError, ClientError
+from django.conf import settings
+import hashlib
+import json
+from sentry_sdk import capture_exception
+import threading
+import time
+
+from caracal.common.aws_utils import dynamodb
+
+
+class GlobalConfig:
+    """
+    The DynamoDB global configuration table in memory. Values older than GLOBAL_CONFIG_TTL_SECONDS are still
+    returned while one background thread reloads them, values older than GLOBAL_CONFIG_MAX_STALE_SECONDS are
+    reloaded before returning. The config is shared between threads and must not be modified.
+    """
+
+    def __init__(self):
+        self._state = None # (config, version, monotonic time loaded), swapped as one so readers never mix them
+        self._lock = threading.Lock()
+        self._refreshing = False
+
+    def get(self):
+        return self.get_versioned()[0]
+
+    def get_versioned(self):
+        "Returns (config, version), the version is a hash of the config that changes whenever the table does."
+
+        state = self._state
+        if state is None or time.monotonic() - state[2] > settings.GLOBAL_CONFIG_MAX_STALE_SECONDS:
+            with self._lock:
+                # another thread may have loaded it while this one waited
+                state = self._state
+                if state is None or time.monotonic() - state[2] > settings.GLOBAL_CONFIG_MAX_STALE_SECONDS:
+                    state = self._set(dynamodb.get_global_config())
+
+        elif time.monotonic() - state[2] > settings.GLOBAL_CONFIG_TTL_SECONDS:
+            self.refresh()
+
+        return state[0], state[1]
+
+    def refresh(self):
+        "Starts a background reload unless one is running."
+
+        with self._lock:
+            if self._refreshing:
+                return
+            self._refreshing = True
+
+        threading.Thread(target=self._refresh, daemon=True).start()
+
+    def clear(self):
+        with self._lock:
+            self._state = None
+
+    def _refresh(self):
+        try:
+            config = dynamodb.get_global_config()
+        except (BotoCoreError, ClientError) as e:
+            print(f'global config refresh failed: {e}')
+            capture_exception(e)
+        else:
+            with self._lock:
+                self._set(config)
+        finally:
+            with self._lock:
+                self._refreshing = False
+
+    def _set(self, config):
+        version = hashlib.sha256(json.dumps(config, sort_keys=True, default=str).encode('utf-8')).hexdigest()[:16]
+        self._state = (config, version, time.monotonic())
+        return self._state
+
+
+global_config = GlobalConfig()
@@ -1,7 +1,8 @@
 
 from datetime import datetime, timedelta, timezone
 from django.conf import settings
-import requests
+
+from caracal.common import http
 
 
 def get_extra_headers(sheet_name, drive_account, access_token):
@@ -56,7 +57,7 @@ def get_google_drive_spreadsheet(file_id, access_token):
         'Authorization': f'Bearer {access_token}'
     }
 
-    res = requests.get(url, headers=headers)
+    res = http.get(url, headers=headers)
     return res.json() if res.status_code == 200 else None
 
 
@@ -84,7 +85,7 @@ def get_google_drive_files(file_type, access_token):
         'q': f"mimeType = '{mime_type}'"
     }
 
-    res = requests.get(url, headers=headers, params=params)
+    res = http.get(url, headers=headers, params=params)
     return res.json().get('files', None) if res.status_code == 200 else None
 
 
@@ -95,7 +96,7 @@ def get_sheet_name(sheet_id, file_id, access_token):
         'Authorization': f'Bearer {access_token}'
     }
 
-    res = requests.get(url, headers=headers)
+    res = http.get(url, headers=headers)
 
     for sheet in res.json()['sheets']:
         if str(sheet['properties']['sheetId']).strip() == sheet_id:
@@ -111,7 +112,7 @@ def get_spreadsheet_sheet_data(sheet_name, file_id, access_token):
         'Authorization': f'Bearer {access_token}'
     }
 
-    res = requests.get(url, headers=headers)
+    res = http.get(url, headers=headers)
     return res.json() if res.status_code == 200 else None
 
 
@@ -123,7 +124,7 @@ def get_spreadsheet_sheet_headers(header_row_index, sheet_name, file_id, access_
         'Authorization': f'Bearer {access_token}'
     }
 
-    res = requests.get(url, headers=headers)
+    res = http.get(url, headers=headers)
 
     return res.json() if res.status_code == 200 else dict()
 
@@ -138,7 +139,7 @@ def refresh_google_token(refresh_token):
         'grant_type': 'refresh_token'
     }
 
-    res = requests.post(url=url, data=data)
+    res = http.post(url=url, data=data)
 
     try:
         token_res = res.json()
@@ -0,0 +1,113 @@
+from django.conf import settings
+from http.cookiejar import DefaultCookiePolicy
+import requests
+from requests.adapters import HTTPAdapter
+import threading
+import time
+from urllib.parse import urlparse
+from urllib3.util.retry import Retry
+
+from caracal.common.metrics import metrics
+
+
+class CircuitOpenError(requests.exceptions.ConnectionError):
+    "Raised without calling the host while its circuit is open."
+
+
+class CircuitBreaker:
+    """
+    Opens after HTTP_CIRCUIT_FAILURE_THRESHOLD consecutive failures (connection errors, timeouts or 5xx) to a host.
+    While open, calls fail fast. After HTTP_CIRCUIT_RESET_SECONDS one trial call is let through and its result
+    closes or re-opens the circuit.
+    """
+
+    def __init__(self):
+        self._failures = dict() # host: consecutive failures
+        self._opened = dict() # host: time opened
+        self._trials = set() # hosts with a trial call in flight
+        self._lock = threading.Lock()
+
+    def before_call(self, host):
+        with self._lock:
+            opened = self._opened.get(host)
+            if opened is None:
+                return
+
+            if time.monotonic() - opened < settings.HTTP_CIRCUIT_RESET_SECONDS or host in self._trials:
+                raise CircuitOpenError(f'circuit open for {host}')
+
+            self._trials.add(host)
+
+    def record(self, host, success):
+        with self._lock:
+            self._trials.discard(host)
+
+            if success:
+                self._failures.pop(host, None)
+                self._opened.pop(host, None)
+                return
+
+            self._failures[host] = self._failures.get(host, 0) + 1
+            if self._failures[host] >= settings.HTTP_CIRCUIT_FAILURE_THRESHOLD:
+                if host not in self._opened:
+                    print(f'circuit opened for {host}')
+                self._opened[host] = time.monotonic()
+
+    def get_open_hosts(self):
+        with self._lock:
+            return sorted(self._opened.keys())
+
+
+class Session(requests.Session):
+    """
+    requests session with default timeouts, retries of idempotent requests on connection errors and 502/503/504,
+    a circuit breaker and latency metrics per host. Cookies are never stored since the session is shared.
+    """
+
+    def __init__(self):
+        super().__init__()
+        self.cookies.set_policy(DefaultCookiePolicy(allowed_domains=[]))
+
+        retry = Retry(
+            total=settings.HTTP_MAX_RETRIES,
+            backoff_factor=settings.HTTP_RETRY_BACKOFF_SECONDS,
+            status_forcelist=[502, 503, 504],
+            raise_on_status=False
+        )
+        adapter = HTTPAdapter(pool_connections=settings.HTTP_POOL_HOSTS,
+                              pool_maxsize=settings.HTTP_POOL_MAX_SIZE, max_retries=retry)
+        self.mount('https://', adapter)
+        self.mount('http://', adapter)
+
+        self.circuit_breaker = CircuitBreaker()
+
+    def request(self, method, url, *args, **kwargs):
+        kwargs.setdefault('timeout', (settings.HTTP_CONNECT_TIMEOUT_SECONDS, settings.HTTP_READ_TIMEOUT_SECONDS))
+
+        host = urlparse(url).netloc
+        self.circuit_breaker.before_call(host)
+
+        start = time.monotonic()
+        try:
+            res = super().request(method, url, *args, **kwargs)
+        except requests.exceptions.RequestException:
+            self._record(host, start, success=False)
+            raise
+
+        self._record(host, start, success=res.status_code < 500)
+        return res
+
+    def _record(self, host, start, success):
+        self.circuit_breaker.record(host, success)
+        metrics.record('http', host, (time.monotonic() - start) * 1000, error=not success)
+
+
+session = Session()
+
+
+def get(url, **kwargs):
+    return session.get(url, **kwargs)
+
+
+def post(url, **kwargs):
+    return session.post(url, **kwargs)
@@ -0,0 +1,77 @@
+import os
+import threading
+
+
+LATENCY_BUCKETS_MS = [5, 10, 25, 50, 100, 250, 500, 1000, 2500, 5000, 10000]
+
+
+class LatencyStats:
+    "Call count, error count and latency histogram of one operation."
+
+    def __init__(self):
+        self.count = 0
+        self.errors = 0
+        self.total_ms = 0.0
+        self.max_ms = 0.0
+        self.buckets = [0] * (len(LATENCY_BUCKETS_MS) + 1) # the last bucket is everything slower
+
+    def add(self, ms, error):
+        self.count += 1
+        self.errors += 1 if error else 0
+        self.total_ms += ms
+        self.max_ms = max(self.max_ms, ms)
+
+        for i, bound in enumerate(LATENCY_BUCKETS_MS):
+            if ms <= bound:
+                self.buckets[i] += 1
+                break
+        else:
+            self.buckets[-1] += 1
+
+    def to_dict(self):
+        buckets = {f'le_{bound}': count for bound, count in zip(LATENCY_BUCKETS_MS, self.buckets)}
+        buckets['inf'] = self.buckets[-1]
+
+        return {
+            'count': self.count,
+            'errors': self.errors,
+            'mean_ms': round(self.total_ms / self.count, 1) if self.count > 0 else None,
+            'max_ms': round(self.max_ms, 1),
+            'buckets': buckets
+        }
+
+
+class MetricsRegistry:
+    """
+    Process-wide latency stats grouped by client, i.e. record('aws', 'firehose.PutRecordBatch', 12.5).
+    Each process keeps its own stats.
+    """
+
+    def __init__(self):
+        self._stats = dict()
+        self._lock = threading.Lock()
+
+    def record(self, group, name, ms, error=False):
+        with self._lock:
+            stats = self._stats.setdefault(group, dict()).get(name)
+            if stats is None:
+                stats = self._stats[group][name] = LatencyStats()
+            stats.add(ms, error)
+
+    def get_snapshot(self, group=None):
+        with self._lock:
+            groups = {group: self._stats.get(group, dict())} if group is not None else self._stats
+            return {
+                'pid': os.getpid(),
+                'groups': {
+                    group_name: {name: stats.to_dict() for name, stats in sorted(stats_by_name.items())}
+                    for group_name, stats_by_name in groups.items()
+                }
+            }
+
+    def reset(self):
+        with self._lock:
+            self._stats.clear()
+
+
+metrics = MetricsRegistry()
@@ -1,11 +1,39 @@
 
-from datetime import datetime, timezone
+from datetime import datetime, timedelta, timezone
 from django.conf import settings
 from django.contrib.gis.db import models
+from django.contrib.postgres.indexes import BrinIndex
+from django.db.models import OuterRef, Subquery
+from django.db.models.functions import Coalesce
 import uuid
 
 from account.models import Organization
 from caracal.common import constants
+from caracal.common.gis import GeographyLengthKm, MakeLine
+
+
+def annotate_individual_metrics(individuals, distance_day=True):
+    "Annotates individuals with datetime_last_position and, unless distance_day is False, distance_day (km)."
+
+    last_position = RealTimePosition.objects.filter(individual=OuterRef('pk'), datetime_recorded__isnull=False)\
+        .order_by('-datetime_recorded').values('datetime_recorded')[:1]
+    individuals = individuals.annotate(
+        datetime_last_position=Subquery(last_position, output_field=models.DateTimeField())
+    )
+
+    if not distance_day:
+        return individuals
+
+    then = get_utc_datetime_now() - timedelta(hours=24)
+
+    day_positions = RealTimePosition.objects.filter(individual=OuterRef('pk'), datetime_recorded__gte=then)
+    distance = day_positions.order_by().values('individual').annotate(
+        distance=GeographyLengthKm(MakeLine('position', ordering='datetime_recorded'))
+    ).values('distance')
+
+    return individuals.annotate(
+        distance_day=Coalesce(Subquery(distance, output_field=models.FloatField()), 0.0)
+    )
 
 
 def get_num_sources(organization):
@@ -99,16 +127,52 @@ class RealTimeIndividual(BaseAsset):
 
 class RealTimePosition(BaseAsset):
 
+    # partitioned by month on datetime_recorded so unique constraints must include it
+    uid = models.UUIDField(editable=False, default=uuid.uuid4, db_index=True)
+
     account = models.ForeignKey(RealTimeAccount, on_delete=models.CASCADE, related_name="rt_positions")
     individual = models.ForeignKey(RealTimeIndividual, on_delete=models.CASCADE, related_name="rt_positions")
 
     position = models.PointField(srid=settings.SRID, null=False)
-    datetime_recorded = models.DateTimeField(null=True)
+    datetime_recorded = models.DateTimeField()
     temp_c = models.DecimalField(max_digits=5, decimal_places=1, null=True)
 
     class Meta:
         app_label = 'account'
         unique_together = ['individual', 'position', 'datetime_recorded']
+        indexes = [
+            models.Index(fields=['individual', 'datetime_recorded'], name='rt_position_indiv_dt_idx'),
+            BrinIndex(fields=['datetime_recorded'], name='rt_position_dt_brin'),
+        ]
+
+
+class RealTimePositionRollup(models.Model):
+    "Path summary of an individual's positions per hour or day of datetime_recorded, see caracal.common.rollups."
+
+    individual = models.ForeignKey(RealTimeIndividual, on_delete=models.CASCADE, related_name='rt_position_rollups')
+    period = models.CharField(choices=constants.ROLLUP_PERIODS, max_length=10)
+    datetime_start = models.DateTimeField()
+    datetime_updated = models.DateTimeField(default=get_utc_datetime_now)
+
+    num_positions = models.IntegerField()
+    datetime_first = models.DateTimeField()
+    datetime_last = models.DateTimeField()
+    first_position = models.PointField(srid=settings.SRID, spatial_index=False)
+    last_position = models.PointField(srid=settings.SRID, spatial_index=False)
+
+    distance_km = models.FloatField() # between positions within the bucket
+    min_lon = models.FloatField()
+    min_lat = models.FloatField()
+    max_lon = models.FloatField()
+    max_lat = models.FloatField()
+
+    num_temps = models.IntegerField(default=0)
+    temp_c_mean = models.FloatField(null=True)
+
+    class Meta:
+        app_label = 'account'
+        ordering = ['datetime_start']
+        unique_together = ['individual', 'period', 'datetime_start']
 
 
 class RealTimePositionHash(models.Model):
@@ -121,6 +185,10 @@ class RealTimePositionHash(models.Model):
 
     class Meta:
         app_label = 'account'
+        indexes = [
+            models.Index(fields=['account', 'datetime_recorded'], name='rt_pos_hash_account_dt_idx'),
+            BrinIndex(fields=['datetime_created'], name='rt_pos_hash_created_brin'),
+        ]
 
 
 
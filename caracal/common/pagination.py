@@ -0,0 +1,191 @@
+import base64
+from django.db.models import Q
+from django.db.models.functions import Coalesce, Greatest
+from django.utils.dateparse import parse_datetime
+import json
+from rest_framework import pagination
+from rest_framework.exceptions import ValidationError
+from rest_framework.response import Response
+from rest_framework.settings import api_settings
+from rest_framework.utils.urls import replace_query_param
+
+
+class KeysetPagination(pagination.BasePagination):
+    """
+    Paginates on (ordering_field, pk) with an opaque cursor so deep pages cost the same as the first one.
+    The total count is only calculated when requested with count=true. since and until bound ordering_field.
+    """
+
+    ordering_field = 'datetime_recorded'
+    descending = True
+
+    cursor_query_param = 'cursor'
+    page_size_query_param = 'page_size'
+    page_size = api_settings.PAGE_SIZE
+    max_page_size = 500
+
+    since_query_param = 'since'
+    until_query_param = 'until'
+    count_query_param = 'count'
+
+    def paginate_queryset(self, queryset, request, view=None):
+        self.request = request
+        self.count = None
+
+        queryset = self.filter_queryset_bounds(queryset, request)
+
+        if request.query_params.get(self.count_query_param) == 'true':
+            self.count = queryset.count()
+
+        if self.descending:
+            queryset = queryset.order_by(f'-{self.ordering_field}', '-pk')
+        else:
+            queryset = queryset.order_by(self.ordering_field, 'pk')
+
+        cursor = request.query_params.get(self.cursor_query_param)
+        if cursor:
+            value, pk = self.decode_cursor(cursor)
+            operator = 'lt' if self.descending else 'gt'
+            queryset = queryset.filter(
+                Q(**{f'{self.ordering_field}__{operator}': value}) |
+                Q(**{self.ordering_field: value, f'pk__{operator}': pk})
+            )
+
+        page_size = self.get_page_size(request)
+        page = list(queryset[:page_size + 1])
+
+        self.next_cursor = None
+        if len(page) > page_size:
+            page = page[:page_size]
+            self.next_cursor = self.encode_cursor(getattr(page[-1], self.ordering_field), page[-1].pk)
+
+        return page
+
+    def get_paginated_response(self, data):
+        response = {
+            'next': self.get_next_link(),
+            'next_cursor': self.next_cursor,
+            'results': data
+        }
+        if self.count is not None:
+            response['count'] = self.count
+        return Response(response)
+
+    def get_next_link(self):
+        if self.next_cursor is None:
+            return None
+        url = self.request.build_absolute_uri()
+        return replace_query_param(url, self.cursor_query_param, self.next_cursor)
+
+    def get_page_size(self, request):
+        try:
+            page_size = int(request.query_params.get(self.page_size_query_param, self.page_size))
+        except ValueError:
+            page_size = self.page_size
+        return max(1, min(page_size, self.max_page_size))
+
+    def filter_queryset_bounds(self, queryset, request):
+        since = request.query_params.get(self.since_query_param)
+        if since:
+            queryset = queryset.filter(**{f'{self.ordering_field}__gte': self.parse_bound(since, self.since_query_param)})
+
+        until = request.query_params.get(self.until_query_param)
+        if until:
+            queryset = queryset.filter(**{f'{self.ordering_field}__lt': self.parse_bound(until, self.until_query_param)})
+
+        return queryset
+
+    def parse_bound(self, value, name):
+        bound = parse_datetime(value)
+        if bound is None:
+            raise ValidationError({name: 'invalid ISO 8601 datetime'})
+        return bound
+
+    def encode_cursor(self, value, pk):
+        data = json.dumps([value.isoformat(), pk]).encode('utf-8')
+        return base64.urlsafe_b64encode(data).decode('ascii')
+
+    def decode_cursor(self, cursor):
+        try:
+            value, pk = json.loads(base64.urlsafe_b64decode(cursor.encode('ascii')).decode('utf-8'))
+            value = parse_datetime(value)
+            if value is None:
+                raise ValueError
+            return value, int(pk)
+        except (TypeError, ValueError, UnicodeError):
+            raise ValidationError({self.cursor_query_param: 'invalid cursor'})
+
+
+class CreatedKeysetPagination(KeysetPagination):
+    ordering_field = 'datetime_created'
+
+
+class RecordedKeysetPagination(KeysetPagination):
+    ordering_field = 'datetime_recorded'
+
+
+class ChangesKeysetPagination(CreatedKeysetPagination):
+    """
+    Without changes_since this pages on datetime_created like the other lists. With changes_since=<cursor or ISO
+    datetime> it returns the rows created, updated or deleted after it, oldest change first, along with a cursor
+    to send as changes_since on the next poll. since and until do not apply to changes.
+    Views should include deactivated rows when is_changes_request is True so clients receive tombstones.
+    """
+
+    changes_field = 'datetime_changed'
+    changes_since_query_param = 'changes_since'
+
+    @classmethod
+    def is_changes_request(cls, request):
+        return bool(request.query_params.get(cls.changes_since_query_param))
+
+    def paginate_queryset(self, queryset, request, view=None):
+        if not self.is_changes_request(request):
+            self.since_cursor = None
+            return super().paginate_queryset(queryset, request, view)
+
+        bounds = [name for name in [self.since_query_param, self.until_query_param] if request.query_params.get(name)]
+        if bounds:
+            raise ValidationError({name: f'cannot be combined with {self.changes_since_query_param}' for name in bounds})
+
+        self.request = request
+        self.count = None
+
+        since = request.query_params[self.changes_since_query_param]
+        value = parse_datetime(since)
+        value, pk = (value, 0) if value is not None else self.decode_cursor(since)
+
+        queryset = queryset.annotate(**{
+            self.changes_field: Greatest(
+                'datetime_created',
+                Coalesce('datetime_updated', 'datetime_created'),
+                Coalesce('datetime_deleted', 'datetime_created')
+            )
+        }).filter(
+            Q(**{f'{self.changes_field}__gt': value}) |
+            Q(**{self.changes_field: value, 'pk__gt': pk})
+        ).order_by(self.changes_field, 'pk')
+
+        page_size = self.get_page_size(request)
+        page = list(queryset[:page_size + 1])
+
+        self.has_more = len(page) > page_size
+        page = page[:page_size]
+
+        # with no changes the client keeps polling from the same point
+        if page:
+            self.since_cursor = self.encode_cursor(getattr(page[-1], self.changes_field), page[-1].pk)
+        else:
+            self.since_cursor = self.encode_cursor(value, pk)
+
+        return page
+
+    def get_paginated_response(self, data):
+        if self.since_cursor is None:
+            return super().get_paginated_response(data)
+
+        return Response({
+            'cursor': self.since_cursor,
+            'has_more': self.has_more,
+            'results': data
+        })
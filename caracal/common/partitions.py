@@ -0,0 +1,145 @@
+from datetime import datetime, timezone
+from django.db import connection, transaction
+
+
+# tables range partitioned by month on datetime_recorded
+PARTITIONED_TABLES = ['account_realtimeposition', 'custom_source_record']
+PARTITION_KEY = 'datetime_recorded'
+
+
+def add_months(month, num_months):
+    month_index = month.year * 12 + month.month - 1 + num_months
+    return month.replace(year=month_index // 12, month=month_index % 12 + 1)
+
+
+def get_month_start(dt):
+    return datetime(dt.year, dt.month, 1, tzinfo=timezone.utc)
+
+
+def get_default_partition_name(table):
+    return f'{table}_default'
+
+
+def get_partition_name(table, month):
+    return f'{table}_y{month.year}m{month.month:02d}'
+
+
+def create_partition(cursor, table, month):
+    "Creates the partition for the month, moving any rows for it out of the default partition."
+
+    name = get_partition_name(table, month)
+    default_name = get_default_partition_name(table)
+    start, end = get_month_start(month), add_months(get_month_start(month), 1)
+
+    if name in [partition['name'] for partition in get_partitions(cursor, table)]:
+        return False
+
+    cursor.execute(f'SELECT EXISTS (SELECT 1 FROM {default_name} WHERE {PARTITION_KEY} >= %s AND {PARTITION_KEY} < %s)',
+                   [start, end])
+    in_default = cursor.fetchone()[0]
+
+    # a new partition can not overlap rows already in the default partition
+    if in_default:
+        cursor.execute(f'ALTER TABLE {table} DETACH PARTITION {default_name}')
+
+    # bounds must be literals on Postgres 11
+    cursor.execute(f"CREATE TABLE {name} PARTITION OF {table} FOR VALUES FROM ('{start.isoformat()}') TO ('{end.isoformat()}')")
+
+    if in_default:
+        cursor.execute(f'INSERT INTO {name} SELECT * FROM {default_name} '
+                       f'WHERE {PARTITION_KEY} >= %s AND {PARTITION_KEY} < %s', [start, end])
+        cursor.execute(f'DELETE FROM {default_name} WHERE {PARTITION_KEY} >= %s AND {PARTITION_KEY} < %s',
+                       [start, end])
+        cursor.execute(f'ALTER TABLE {table} ATTACH PARTITION {default_name} DEFAULT')
+
+    return True
+
+
+def create_partitions(table, start_month, end_month):
+    "Creates the monthly partitions from start_month to end_month inclusive and returns the names of new ones."
+
+    created = list()
+    with transaction.atomic(), connection.cursor() as cursor:
+        month = get_month_start(start_month)
+        while month <= end_month:
+            if create_partition(cursor, table, month):
+                created.append(get_partition_name(table, month))
+            month = add_months(month, 1)
+
+    return created
+
+
+def detach_partitions(table, before_month, drop=False):
+    """
+    Detaches the monthly partitions that end on or before before_month and returns their names.
+    Detached partitions are left as standalone tables for archiving unless drop is True.
+    """
+
+    detached = list()
+    with transaction.atomic(), connection.cursor() as cursor:
+        for partition in get_partitions(cursor, table):
+            if partition['end'] > before_month:
+                continue
+
+            cursor.execute(f'ALTER TABLE {table} DETACH PARTITION {partition["name"]}')
+            if drop:
+                cursor.execute(f'DROP TABLE {partition["name"]}')
+            detached.append(partition['name'])
+
+    return detached
+
+
+def get_partitions(cursor, table):
+    "Returns the monthly partitions of the table ordered by start, the default partition is excluded."
+
+    cursor.execute('''
+        SELECT child.relname
+        FROM pg_inherits
+        JOIN pg_class parent ON pg_inherits.inhparent = parent.oid
+        JOIN pg_class child ON pg_inherits.inhrelid = child.oid
+        WHERE parent.relname = %s
+        ORDER BY child.relname
+    ''', [table])
+
+    partitions = list()
+    for (name,) in cursor.fetchall():
+        if name == get_default_partition_name(table):
+            continue
+
+        month = datetime.strptime(name[len(table):], '_y%Ym%m').replace(tzinfo=timezone.utc)
+        partitions.append({
+            'name': name,
+            'start': month,
+            'end': add_months(month, 1)
+        })
+
+    return partitions
+
+
+def partition_table(cursor, table, months_ahead):
+    """
+    Converts an existing table into one range partitioned by month on datetime_recorded.
+    Creates partitions from the oldest row to months_ahead months from now plus a default partition.
+    Constraints and indexes are recreated by the caller after the rows are copied.
+    """
+
+    legacy = f'{table}_legacy'
+
+    cursor.execute(f'UPDATE {table} SET {PARTITION_KEY} = datetime_created WHERE {PARTITION_KEY} IS NULL')
+    cursor.execute(f'ALTER TABLE {table} RENAME TO {legacy}')
+    cursor.execute(f'CREATE TABLE {table} (LIKE {legacy} INCLUDING DEFAULTS) PARTITION BY RANGE ({PARTITION_KEY})')
+    cursor.execute(f'ALTER TABLE {table} ALTER COLUMN {PARTITION_KEY} SET NOT NULL')
+    cursor.execute(f'ALTER SEQUENCE {table}_id_seq OWNED BY {table}.id')
+    cursor.execute(f'CREATE TABLE {get_default_partition_name(table)} PARTITION OF {table} DEFAULT')
+
+    cursor.execute(f'SELECT MIN({PARTITION_KEY}) FROM {legacy}')
+    oldest = cursor.fetchone()[0]
+
+    now = datetime.utcnow().replace(tzinfo=timezone.utc)
+    month = get_month_start(oldest or now)
+    while month <= add_months(get_month_start(now), months_ahead):
+        create_partition(cursor, table, month)
+        month = add_months(month, 1)
+
+    cursor.execute(f'INSERT INTO {table} SELECT * FROM {legacy}')
+    cursor.execute(f'DROP TABLE {legacy}')
@@ -0,0 +1,234 @@
+from collections import defaultdict
+from datetime import timedelta
+from django.conf import settings
+from django.contrib.gis.geos import Point
+from django.db import transaction
+from django.db.models import Count, F, IntegerField, OuterRef, Q, Subquery
+from django.db.models.functions import Coalesce, TruncHour
+from itertools import chain
+
+from caracal.common import gis
+from caracal.common.models import get_utc_datetime_now, RealTimePosition, RealTimePositionRollup
+
+
+DAY = 'day'
+HOUR = 'hour'
+
+
+def get_day_start(dt):
+    return dt.replace(hour=0, minute=0, second=0, microsecond=0)
+
+
+def get_hour_start(dt):
+    return dt.replace(minute=0, second=0, microsecond=0)
+
+
+def get_path_summary(individual, start, end=None):
+    """
+    Summarizes an individual's path from the start hour to end using daily rollups for whole days and hourly
+    rollups for the partial days at either end. Returns None if there are no positions.
+    """
+
+    start = get_hour_start(start)
+    end = end or get_utc_datetime_now()
+
+    first_day = get_day_start(start) if start == get_day_start(start) else get_day_start(start) + timedelta(days=1)
+    last_day = get_day_start(end) # exclusive
+
+    rollups = individual.rt_position_rollups.all()
+    if first_day < last_day:
+        rollups = rollups.filter(
+            Q(period=DAY, datetime_start__gte=first_day, datetime_start__lt=last_day) |
+            Q(period=HOUR, datetime_start__gte=start, datetime_start__lt=first_day) |
+            Q(period=HOUR, datetime_start__gte=last_day, datetime_start__lt=end)
+        )
+    else:
+        rollups = rollups.filter(period=HOUR, datetime_start__gte=start, datetime_start__lt=end)
+
+    rollups = list(rollups.order_by('datetime_start'))
+    if not rollups:
+        return None
+
+    merged = _merge_rollups(rollups)
+    return {
+        'num_positions': merged['num_positions'],
+        'distance_km': round(merged['distance_km'], 2),
+        'datetime_first': merged['datetime_first'],
+        'datetime_last': merged['datetime_last'],
+        'bbox': [merged['min_lon'], merged['min_lat'], merged['max_lon'], merged['max_lat']],
+        'temp_c_mean': round(merged['temp_c_mean'], 1) if merged['temp_c_mean'] is not None else None,
+    }
+
+
+def update_position_rollups(lookback_hours):
+    """
+    Rebuilds the hourly and daily rollups of every individual hour that received positions in the last
+    lookback_hours or lost positions since it was rolled up. Returns the number of hours rebuilt.
+    """
+
+    now = get_utc_datetime_now()
+    since = now - timedelta(hours=lookback_hours)
+    oldest_recorded = now - timedelta(hours=settings.POSITION_ROLLUP_MAX_LATE_HOURS)
+
+    touched = RealTimePosition.objects.filter(datetime_created__gte=since, datetime_recorded__gte=oldest_recorded)\
+        .annotate(datetime_hour=TruncHour('datetime_recorded'))\
+        .values_list('individual_id', 'datetime_hour').distinct()
+
+    touched_hours = defaultdict(set)
+    for individual_id, datetime_hour in chain(touched, _get_stale_hours(oldest_recorded)):
+        touched_hours[individual_id].add(datetime_hour)
+
+    _rebuild_hours(touched_hours, now)
+    return sum([len(hours) for hours in touched_hours.values()])
+
+
+def backfill_position_rollups(start, end):
+    """
+    Rebuilds the rollups of every individual hour recorded from the start hour to end a day at a time, whatever
+    its age, and deletes the rollups of hours that no longer have positions. Returns the number of hours rebuilt.
+    """
+
+    now = get_utc_datetime_now()
+    num_hours = 0
+
+    day_start = get_hour_start(start)
+    while day_start < end:
+        day_end = min(get_day_start(day_start) + timedelta(days=1), end)
+
+        recorded = RealTimePosition.objects.filter(datetime_recorded__gte=day_start, datetime_recorded__lt=day_end)\
+            .annotate(datetime_hour=TruncHour('datetime_recorded'))\
+            .values_list('individual_id', 'datetime_hour').distinct()
+        rolled_up = RealTimePositionRollup.objects.filter(period=HOUR, datetime_start__gte=day_start,
+                                                          datetime_start__lt=day_end)\
+            .values_list('individual_id', 'datetime_start')
+
+        touched_hours = defaultdict(set)
+        for individual_id, datetime_hour in chain(recorded, rolled_up):
+            touched_hours[individual_id].add(datetime_hour)
+
+        _rebuild_hours(touched_hours, now)
+        num_hours += sum([len(hours) for hours in touched_hours.values()])
+        day_start = day_end
+
+    return num_hours
+
+
+def _get_bucket_values(rows):
+    lons, lats, times, temps = zip(*rows)
+    metrics = gis.get_path_metrics(lons, lats)
+    temps = [float(temp) for temp in temps if temp is not None]
+
+    return {
+        'num_positions': len(rows),
+        'datetime_first': times[0],
+        'datetime_last': times[-1],
+        'first_position': Point(lons[0], lats[0], srid=settings.SRID),
+        'last_position': Point(lons[-1], lats[-1], srid=settings.SRID),
+        'distance_km': metrics['distance_km'],
+        'min_lon': float(metrics['bbox'][0]),
+        'min_lat': float(metrics['bbox'][1]),
+        'max_lon': float(metrics['bbox'][2]),
+        'max_lat': float(metrics['bbox'][3]),
+        'num_temps': len(temps),
+        'temp_c_mean': sum(temps) / len(temps) if temps else None,
+    }
+
+
+def _merge_rollups(rollups):
+    "Merges time ordered rollups, adding the distance between the last and first positions of adjacent buckets."
+
+    distance_km = sum([rollup.distance_km for rollup in rollups])
+    if len(rollups) > 1:
+        distance_km += float(gis.get_haversine_km(
+            [rollup.last_position.x for rollup in rollups[:-1]], [rollup.last_position.y for rollup in rollups[:-1]],
+            [rollup.first_position.x for rollup in rollups[1:]], [rollup.first_position.y for rollup in rollups[1:]]
+        ).sum())
+
+    num_temps = sum([rollup.num_temps for rollup in rollups])
+    temp_c_sum = sum([rollup.temp_c_mean * rollup.num_temps for rollup in rollups if rollup.num_temps > 0])
+
+    return {
+        'num_positions': sum([rollup.num_positions for rollup in rollups]),
+        'datetime_first': rollups[0].datetime_first,
+        'datetime_last': rollups[-1].datetime_last,
+        'first_position': rollups[0].first_position,
+        'last_position': rollups[-1].last_position,
+        'distance_km': distance_km,
+        'min_lon': min([rollup.min_lon for rollup in rollups]),
+        'min_lat': min([rollup.min_lat for rollup in rollups]),
+        'max_lon': max([rollup.max_lon for rollup in rollups]),
+        'max_lat': max([rollup.max_lat for rollup in rollups]),
+        'num_temps': num_temps,
+        'temp_c_mean': temp_c_sum / num_temps if num_temps > 0 else None,
+    }
+
+
+def _get_stale_hours(start):
+    "Returns (individual_id, hour) of the hourly rollups from start whose positions have been deleted since."
+
+    num_recorded = RealTimePosition.objects.filter(
+        individual_id=OuterRef('individual_id'),
+        datetime_recorded__gte=OuterRef('datetime_first'),
+        datetime_recorded__lte=OuterRef('datetime_last')
+    ).order_by().values('individual_id').annotate(num=Count('pk')).values('num')
+
+    return RealTimePositionRollup.objects.filter(period=HOUR, datetime_start__gte=get_hour_start(start))\
+        .annotate(num_recorded=Coalesce(Subquery(num_recorded, output_field=IntegerField()), 0))\
+        .exclude(num_recorded=F('num_positions'))\
+        .values_list('individual_id', 'datetime_start')
+
+
+def _rebuild_hours(touched_hours, now):
+
+    with transaction.atomic():
+        for individual_id, hours in touched_hours.items():
+            _update_hourly_rollups(individual_id, hours, now)
+            _update_daily_rollups(individual_id, {get_day_start(hour) for hour in hours}, now)
+
+
+def _update_daily_rollups(individual_id, days, now):
+
+    for day in days:
+        hourly = list(RealTimePositionRollup.objects.filter(
+            individual_id=individual_id, period=HOUR,
+            datetime_start__gte=day, datetime_start__lt=day + timedelta(days=1)
+        ).order_by('datetime_start'))
+
+        if not hourly:
+            RealTimePositionRollup.objects.filter(individual_id=individual_id, period=DAY, datetime_start=day).delete()
+            continue
+
+        values = _merge_rollups(hourly)
+        values['datetime_updated'] = now
+        RealTimePositionRollup.objects.update_or_create(
+            individual_id=individual_id, period=DAY, datetime_start=day, defaults=values
+        )
+
+
+def _update_hourly_rollups(individual_id, hours, now):
+
+    positions = RealTimePosition.objects.filter(
+        individual_id=individual_id,
+        datetime_recorded__gte=min(hours),
+        datetime_recorded__lt=max(hours) + timedelta(hours=1)
+    )
+    rows = gis.annotate_lon_lat(positions).order_by('datetime_recorded')\
+        .values_list('lon', 'lat', 'datetime_recorded', 'temp_c')
+
+    buckets = defaultdict(list)
+    for row in rows.iterator():
+        hour = get_hour_start(row[2])
+        if hour in hours:
+            buckets[hour].append(row)
+
+    # hours whose positions have all been deleted
+    RealTimePositionRollup.objects.filter(
+        individual_id=individual_id, period=HOUR, datetime_start__in=set(hours) - set(buckets.keys())
+    ).delete()
+
+    for hour, bucket_rows in buckets.items():
+        values = _get_bucket_values(bucket_rows)
+        values['datetime_updated'] = now
+        RealTimePositionRollup.objects.update_or_create(
+            individual_id=individual_id, period=HOUR, datetime_start=hour, defaults=values
+        )
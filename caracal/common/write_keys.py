@@ -0,0 +1,62 @@
+from cachetools import TTLCache
+from collections import namedtuple
+from django.conf import settings
+import threading
+
+
+WriteKey = namedtuple('WriteKey', ['pk', 'organization_id', 'is_active'])
+
+
+class WriteKeyCache:
+    """
+    In-process cache of write_key -> WriteKey for models with write_key, organization and is_active fields.
+    Misses are cached too so unknown keys do not hit the database on every request. Each process only
+    sees its own invalidations, other processes pick up changes once the ttl expires.
+    """
+
+    def __init__(self, model):
+        self.model = model
+        self._cache = TTLCache(maxsize=settings.WRITE_KEY_CACHE_MAX_SIZE,
+                               ttl=settings.WRITE_KEY_CACHE_TTL_SECONDS)
+        self._lock = threading.Lock()
+
+    def get(self, write_key):
+        "Returns the active instance for the write key or None. The instance only has pk, organization_id, write_key and is_active set."
+
+        resolved = self.resolve(write_key)
+        if resolved is None or not resolved.is_active:
+            return None
+
+        return self.model(pk=resolved.pk, organization_id=resolved.organization_id,
+                          write_key=write_key, is_active=True)
+
+    def resolve(self, write_key):
+        "Returns the WriteKey for the write key or None if it does not exist."
+
+        with self._lock:
+            try:
+                return self._cache[write_key]
+            except KeyError:
+                pass
+
+        # prefer an active row if the key has been reused
+        row = self.model.objects.filter(write_key=write_key).order_by('-is_active')\
+            .values_list('pk', 'organization_id', 'is_active').first()
+        resolved = WriteKey(*row) if row is not None else None
+
+        with self._lock:
+            self._cache[write_key] = resolved
+
+        return resolved
+
+    def invalidate(self, write_key):
+        with self._lock:
+            self._cache.pop(write_key, None)
+
+    def clear(self):
+        with self._lock:
+            self._cache.clear()
+
+    def invalidate_instance(self, sender, instance, **kwargs):
+        "Signal receiver for post_save and post_delete."
+        self.invalidate(instance.write_key)
@@ -13,7 +13,47 @@ AGOL_CLIENT_SECRET = os.environ['CARACAL_AGOL_CLIENT_SECRET']
 AWS_ACCESS_KEY_ID = os.environ['TUMA_AWS_KEY']
 AWS_SECRET_ACCESS_KEY = os.environ['TUMA_AWS_SECRET']
 AWS_REGION = "us-east-1"
+AWS_CONNECT_TIMEOUT_SECONDS = 5
+AWS_READ_TIMEOUT_SECONDS = 30
+AWS_MAX_POOL_CONNECTIONS = 25 # per client, shared by the threads of a worker
+AWS_MAX_RETRY_ATTEMPTS = 3
+AWS_MAX_SCHEDULE_WORKERS = 4 # rules created concurrently when a source is scheduled
+
+HTTP_CONNECT_TIMEOUT_SECONDS = 5
+HTTP_READ_TIMEOUT_SECONDS = 30
+HTTP_MAX_RETRIES = 2 # idempotent requests only
+HTTP_RETRY_BACKOFF_SECONDS = 0.5
+HTTP_POOL_HOSTS = 20 # hosts with a pool kept open
+HTTP_POOL_MAX_SIZE = 10 # connections kept open per host
+HTTP_CIRCUIT_FAILURE_THRESHOLD = 5 # consecutive failures before calls to a host fail fast
+HTTP_CIRCUIT_RESET_SECONDS = 30
+
+AGOL_CLIENT_CACHE_MAX_SIZE = 1000
+AGOL_TOKEN_REFRESH_MARGIN_SECONDS = 60 # refresh access tokens this long before they expire
+AGOL_EDIT_CHUNK_SIZE = 500 # features per applyEdits request
+AGOL_EDIT_MAX_WORKERS = 4 # concurrent applyEdits requests per call
+AGOL_EDIT_MAX_RETRIES = 3
+AGOL_EDIT_RETRY_BACKOFF_SECONDS = 1
+
+JOB_BATCH_SIZE = 10 # jobs claimed at a time by a worker
+JOB_MAX_ATTEMPTS = 5
+JOB_POLL_SECONDS = 2 # worker sleep when no jobs are due
+JOB_RETRY_BACKOFF_SECONDS = 30 # doubled after each failed attempt
+JOB_TIMEOUT_SECONDS = 900 # running jobs older than this are assumed dead and claimed again
+
+SCHEDULER_BACKEND = os.environ.get('CARACAL_SCHEDULER_BACKEND', 'eventbridge') # eventbridge or dispatcher
+SCHEDULER_BATCH_SIZE = 50 # schedule inputs per Lambda invocation
+SCHEDULER_MAX_DUE = 1000 # schedules dispatched per tick
+SCHEDULER_MAX_WORKERS = 4 # concurrent Lambda invocations per tick
+SCHEDULER_TICK_SECONDS = 60
+
 DYNAMO_CONFIG_TABLE_NAME = 'caracal-global-configuration'
+GLOBAL_CONFIG_TTL_SECONDS = 300 # older config is served while it is reloaded in the background
+GLOBAL_CONFIG_MAX_STALE_SECONDS = 3600 # older config is reloaded before it is served
+GLOBAL_CONFIG_BROWSER_MAX_AGE_SECONDS = 300 # Cache-Control max-age of public config responses
+
+KMZ_HREF_CACHE_MAX_SIZE = 1000 # organizations
+KMZ_HREF_CACHE_TTL_SECONDS = 300 # bounds staleness until the KML Lambda functions bump KmzIndexVersion
 
 BILLING_CUSTOM_RECORDS_LIMIT_INDIV = 50000
 BILLING_CUSTOM_RECORDS_LIMIT_TEAM = 500000
@@ -22,11 +62,34 @@ BILLING_DESTINATIONS_LIMIT_TEAM = -1
 BILLING_SOURCE_LIMIT_INDIV = 10
 BILLING_SOURCE_LIMIT_TEAM = -1
 
+CUSTOM_SOURCE_MAX_BATCH_RECORDS = 5000
+JACKAL_SYNC_MAX_RECORDS = 5000
+
+WRITE_KEY_CACHE_MAX_SIZE = 10000
+WRITE_KEY_CACHE_TTL_SECONDS = 60
+
+COGNITO_JWKS_MIN_REFRESH_SECONDS = 300 # between fetches of the user pool jwks
+COGNITO_JWKS_REFRESH_WAIT_SECONDS = 2 # how long a token with an unknown kid waits for the fetch
+COGNITO_REVOCATION_CACHE_MAX_SIZE = 10000
+COGNITO_REVOCATION_CACHE_TTL_SECONDS = 300 # None skips the Cognito check, logouts are still enforced
+COGNITO_REVOCATION_CLOCK_SKEW_SECONDS = 5 # tokens issued this long before a logout are still accepted
+
+PRINCIPAL_CACHE_MAX_SIZE = 10000
+PRINCIPAL_CACHE_TTL_SECONDS = 60 # bounds how long other processes see a stale account or subscription, None disables
+
+ACCOUNT_EMAIL_VERIFIED_TTL_SECONDS = 300 # between Cognito checks of an unverified email
+
 AGOL_UPDATE_RATE_MINUTES = 10
 COLLARS_GET_DATA_RATE_MINUTES = 15
 DRIVE_KML_UPDATE_RATE_MINUTES = 10
 JACKAL_EXCEL_UPDATE_RATE_MINTES = 15
 KML_PERIOD_HOURS = [24, 72, 168, 720]
+OVERVIEW_METRICS_USE_ROLLUPS = False # enable once update_position_rollups runs hourly and has been backfilled
+PATH_SUMMARIES_USE_ROLLUPS = False # collar path_week and path_month, same conditions
+
+PARTITION_MONTHS_AHEAD = 3 # monthly position partitions created ahead of time
+PARTITION_RETENTION_MONTHS = None # None keeps all partitions attached
+POSITION_ROLLUP_MAX_LATE_HOURS = 72 # positions recorded earlier than this are not rolled up
 
 DUMMY_EMAIL = 'dummy@caracal.cloud'
 DUMMY_SHORT_NAME = 'dummy3141592'
@@ -37,6 +100,8 @@ OVERLORD_EMAIL = os.environ['CARACAL_OVERLORD_EMAIL']
 OVERLORD_PASSWORD = os.environ['CARACAL_OVERLORD_PASSWORD']
 
 S3_USER_CREDENTIALS_TABLE = 'caracal-user-access-credentials'
+S3_PRESIGN_CACHE_MAX_SIZE = 10000
+S3_PRESIGN_REUSE_FRACTION = 0.5 # of a presigned url's lifetime it is handed out again
 
 SRID = 4326 # Spatial Reference System Identifier - still using this over global config.
 
@@ -68,6 +133,7 @@ INSTALLED_APPS = [
     'custom_source',
     'drives',
     'jackal',
+    'jobs',
     'outputs',
     'public',
     'radios'
@@ -24,6 +24,7 @@ urlpatterns = [
     path('collars/', include('collars.urls')),
     path('drives/', include('drives.urls')),
     path('jackal/', include('jackal.urls')),
+    path('jobs/', include('jobs.urls')),
     path('outputs/', include('outputs.urls')),
     path('public/', include('public.urls')),
     path('radios/', include('radios.urls')),
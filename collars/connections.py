@@ -2,6 +2,7 @@
 from django.conf import settings
 
 from caracal.common.aws_utils import _lambda
+from jobs import schedules
 
 
 def schedule_collars_get_data(data, collar_account, organization):
@@ -31,7 +32,7 @@ def schedule_collars_get_data(data, collar_account, organization):
     short_name = organization.short_name
     rule_name = get_collars_get_data_rule_name(short_name, settings.STAGE, provider, species, collar_account.uid)
 
-    _lambda.schedule_lambda_function(lambda_function['arn'], lambda_function['name'], get_data_rule_input,
+    schedules.schedule_lambda_function(lambda_function['arn'], lambda_function['name'], get_data_rule_input,
                                  rule_name, settings.COLLARS_GET_DATA_RATE_MINUTES)
 
     return {
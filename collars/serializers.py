@@ -1,10 +1,11 @@
 
-from datetime import datetime, timedelta, timezone
+from datetime import timedelta
+from django.conf import settings
 import random
 from rest_framework import serializers
 
-from caracal.common import connections, constants, gis
-from caracal.common.models import RealTimeAccount, RealTimeIndividual
+from caracal.common import connections, constants, gis, rollups
+from caracal.common.models import get_utc_datetime_now, RealTimeAccount, RealTimeIndividual
 
 
 class AddCollarAccountSerializer(serializers.ModelSerializer):
@@ -84,44 +85,55 @@ class GetCollarIndividualsSerializer(serializers.HyperlinkedModelSerializer):
 
     url = serializers.HyperlinkedIdentityField(lookup_field='uid', view_name='collar-individual-detail')
 
+    # annotated by caracal.common.models.annotate_individual_metrics
     distance_day = serializers.SerializerMethodField()
     def get_distance_day(self, individual): # kms
-        then = datetime.utcnow().replace(tzinfo=timezone.utc) - timedelta(hours=24)
-        positions = individual.rt_positions.filter(datetime_recorded__gte=then).order_by('datetime_recorded')
-        positions = [p.position for p in positions]
-        return gis.get_path_distance_km(positions) if len(positions) > 2 else 0
+        return round(individual.distance_day, 2)
 
     datetime_last_position = serializers.SerializerMethodField()
     def get_datetime_last_position(self, individual):
-        last_position = individual.rt_positions.order_by('-datetime_recorded').first()
-        return last_position.datetime_recorded
+        return individual.datetime_last_position
 
     class Meta:
         model = RealTimeIndividual
         fields = ['url', 'uid', 'device_id', 'datetime_created', 'datetime_updated',
-                  'status', 'name', 'subtype', 'sex', 'distance_day',
-                  'datetime_last_position']
+                  'datetime_deleted', 'is_active', 'status', 'name', 'subtype', 'sex',
+                  'distance_day', 'datetime_last_position']
 
 
 class GetCollarIndividualDetailSerializer(serializers.ModelSerializer):
 
+    path_day = serializers.SerializerMethodField()
+    def get_path_day(self, individual):
+        if not hasattr(individual, 'path_day'):
+            then = get_utc_datetime_now() - timedelta(hours=24)
+            individual.path_day = gis.get_queryset_path_metrics(individual.rt_positions.filter(datetime_recorded__gte=then))
+        return individual.path_day
+
+    # the same path as path_day so the two distances cannot disagree
     distance_day = serializers.SerializerMethodField()
     def get_distance_day(self, individual): # kms
-        then = datetime.utcnow().replace(tzinfo=timezone.utc) - timedelta(hours=24)
-        positions = individual.rt_positions.filter(datetime_recorded__gte=then).order_by('datetime_recorded')
-        positions = [p.position for p in positions]
-        return gis.get_path_distance_km(positions) if len(positions) > 2 else 0
+        return self.get_path_day(individual)['distance_km']
+
+    # summed from the hourly and daily position rollups, None unless PATH_SUMMARIES_USE_ROLLUPS
+    path_week = serializers.SerializerMethodField()
+    def get_path_week(self, individual):
+        return get_path_summary(individual, 168)
+
+    path_month = serializers.SerializerMethodField()
+    def get_path_month(self, individual):
+        return get_path_summary(individual, 720)
 
+    # annotated by caracal.common.models.annotate_individual_metrics
     datetime_last_position = serializers.SerializerMethodField()
     def get_datetime_last_position(self, individual):
-        last_position = individual.rt_positions.order_by('-datetime_recorded').first()
-        return last_position.datetime_recorded
+        return individual.datetime_last_position
 
     class Meta:
         model = RealTimeIndividual
         fields = ['url', 'uid', 'device_id', 'datetime_created', 'datetime_updated',
                   'status', 'name', 'subtype', 'sex', 'distance_day',
-                  'datetime_last_position']
+                  'datetime_last_position', 'path_day', 'path_week', 'path_month']
 
 
 class UpdateCollarIndividualSerializer(serializers.Serializer):
@@ -184,3 +196,12 @@ def validate_provider_details(attrs):
 
 
 
+
+
+def get_path_summary(individual, hours):
+    "Summary of the individual's path over the last hours from the position rollups, see caracal.common.rollups."
+
+    if not settings.PATH_SUMMARIES_USE_ROLLUPS:
+        return None
+
+    return rollups.get_path_summary(individual, get_utc_datetime_now() - timedelta(hours=hours))
@@ -1,18 +1,19 @@
 from datetime import datetime, timezone
 import json
-import requests
 from rest_framework import permissions, status, generics
 from rest_framework.response import Response
 
 from activity.models import ActivityChange
 from auth.backends import CognitoAuthentication
-from caracal.common import agol, connections
-from caracal.common.aws_utils import cloudwatch, dynamodb
+from caracal.common import connections, http
 from caracal.common.decorators import check_agol_account_connected, check_source_limit
-from caracal.common.models import get_num_sources, RealTimeAccount, RealTimeIndividual
+from caracal.common.global_config import global_config
+from caracal.common.models import annotate_individual_metrics, get_num_sources, RealTimeAccount, RealTimeIndividual
+from caracal.common.pagination import ChangesKeysetPagination, CreatedKeysetPagination
 import caracal.common.serializers as common_serializers
 from collars import connections as collar_connections
 from collars import serializers as collar_serializers
+from jobs import queue, schedules
 from outputs.models import AgolAccount
 
 
@@ -108,7 +109,7 @@ class DeleteCollarAccountView(generics.GenericAPIView):
         if realtime_account.organization != request.user.organization:
             return Response(status=status.HTTP_403_FORBIDDEN)
 
-        cloudwatch.delete_cloudwatch_rule(
+        schedules.delete_schedule(
             realtime_account.cloudwatch_get_data_rule_name
         )
 
@@ -161,6 +162,7 @@ class GetCollarIndividualsView(generics.ListAPIView):
 
     authentication_classes = [CognitoAuthentication]
     permission_classes = [permissions.IsAuthenticated]
+    pagination_class = ChangesKeysetPagination
     serializer_class = collar_serializers.GetCollarIndividualsSerializer
 
     def get_queryset(self):
@@ -182,7 +184,12 @@ class GetCollarIndividualsView(generics.ListAPIView):
         except RealTimeAccount.DoesNotExist:
             return RealTimeIndividual.objects.none()
 
-        return RealTimeIndividual.objects.filter(is_active=True, account=account)
+        # changes include deactivated individuals as tombstones
+        individuals = RealTimeIndividual.objects.filter(account=account)
+        if not ChangesKeysetPagination.is_changes_request(self.request):
+            individuals = individuals.filter(is_active=True)
+
+        return annotate_individual_metrics(individuals)
 
 
 class GetCollarIndividualDetailView(generics.RetrieveAPIView):
@@ -193,9 +200,11 @@ class GetCollarIndividualDetailView(generics.RetrieveAPIView):
     permission_classes = [permissions.IsAuthenticated]
 
     def get_queryset(self):
-        return RealTimeIndividual.objects.filter(
+        individuals = RealTimeIndividual.objects.filter(
             account__organization=self.request.user.organization
         )
+        # distance_day comes from path_day
+        return annotate_individual_metrics(individuals, distance_day=False)
 
 
 class UpdateCollarAccountView(generics.GenericAPIView):
@@ -297,51 +306,11 @@ class UpdateCollarIndividualView(generics.GenericAPIView):
             return Response(status=status.HTTP_403_FORBIDDEN)
 
         # do this before updating individual so we know old values
-        # if there is a connected AGOL layer, update features in the layer on device_id
-        agol_connections = individual.account.connections.filter(
-            agol_account__isnull=False
+        agol_fields = ["name", "subtype", "sex", "status"]
+        agol_changed = any(
+            field in update_data and update_data[field] != getattr(individual, field)
+            for field in agol_fields
         )
-        # TODO: maybe do:
-        # agol_connection = individual.account.connections.filter(agol_account__isnull=False).first()
-        # if agol_connection is not None:
-        for agol_connection in agol_connections:
-
-            attributes = dict()
-            if "name" in update_data and update_data["name"] != individual.name:
-                attributes["Name"] = update_data["name"]
-
-            if (
-                "subtype" in update_data
-                and update_data["subtype"] != individual.subtype
-            ):
-                attributes["Type"] = update_data["subtype"]
-
-            if "sex" in update_data and update_data["sex"] != individual.subtype:
-                attributes["Sex"] = update_data["sex"]
-
-            if "status" in update_data and update_data["status"] != individual.subtype:
-                attributes["Status"] = update_data["status"]
-
-            if len(attributes) > 0:
-
-                agol_account = agol_connection.agol_account
-
-                # TODO: this is grossly inefficient, but AGOL doesn't seem to have an update with where clause
-
-                features = agol.get_collar_features(
-                    agol_account=agol_account,
-                    device_id=individual.device_id,
-                    layer_id=agol_connection.agol_layer_id
-                )
-
-                print(f'Updating {len(features)} features')
-                updates = [(f.id, attributes, None) for f in features]  
-
-                agol.update_features(
-                    agol_account=agol_account,
-                    layer_id=agol_connection.agol_layer_id,
-                    updates=updates
-                )
 
         now = datetime.utcnow().replace(tzinfo=timezone.utc)
         RealTimeIndividual.objects.filter(uid=individual_uid).update(
@@ -353,6 +322,16 @@ class UpdateCollarIndividualView(generics.GenericAPIView):
             organization=user.organization, account=user, message=message
         )
 
+        # if there is a connected AGOL layer, features are updated on device_id in the background
+        if agol_changed and individual.account.connections.filter(agol_account__isnull=False).exists():
+            job = queue.enqueue(
+                "agol.sync_individual_features",
+                {"individual_id": individual.pk},
+                organization=user.organization,
+                idempotency_key=f"agol.sync_individual_features:{individual.pk}",
+            )
+            return Response({"job_uid": job.uid}, status=status.HTTP_200_OK)
+
         return Response(status=status.HTTP_200_OK)
 
 
@@ -368,14 +347,14 @@ class ValidateAccountDetailsView(generics.GenericAPIView):
         )
         serializer.is_valid(raise_exception=True)
 
-        global_config = dynamodb.get_global_config()
+        config = global_config.get()
 
         provider = serializer.data["provider"]
 
         if provider == "orbcomm":
             orbcomm_company_id = serializer.data["orbcomm_company_id"]
             orbcomm_timezone = serializer.data["orbcomm_timezone"]
-            orbcomm_list_url = global_config["ORBCOMM_BASE_URL"] + "getUnitList"
+            orbcomm_list_url = config["ORBCOMM_BASE_URL"] + "getUnitList"
 
             payload = {
                 "company": orbcomm_company_id,
@@ -383,7 +362,7 @@ class ValidateAccountDetailsView(generics.GenericAPIView):
                 "lmtime": orbcomm_timezone,
             }
 
-            res = requests.get(
+            res = http.get(
                 orbcomm_list_url, params=payload
             )  # status_code is always 200
             rows = parse_orbcomm_rows(res)
@@ -400,9 +379,9 @@ class ValidateAccountDetailsView(generics.GenericAPIView):
             }
 
             savannah_tracking_login_url = (
-                global_config["SAVANNAH_TRACKING_BASE_URL"] + "savannah_data/data_auth"
+                config["SAVANNAH_TRACKING_BASE_URL"] + "savannah_data/data_auth"
             )
-            login_res = requests.post(savannah_tracking_login_url, data=login_payload)
+            login_res = http.post(savannah_tracking_login_url, data=login_payload)
             login_content = login_res.json()
             is_verified = "sucess" in login_content.keys() and login_content["sucess"]
 
@@ -0,0 +1 @@
+default_app_config = 'custom_source.apps.CustomSourceConfig'
@@ -1,5 +1,13 @@
 from django.apps import AppConfig
+from django.db.models.signals import post_delete, post_save
 
 
 class CustomSourceConfig(AppConfig):
     name = 'custom_source'
+
+    def ready(self):
+        from custom_source.decorators import source_write_keys
+        from custom_source.models import Source
+
+        post_save.connect(source_write_keys.invalidate_instance, sender=Source)
+        post_delete.connect(source_write_keys.invalidate_instance, sender=Source)
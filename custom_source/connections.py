@@ -1,6 +1,7 @@
 from django.conf import settings
 from caracal.common import agol
-from caracal.common.aws_utils import cloudwatch, _lambda
+from caracal.common.aws_utils import _lambda
+from jobs import queue, schedules
 from outputs.models import AgolAccount, DataConnection
 
 
@@ -10,7 +11,7 @@ def delete_source_kml(source):
     if source.cloudwatch_update_kml_rule_names:
         update_kml_rule_names = source.cloudwatch_update_kml_rule_names.split(",")
         for rule_name in update_kml_rule_names:
-            cloudwatch.delete_cloudwatch_rule(rule_name)
+            schedules.delete_schedule(rule_name)
 
     source.cloudwatch_update_kml_rule_names = None
     source.save()
@@ -30,13 +31,17 @@ def delete_source_agol(agol_account=None, source=None, connection=None):
 
     agol_account = connection.agol_account
 
-    agol.delete_feature_layers(
-        layer_ids=[connection.agol_layer_id],
-        feature_service_url=agol_account.feature_service_url,
-        agol_account=agol_account,
-    )
+    # the layer and rule are missing if the provisioning job has not run yet
+    if connection.agol_layer_id is not None:
+        agol.delete_feature_layers(
+            layer_ids=[connection.agol_layer_id],
+            feature_service_url=agol_account.feature_service_url,
+            agol_account=agol_account,
+        )
+
+    if connection.cloudwatch_update_rule_name is not None:
+        schedules.delete_schedule(connection.cloudwatch_update_rule_name)
 
-    cloudwatch.delete_cloudwatch_rule(connection.cloudwatch_update_rule_name)
     connection.delete()
 
 
@@ -46,26 +51,14 @@ def schedule_source_outputs(data, source, user, agol_account=None):
     organization = user.organization
 
     if data.get("output_agol", False) and agol_account is not None:
-        # create a connection and schedule update
+        # create a connection, the AGOL layer and update schedule are created by a job
         connection = DataConnection.objects.create(
             organization=organization,
             account=user,
             custom_source=source,
             agol_account=agol_account,
         )
-        _schedule_source_agol(source, connection, organization)
-
-        # create AGOL resources
-        feature_service = agol.get_or_create_caracal_feature_service(agol_account)
-        layer = agol.create_custom_source_feature_layer(
-            title=source.name,
-            description=source.description,
-            feature_service=feature_service,
-            agol_account=agol_account
-        )
-
-        connection.agol_layer_id = layer.id
-        connection.save()
+        _enqueue_provision_source_agol(connection)
 
     if data.get("output_kml", False):
         _schedule_source_kml(source, organization)
@@ -106,30 +99,66 @@ def update_source_outputs(data, source, user):
             agol_account = user.agol_account
 
             if output_agol:
-                # create a connection and schedule update
+                # create a connection, the AGOL layer and update schedule are created by a job
                 connection = DataConnection.objects.create(
                     organization=user.organization,
                     account=user,
                     custom_source=source,
-                    agol_account=user.agol_account,
-                )
-                _schedule_source_agol(source, connection, user.organization)
-
-                # get or create AGOL resources
-                feature_service = agol.get_or_create_caracal_feature_service(
-                    agol_account
+                    agol_account=agol_account,
                 )
-                layer = agol.create_custom_source_feature_layer(
-                    source.name, source.description, feature_service, agol_account
-                )
-
-                connection.agol_layer_id = layer.id
-                connection.save()
+                _enqueue_provision_source_agol(connection)
 
             else:
                 delete_source_agol(connection=connection)
 
 
+def provision_source_agol(connection_id):
+    "Creates the AGOL layer and schedules the Lambda AGOL update of a connection, skipping whatever already exists."
+
+    try:
+        connection = DataConnection.objects.select_related(
+            "agol_account", "custom_source", "organization"
+        ).get(pk=connection_id)
+    except DataConnection.DoesNotExist:
+        print("connection deleted before provisioning, no problem")
+        return
+
+    source = connection.custom_source
+    agol_account = connection.agol_account
+
+    if connection.agol_layer_id is None:
+        feature_service = agol.get_or_create_caracal_feature_service(agol_account)
+        layer = agol.create_custom_source_feature_layer(
+            title=source.name,
+            description=source.description,
+            feature_service=feature_service,
+            agol_account=agol_account
+        )
+
+        # the connection was deleted while the layer was created
+        if not DataConnection.objects.filter(pk=connection_id).update(agol_layer_id=layer.id):
+            agol.delete_feature_layers(
+                layer_ids=[layer.id],
+                feature_service_url=agol_account.feature_service_url,
+                agol_account=agol_account,
+            )
+            return
+
+    if connection.cloudwatch_update_rule_name is None:
+        rule_name = _schedule_source_agol(source, connection, connection.organization)
+        if not DataConnection.objects.filter(pk=connection_id).update(cloudwatch_update_rule_name=rule_name):
+            schedules.delete_schedule(rule_name)
+
+
+def _enqueue_provision_source_agol(connection):
+    return queue.enqueue(
+        "outputs.provision_source_agol",
+        {"connection_id": connection.pk},
+        organization=connection.organization,
+        idempotency_key=f"outputs.provision_source_agol:{connection.pk}",
+    )
+
+
 def _get_source_update_agol_rule_name(short_name, source_uid, stage):
     "docs"
 
@@ -171,7 +200,7 @@ def _schedule_source_agol(source, connection, organization):
         short_name, source.uid, settings.STAGE
     )
 
-    _lambda.schedule_lambda_function(
+    schedules.schedule_lambda_function(
         fn_arn=update_agol_function["arn"],
         fn_name=update_agol_function["name"],
         rule_input=update_agol_input,
@@ -179,8 +208,7 @@ def _schedule_source_agol(source, connection, organization):
         rate_minutes=settings.AGOL_UPDATE_RATE_MINUTES
     )
 
-    connection.cloudwatch_update_rule_name = rule_name
-    connection.save()
+    return rule_name
 
 
 def _schedule_source_kml(source, organization):
@@ -189,7 +217,7 @@ def _schedule_source_kml(source, organization):
     function_name = f"caracal_{settings.STAGE.lower()}_update_custom_source_kml"
     update_kml_function = _lambda.get_lambda_function(function_name)
 
-    rule_names = list()
+    rule_names, kml_schedules = list(), list()
     for period in settings.KML_PERIOD_HOURS:
 
         rate_minutes = int(period / 2.5)
@@ -202,13 +230,15 @@ def _schedule_source_kml(source, organization):
         )
         rule_names.append(rule_name)
 
-        _lambda.schedule_lambda_function(
-            fn_arn=update_kml_function["arn"],
-            fn_name=update_kml_function["name"],
-            rule_input=update_kml_input,
-            rule_name=rule_name,
-            rate_minutes=rate_minutes,
-        )
+        kml_schedules.append({
+            "fn_arn": update_kml_function["arn"],
+            "fn_name": update_kml_function["name"],
+            "rule_input": update_kml_input,
+            "rule_name": rule_name,
+            "rate_minutes": rate_minutes,
+        })
+
+    schedules.schedule_lambda_functions(kml_schedules)
 
     source.cloudwatch_update_kml_rule_names = ",".join(rule_names)
     source.save()
@@ -0,0 +1,31 @@
+from functools import wraps
+from rest_framework import status
+from rest_framework.response import Response
+
+from caracal.common.write_keys import WriteKeyCache
+from custom_source.models import Source
+
+
+source_write_keys = WriteKeyCache(Source)
+
+
+def check_source_exists(f):
+    "Checks that the source identified by the write key exists and passes it to the view."
+
+    @wraps(f)
+    def wrapper(view, request, *args, **kwargs):
+
+        # batch uploads can send a bare list with the write key in the query string
+        data = request.data if isinstance(request.data, dict) else request.query_params
+        write_key = data.get('write_key')
+
+        source = source_write_keys.get(write_key) if write_key else None
+        if source is None:
+            return Response({
+                'error': 'source_does_not_exist',
+                'message': 'source account does not exist'
+            }, status=status.HTTP_400_BAD_REQUEST)
+
+        return f(view, request, *args, source=source, **kwargs)
+
+    return wrapper
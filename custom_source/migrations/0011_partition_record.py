@@ -0,0 +1,50 @@
+from django.conf import settings
+from django.db import migrations, models
+import uuid
+
+from caracal.common import partitions
+
+
+TABLE = 'custom_source_record'
+
+
+def partition_record(apps, schema_editor):
+    with schema_editor.connection.cursor() as cursor:
+        partitions.partition_table(cursor, TABLE, settings.PARTITION_MONTHS_AHEAD)
+
+        cursor.execute(f'ALTER TABLE {TABLE} ADD CONSTRAINT {TABLE}_pkey PRIMARY KEY (id, datetime_recorded)')
+        cursor.execute(f'ALTER TABLE {TABLE} ADD CONSTRAINT {TABLE}_source_id_fk FOREIGN KEY (source_id) '
+                       f'REFERENCES custom_source_source (id) DEFERRABLE INITIALLY DEFERRED')
+        cursor.execute(f'ALTER TABLE {TABLE} ADD CONSTRAINT {TABLE}_device_id_fk FOREIGN KEY (device_id) '
+                       f'REFERENCES custom_source_device (id) DEFERRABLE INITIALLY DEFERRED')
+        cursor.execute(f'CREATE INDEX {TABLE}_source_id ON {TABLE} (source_id)')
+        cursor.execute(f'CREATE INDEX {TABLE}_device_id ON {TABLE} (device_id)')
+        cursor.execute(f'CREATE INDEX {TABLE}_position_id ON {TABLE} USING GIST (position)')
+        cursor.execute(f'CREATE INDEX {TABLE}_uid ON {TABLE} (uid)')
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('custom_source', '0010_auto_20201116_0920'),
+    ]
+
+    operations = [
+        migrations.SeparateDatabaseAndState(
+            database_operations=[
+                migrations.RunPython(partition_record),
+            ],
+            state_operations=[
+                migrations.AlterField(
+                    model_name='record',
+                    name='uid',
+                    field=models.UUIDField(db_index=True, default=uuid.uuid4, editable=False),
+                ),
+                migrations.AlterField(
+                    model_name='record',
+                    name='datetime_recorded',
+                    field=models.DateTimeField(),
+                ),
+            ],
+        ),
+    ]
@@ -0,0 +1,24 @@
+import django.contrib.postgres.indexes
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('custom_source', '0011_partition_record'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='record',
+            index=models.Index(fields=['device', 'datetime_recorded'], name='record_device_dt_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='record',
+            index=models.Index(fields=['source', 'datetime_recorded'], name='record_source_dt_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='record',
+            index=django.contrib.postgres.indexes.BrinIndex(fields=['datetime_recorded'], name='record_dt_brin'),
+        ),
+    ]
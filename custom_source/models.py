@@ -2,6 +2,7 @@
 from datetime import datetime, timezone
 from django.conf import settings
 from django.contrib.gis.db import models
+from django.contrib.postgres.indexes import BrinIndex
 import uuid
 
 from account.models import Account, Organization
@@ -26,15 +27,15 @@ class Device(BaseAsset):
 
 class Record(models.Model):
 
-    # house keeping
-    uid = models.UUIDField(unique=True, editable=False, default=uuid.uuid4)
+    # house keeping - partitioned by month on datetime_recorded so unique constraints must include it
+    uid = models.UUIDField(editable=False, default=uuid.uuid4, db_index=True)
     datetime_created = models.DateTimeField(default=get_utc_datetime_now)
     source = models.ForeignKey('Source', on_delete=models.CASCADE)
     device = models.ForeignKey(Device, on_delete=models.CASCADE, null=True, related_name="records")
 
     # where and when
     position = models.PointField(srid=settings.SRID, null=False) # fixme: allow to specify srid
-    datetime_recorded = models.DateTimeField(null=True)
+    datetime_recorded = models.DateTimeField()
 
     # optional
     alt_m = models.DecimalField(max_digits=12, decimal_places=2, null=True)
@@ -43,6 +44,11 @@ class Record(models.Model):
 
     class Meta:
         ordering = ['-datetime_created']
+        indexes = [
+            models.Index(fields=['device', 'datetime_recorded'], name='record_device_dt_idx'),
+            models.Index(fields=['source', 'datetime_recorded'], name='record_source_dt_idx'),
+            BrinIndex(fields=['datetime_recorded'], name='record_dt_brin'),
+        ]
 
     def __str__(self):
         return f'{self.position}'
@@ -1,13 +1,14 @@
 
+from datetime import timedelta
 from rest_framework import serializers
 import uuid
 
+from caracal.common import gis
+from caracal.common.models import get_utc_datetime_now
 from custom_source.models import Device, Source
 
 
-class AddRecordSerializer(serializers.Serializer):
-
-    write_key = serializers.CharField()
+class AddBatchRecordSerializer(serializers.Serializer):
 
     datetime_recorded = serializers.DateTimeField()
     lat = serializers.DecimalField(max_digits=None, decimal_places=None)
@@ -19,6 +20,15 @@ class AddRecordSerializer(serializers.Serializer):
     temp_c = serializers.DecimalField(max_digits=None, decimal_places=None, required=False)
 
 
+class AddRecordSerializer(AddBatchRecordSerializer):
+    write_key = serializers.CharField()
+
+
+class AddRecordsSerializer(serializers.Serializer):
+    write_key = serializers.CharField()
+    records = serializers.ListField(child=serializers.DictField(), allow_empty=False)
+
+
 class AddSourceSerializer(serializers.Serializer):
 
     name = serializers.CharField(max_length=200)
@@ -69,15 +79,21 @@ class GetDevicesSerializer(serializers.HyperlinkedModelSerializer):
     class Meta:
         model = Device
         fields = ['url', 'uid', 'datetime_created', 'datetime_updated',
-                  'datetime_last_position', 'name', 'description', 'device_id']
+                  'datetime_deleted', 'is_active', 'datetime_last_position', 'name',
+                  'description', 'device_id']
 
 
 class GetDeviceDetailSerializer(serializers.HyperlinkedModelSerializer):
 
+    path_day = serializers.SerializerMethodField()
+    def get_path_day(self, device):
+        then = get_utc_datetime_now() - timedelta(hours=24)
+        return gis.get_queryset_path_metrics(device.records.filter(datetime_recorded__gte=then))
+
     class Meta:
         model = Device
         fields = ['uid', 'datetime_created', 'datetime_updated',
-                  'name', 'description', 'device_id']
+                  'name', 'description', 'device_id', 'path_day']
 
 
 class GetSourcesSerializer(serializers.HyperlinkedModelSerializer):
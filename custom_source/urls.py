@@ -5,6 +5,7 @@ from custom_source import views
 urlpatterns = [
 
     path('add_record/', views.AddRecordView.as_view()),
+    path('add_records/', views.AddRecordsView.as_view()),
     path('add_source/', views.AddSourceView.as_view()),
     path('delete_source/', views.DeleteSourceView.as_view()),
     path('get_devices/', views.GetDevicesView.as_view()),
@@ -2,88 +2,136 @@ from datetime import datetime, timezone
 from django.conf import settings
 from django.contrib.gis.geos import Point
 from rest_framework import permissions, status, generics, views
+from rest_framework.parsers import JSONParser
 from rest_framework.response import Response
 import stripe
 
 from activity.models import ActivityChange
 from auth.backends import CognitoAuthentication
-from caracal.common import agol
 from caracal.common.aws_utils import kinesis
 from caracal.common.models import get_num_sources
+from caracal.common.pagination import ChangesKeysetPagination
+from caracal.common.parsers import NDJSONParser
 from caracal.common.decorators import check_agol_account_connected, check_source_limit
 from custom_source import serializers
 from custom_source import connections as source_connections
+from custom_source.decorators import check_source_exists
 from custom_source.models import Device, Record, Source
+from jobs import queue
 from outputs.models import AgolAccount
 
 
+REALTIME_USER_STREAM_NAME = "caracal_realtime_user"  # fixme: move to env vars
+
+
 class AddRecordView(views.APIView):
 
     authentication_classes = []
     permission_classes = [permissions.AllowAny]
     serializer_class = serializers.AddRecordSerializer
 
-    def post(self, request):
+    @check_source_exists
+    def post(self, request, source):
         serializer = serializers.AddRecordSerializer(data=request.data)
         serializer.is_valid(True)
 
         device_id = serializer.data["device_id"]
-        write_key = serializer.data["write_key"]
-
-        try:
-            source = Source.objects.get(write_key=write_key, is_active=True)
-        except Source.DoesNotExist:
-            return Response(
-                {
-                    "error": "source_does_not_exist",
-                    "message": "source account does not exist",
-                },
-                status=status.HTTP_400_BAD_REQUEST,
-            )
 
         try:  # this might be a bottleneck later on
             device = Device.objects.get(device_id=device_id, source=source)
         except Device.DoesNotExist:
             device = Device.objects.create(device_id=device_id, source=source)
 
-        datetime_recorded = serializer.data["datetime_recorded"]
-        lat = round(float(serializer.data["lat"]), 6)
-        lon = round(float(serializer.data["lon"]), 6)
-        alt_m = round(float(serializer.data.get("alt_m")), 2)
-        speed_kmh = round(float(serializer.data.get("speed_kmh")), 2)
-        temp_c = round(float(serializer.data.get("temp_c")), 2)
-
-        payload = {
-            "device_id": device.pk,
-            "source_id": source.pk,
-            "datetime_recorded": datetime_recorded,
-            "lat": lat,
-            "lon": lon,
-            "alt_m": alt_m,
-            "speed_kmh": speed_kmh,
-            "temp_c": temp_c,
-        }
+        payload = _get_record_payload(serializer.data, source, device)
 
         if settings.STAGE in ["testing", "development"]:
-            position = Point(lon, lat, srid=settings.SRID)   
-            Record.objects.create(
-                source=source, 
-                device=device, 
-                position=position,
-                datetime_recorded=datetime_recorded,
-                alt_m=alt_m,
-                speed_kmh=speed_kmh,
-                temp_c=temp_c
-            )
+            Record.objects.create(**_get_record_kwargs(payload))
 
         else:
-            kinesis.put_firehose_record(
-                payload, "caracal_realtime_user"
-            )  # fixme: move to env vars
+            kinesis.put_firehose_record(payload, REALTIME_USER_STREAM_NAME)
 
         return Response(status=status.HTTP_201_CREATED)
 
 
+class AddRecordsView(views.APIView):
+    "Adds a batch of records for one source, posted as JSON or NDJSON."
+
+    authentication_classes = []
+    permission_classes = [permissions.AllowAny]
+    parser_classes = [JSONParser, NDJSONParser]
+    serializer_class = serializers.AddRecordsSerializer
+
+    @check_source_exists
+    def post(self, request, source):
+
+        # NDJSON bodies are a bare list of records so the write key goes in the query string
+        if isinstance(request.data, list):
+            data = {
+                "write_key": request.query_params.get("write_key"),
+                "records": request.data,
+            }
+        else:
+            data = request.data
+
+        serializer = serializers.AddRecordsSerializer(data=data)
+        serializer.is_valid(True)
+
+        records = serializer.validated_data["records"]
+
+        if len(records) > settings.CUSTOM_SOURCE_MAX_BATCH_RECORDS:
+            return Response(
+                {
+                    "error": "too_many_records",
+                    "message": f"maximum of {settings.CUSTOM_SOURCE_MAX_BATCH_RECORDS} records per request",
+                },
+                status=status.HTTP_400_BAD_REQUEST,
+            )
+
+        results = list()
+        valid_records = list()  # (index, data)
+        for index, record in enumerate(records):
+            record_serializer = serializers.AddBatchRecordSerializer(data=record)
+            if record_serializer.is_valid():
+                valid_records.append((index, record_serializer.data))
+                results.append({"index": index, "accepted": True})
+            else:
+                results.append({"index": index, "accepted": False, "errors": record_serializer.errors})
+
+        if valid_records:
+            devices = _get_or_create_devices(source, {data["device_id"] for _, data in valid_records})
+            payloads = [
+                _get_record_payload(data, source, devices[data["device_id"]])
+                for _, data in valid_records
+            ]
+
+            if settings.STAGE in ["testing", "development"]:
+                Record.objects.bulk_create(
+                    [Record(**_get_record_kwargs(payload)) for payload in payloads]
+                )
+
+            else:
+                failed_indexes = kinesis.put_firehose_records(payloads, REALTIME_USER_STREAM_NAME)
+                for failed_index in failed_indexes:
+                    index = valid_records[failed_index][0]
+                    results[index] = {
+                        "index": index,
+                        "accepted": False,
+                        "errors": {"non_field_errors": ["record could not be delivered, please retry"]},
+                    }
+
+        num_accepted = len([result for result in results if result["accepted"]])
+        response_status = status.HTTP_201_CREATED if num_accepted > 0 else status.HTTP_400_BAD_REQUEST
+
+        return Response(
+            {
+                "num_accepted": num_accepted,
+                "num_rejected": len(results) - num_accepted,
+                "results": results,
+            },
+            status=response_status,
+        )
+
+
 class AddSourceView(generics.GenericAPIView):
 
     authentication_classes = [CognitoAuthentication]
@@ -161,6 +209,7 @@ class GetDevicesView(generics.ListAPIView):
 
     authentication_classes = [CognitoAuthentication]
     permission_classes = [permissions.IsAuthenticated]
+    pagination_class = ChangesKeysetPagination
     serializer_class = serializers.GetDevicesSerializer
 
     def get_queryset(self):
@@ -180,7 +229,12 @@ class GetDevicesView(generics.ListAPIView):
         except Source.DoesNotExist:
             return Device.objects.none()
 
-        return Device.objects.filter(source=source, is_active=True)
+        # changes include deactivated devices as tombstones
+        devices = Device.objects.filter(source=source)
+        if not ChangesKeysetPagination.is_changes_request(self.request):
+            devices = devices.filter(is_active=True)
+
+        return devices
 
 
 class GetDeviceDetailView(generics.RetrieveAPIView):
@@ -247,37 +301,7 @@ class UpdateDeviceView(generics.GenericAPIView):
             return Response(status=status.HTTP_403_FORBIDDEN)
 
         # do this before updating device so we know old values
-        # if there is a connected AGOL layer, update features in the layer on device_id
-        # this should just return one connection...
-        agol_connections = device.source.connections.filter(
-            agol_account__isnull=False
-        )
-        for agol_connection in agol_connections:
-
-            attributes = dict()
-            if "name" in update_data and update_data["name"] != device.name:
-                attributes["Name"] = update_data["name"]
-
-            if len(attributes) > 0:
-
-                agol_account = agol_connection.agol_account
-
-                # TODO: this is grossly inefficient, but AGOL doesn't seem to have an update with where clause
-
-                features = agol.get_custom_source_features(
-                    agol_account=agol_account,
-                    device_id=device.device_id,
-                    layer_id=agol_connection.agol_layer_id
-                )
-
-                print(f'Updating {len(features)} features')
-                updates = [(f.id, attributes, None) for f in features]  
-
-                agol.update_features(
-                    agol_account=agol_account,
-                    layer_id=agol_connection.agol_layer_id,
-                    updates=updates
-                )
+        agol_changed = "name" in update_data and update_data["name"] != device.name
 
         now = datetime.utcnow().replace(tzinfo=timezone.utc)
         Device.objects.filter(uid=device_uid).update(
@@ -289,6 +313,16 @@ class UpdateDeviceView(generics.GenericAPIView):
             organization=user.organization, account=user, message=message
         )
 
+        # if there is a connected AGOL layer, features are updated on device_id in the background
+        if agol_changed and device.source.connections.filter(agol_account__isnull=False).exists():
+            job = queue.enqueue(
+                "agol.sync_device_features",
+                {"device_id": device.pk},
+                organization=user.organization,
+                idempotency_key=f"agol.sync_device_features:{device.pk}",
+            )
+            return Response({"job_uid": job.uid}, status=status.HTTP_200_OK)
+
         return Response(status=status.HTTP_200_OK)
 
 
@@ -349,3 +383,50 @@ class UpdateSourceView(generics.GenericAPIView):
         )
 
         return Response(status=status.HTTP_200_OK)
+
+
+def _get_or_create_devices(source, device_ids):
+    "Returns a dictionary of device_id to Device, creating any that do not exist yet."
+
+    devices = {
+        device.device_id: device
+        for device in Device.objects.filter(source=source, device_id__in=device_ids)
+    }
+
+    new_devices = [
+        Device(device_id=device_id, source=source)
+        for device_id in device_ids if device_id not in devices
+    ]
+    for device in Device.objects.bulk_create(new_devices):
+        devices[device.device_id] = device
+
+    return devices
+
+
+def _get_record_kwargs(payload):
+    return {
+        "source_id": payload["source_id"],
+        "device_id": payload["device_id"],
+        "position": Point(payload["lon"], payload["lat"], srid=settings.SRID),
+        "datetime_recorded": payload["datetime_recorded"],
+        "alt_m": payload["alt_m"],
+        "speed_kmh": payload["speed_kmh"],
+        "temp_c": payload["temp_c"],
+    }
+
+
+def _get_record_payload(data, source, device):
+    return {
+        "device_id": device.pk,
+        "source_id": source.pk,
+        "datetime_recorded": data["datetime_recorded"],
+        "lat": _round(data["lat"], 6),
+        "lon": _round(data["lon"], 6),
+        "alt_m": _round(data.get("alt_m"), 2),
+        "speed_kmh": _round(data.get("speed_kmh"), 2),
+        "temp_c": _round(data.get("temp_c"), 2),
+    }
+
+
+def _round(value, ndigits):
+    return round(float(value), ndigits) if value is not None else None
@@ -3,7 +3,8 @@ from django.conf import settings
 import json
 
 from caracal.common import agol, google
-from caracal.common.aws_utils import cloudwatch, _lambda
+from caracal.common.aws_utils import _lambda
+from jobs import schedules
 from outputs.models import AgolAccount, DataConnection
 
 
@@ -29,7 +30,7 @@ def schedule_drives_get_data(drive_account, organization):
         'account_uid': str(drive_account.uid)
     }
 
-    _lambda.schedule_lambda_function(
+    schedules.schedule_lambda_function(
         fn_arn=lambda_function['arn'],
         fn_name=lambda_function['name'],
         rule_input=get_data_rule_input,
@@ -68,7 +69,7 @@ def delete_drives_kml(drive_account):
     if drive_account.cloudwatch_update_kml_rule_names:
         update_kml_rule_names = drive_account.cloudwatch_update_kml_rule_names.split(',')
         for rule_name in update_kml_rule_names:
-            cloudwatch.delete_cloudwatch_rule(rule_name)
+            schedules.delete_schedule(rule_name)
 
     drive_account.cloudwatch_update_kml_rule_names = None
     drive_account.save()
@@ -91,7 +92,7 @@ def delete_drives_agol(agol_account=None, drive_account=None, connection=None):
         layer_ids = list(sheet_ids_to_layer_ids.values())
         agol.delete_feature_layers(layer_ids, agol_account.feature_service_url, agol_account)
 
-    cloudwatch.delete_cloudwatch_rule(connection.cloudwatch_update_rule_name)
+    schedules.delete_schedule(connection.cloudwatch_update_rule_name)
     connection.delete()
 
 
@@ -233,7 +234,7 @@ def _schedule_drives_agol(drive_account, connection, organization):
     rule_name = _get_drives_update_agol_rule_name(short_name, drive_account.uid, settings.STAGE, drive_account.provider,
                                                  drive_account.file_type)
 
-    _lambda.schedule_lambda_function(update_agol_function['arn'], update_agol_function['name'], update_agol_input,
+    schedules.schedule_lambda_function(update_agol_function['arn'], update_agol_function['name'], update_agol_input,
                                  rule_name, settings.AGOL_UPDATE_RATE_MINUTES)
 
     connection.cloudwatch_update_rule_name = rule_name
@@ -253,7 +254,7 @@ def _schedule_drives_kml(drive_account, organization):
     short_name = organization.short_name
     rule_name = _get_drives_update_kml_rule_name(short_name, drive_account.uid, settings.STAGE, drive_account.provider,
                                                 drive_account.file_type)
-    _lambda.schedule_lambda_function(update_kml_function['arn'], update_kml_function['name'], update_kml_input,
+    schedules.schedule_lambda_function(update_kml_function['arn'], update_kml_function['name'], update_kml_input,
                                  rule_name, settings.DRIVE_KML_UPDATE_RATE_MINUTES)
 
     drive_account.cloudwatch_update_kml_rule_names = rule_name
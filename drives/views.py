@@ -14,12 +14,12 @@ from auth.backends import CognitoAuthentication
 from caracal.common import agol
 from caracal.common import google as google_utils
 from caracal.common.google import GoogleException
-from caracal.common.aws_utils import cloudwatch
 from caracal.common.decorators import check_agol_account_connected, check_source_limit
 from caracal.common.models import get_num_sources
 from drives import serializers
 from drives import connections as drives_connections
 from drives.models import DriveFileAccount
+from jobs import schedules
 from outputs.models import AgolAccount
 
 
@@ -60,7 +60,13 @@ class AddDriveFileAccountView(generics.GenericAPIView):
             user.temp_google_oauth_access_token = None
             user.temp_google_oauth_access_token_expiry = None
             user.temp_google_oauth_refresh_token = None
-            user.save()
+            user.save(
+                update_fields=[
+                    "temp_google_oauth_access_token",
+                    "temp_google_oauth_access_token_expiry",
+                    "temp_google_oauth_refresh_token",
+                ]
+            )
 
         # at this point the drive account will have active tokens
 
@@ -119,7 +125,7 @@ class DeleteDriveFileAccountView(generics.GenericAPIView):
         if drive_account.organization != request.user.organization:
             return Response(status=status.HTTP_403_FORBIDDEN)
 
-        cloudwatch.delete_cloudwatch_rule(drive_account.cloudwatch_get_data_rule_name)
+        schedules.delete_schedule(drive_account.cloudwatch_get_data_rule_name)
 
         drives_connections.delete_drives_kml(drive_account)
 
@@ -187,7 +193,7 @@ class GetGoogleDriveFilesView(views.APIView):
             user.temp_google_oauth_access_token = google_utils.refresh_google_token(
                 user.temp_google_oauth_refresh_token
             )
-            user.save()
+            user.save(update_fields=["temp_google_oauth_access_token"])
 
         # fixme: documents is None sometimes - possibly to do with the temp tokens?
         documents = google_utils.get_google_drive_files(
@@ -234,7 +240,7 @@ class GetGoogleSpreadsheetSheetsView(views.APIView):
             user.temp_google_oauth_access_token = google_utils.refresh_google_token(
                 user.temp_google_oauth_refresh_token
             )
-            user.save()
+            user.save(update_fields=["temp_google_oauth_access_token"])
 
         spreadsheet = google_utils.get_google_drive_spreadsheet(
             file_id, access_token=user.temp_google_oauth_access_token
@@ -406,7 +412,13 @@ class GoogleOauthResponseView(views.APIView):
                 )
                 return redirect(state["failure_callback"])
 
-            user.save()
+            user.save(
+                update_fields=[
+                    "temp_google_oauth_access_token",
+                    "temp_google_oauth_access_token_expiry",
+                    "temp_google_oauth_refresh_token",
+                ]
+            )
 
         return redirect(state["callback"])
 
@@ -1,5 +1,13 @@
 from django.apps import AppConfig
+from django.db.models.signals import post_delete, post_save
 
 
 class JackalConfig(AppConfig):
     name = 'jackal'
+
+    def ready(self):
+        from jackal.decorators import network_write_keys
+        from jackal.models import Network
+
+        post_save.connect(network_write_keys.invalidate_instance, sender=Network)
+        post_delete.connect(network_write_keys.invalidate_instance, sender=Network)
@@ -2,7 +2,8 @@ from datetime import datetime, timezone
 from django.conf import settings
 
 from caracal.common import agol
-from caracal.common.aws_utils import cloudwatch, _lambda
+from caracal.common.aws_utils import _lambda
+from jobs import schedules
 from outputs.models import AgolAccount, DataConnection, JackalAgolConnection
 
 
@@ -36,7 +37,7 @@ def delete_jackal_agol(agol_account=None, network=None, connection=None):
         agol_account=agol_account,
     )
 
-    cloudwatch.delete_cloudwatch_rule(connection.cloudwatch_update_rule_name)
+    schedules.delete_schedule(connection.cloudwatch_update_rule_name)
 
     jackal_agol_connection.delete()
     connection.delete()
@@ -47,7 +48,7 @@ def delete_jackal_kml(network):
     if network.cloudwatch_update_kml_rule_names:
         update_kml_rule_names = network.cloudwatch_update_kml_rule_names.split(",")
         for rule_name in update_kml_rule_names:
-            cloudwatch.delete_cloudwatch_rule(rule_name)
+            schedules.delete_schedule(rule_name)
 
     network.cloudwatch_update_kml_rule_names = None
     network.save()
@@ -68,7 +69,7 @@ def schedule_jackal_excel(network, organization):
         stage=settings.STAGE
     )
 
-    _lambda.schedule_lambda_function(
+    schedules.schedule_lambda_function(
         fn_arn=create_excel_function["arn"],
         fn_name=create_excel_function["name"],
         rule_input=create_excel_input,
@@ -239,7 +240,7 @@ def _schedule_update_jackal_agol(network, connection, organization):
         stage=settings.STAGE
     )
 
-    _lambda.schedule_lambda_function(
+    schedules.schedule_lambda_function(
         fn_arn=update_agol_function["arn"],
         fn_name=update_agol_function["name"],
         rule_input=update_agol_input,
@@ -256,7 +257,7 @@ def _schedule_jackal_kml(network, organization):
     function_name = f"caracal_{settings.STAGE.lower()}_update_jackal_kml"
     update_kml_function = _lambda.get_lambda_function(function_name)
 
-    rule_names = list()
+    rule_names, kml_schedules = list(), list()
     for period in settings.KML_PERIOD_HOURS:
 
         rate_minutes = int(period / 2.5)  # longer for larger periods
@@ -275,13 +276,15 @@ def _schedule_jackal_kml(network, organization):
 
         rule_names.append(rule_name)
 
-        _lambda.schedule_lambda_function(
-            fn_arn=update_kml_function["arn"],
-            fn_name=update_kml_function["name"],
-            rule_input=update_kml_input,
-            rule_name=rule_name,
-            rate_minutes=rate_minutes
-        )
+        kml_schedules.append({
+            "fn_arn": update_kml_function["arn"],
+            "fn_name": update_kml_function["name"],
+            "rule_input": update_kml_input,
+            "rule_name": rule_name,
+            "rate_minutes": rate_minutes
+        })
+
+    schedules.schedule_lambda_functions(kml_schedules)
 
     network.cloudwatch_update_kml_rule_names = ",".join(rule_names)
     network.save()
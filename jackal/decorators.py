@@ -1,32 +1,30 @@
-
 from functools import wraps
 from rest_framework import status
 from rest_framework.response import Response
 
+from caracal.common.write_keys import WriteKeyCache
 from jackal.models import Network, Phone
 
 
+network_write_keys = WriteKeyCache(Network)
+
+
 def check_network_exists(f):
-    "Checks that the network identified by the write key exists."
+    "Checks that the network identified by the write key exists and passes it to the view."
 
     @wraps(f)
     def wrapper(view, request, *args, **kwargs):
 
-        data = request.data
-        user = request.user
-
-        write_key = data['write_key']
+        write_key = request.data.get('write_key')
 
-        try:
-            network = Network.objects.get(write_key=write_key, is_active=True)
-        except Network.DoesNotExist:
+        network = network_write_keys.get(write_key) if write_key else None
+        if network is None:
             return Response({
                 'error': 'network_does_not_exist',
                 'message': 'Network does not exist.'
             }, status=status.HTTP_400_BAD_REQUEST)
 
-        return f(view, request, *args, **kwargs)
+        return f(view, request, *args, network=network, **kwargs)
     
     return wrapper
 
-    
\ No newline at end of file
@@ -0,0 +1,31 @@
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('jackal', '0016_auto_20200225_1925'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='call',
+            index=models.Index(fields=['phone', '-datetime_recorded'], name='jackal_call_phone_dt_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='contact',
+            index=models.Index(fields=['phone', '-datetime_recorded'], name='jackal_contact_phone_dt_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='location',
+            index=models.Index(fields=['phone', '-datetime_recorded'], name='jackal_location_phone_dt_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='log',
+            index=models.Index(fields=['phone', '-datetime_recorded'], name='jackal_log_phone_dt_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='text',
+            index=models.Index(fields=['phone', '-datetime_recorded'], name='jackal_text_phone_dt_idx'),
+        ),
+    ]
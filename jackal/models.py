@@ -82,6 +82,7 @@ class Call(BaseJackalRecording):
 
     class Meta:
         ordering = ['-datetime_recorded']
+        indexes = [models.Index(fields=['phone', '-datetime_recorded'], name='jackal_call_phone_dt_idx')]
         unique_together = ['phone', 'other_phone', 'datetime_recorded', 'is_sent', 'duration_secs']
 
 
@@ -93,6 +94,7 @@ class Contact(BaseJackalRecording):
 
     class Meta:
         ordering = ['-datetime_recorded']
+        indexes = [models.Index(fields=['phone', '-datetime_recorded'], name='jackal_contact_phone_dt_idx')]
         unique_together = ['phone', 'other_phone']
 
 
@@ -106,6 +108,7 @@ class Location(BaseJackalRecording):
 
     class Meta:
         ordering = ['-datetime_recorded']
+        indexes = [models.Index(fields=['phone', '-datetime_recorded'], name='jackal_location_phone_dt_idx')]
         unique_together = ['phone', 'datetime_recorded', 'position', 'accuracy_m']
 
 
@@ -119,6 +122,7 @@ class Log(BaseJackalRecording):
 
     class Meta:
         ordering = ['-datetime_recorded']
+        indexes = [models.Index(fields=['phone', '-datetime_recorded'], name='jackal_log_phone_dt_idx')]
 
 
 class Text(BaseJackalRecording):
@@ -132,6 +136,7 @@ class Text(BaseJackalRecording):
 
     class Meta:
         ordering = ['-datetime_recorded']
+        indexes = [models.Index(fields=['phone', '-datetime_recorded'], name='jackal_text_phone_dt_idx')]
         unique_together = ['phone', 'other_phone', 'datetime_recorded', 'is_sent', 'message']
 
 
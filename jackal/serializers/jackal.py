@@ -93,6 +93,10 @@ class GetPhonesSerializer(serializers.HyperlinkedModelSerializer):
             "mark",
             "phone_numbers",
             "datetime_last_update",
+            "datetime_created",
+            "datetime_updated",
+            "datetime_deleted",
+            "is_active",
         ]
 
 
@@ -162,8 +166,9 @@ class GetNetworkSerializer(serializers.ModelSerializer):
     # need to check on freshness of files under CloudFront
     csv_url = serializers.SerializerMethodField()
     def get_csv_url(self, network):
+        # rewritten under the same key by the excel Lambda function, so a reused url could serve a stale copy
         object_key = f'{network.organization.short_name}/excel/jackal.xlsx'
-        return s3.get_presigned_url(object_key, 'caracal-users', 3600)
+        return s3.get_presigned_url(object_key, 'caracal-users', 3600, reuse=False)
 
     def get_outputs(self, network):
         connection = network.connections.filter(agol_account__isnull=False).first()
@@ -207,6 +212,77 @@ class GetPhoneRecordingQueryParamSerializer(serializers.Serializer):
     phone_uid = serializers.UUIDField()
 
 
+# Sync Serializers - one row of a sync batch, the write key and device id are sent once per batch
+
+
+class SyncSerializer(serializers.Serializer):
+
+    write_key = serializers.CharField(max_length=100)
+    device_id = serializers.CharField(max_length=100)
+
+    calls = serializers.ListField(child=serializers.DictField(), required=False, default=list)
+    contacts = serializers.ListField(child=serializers.DictField(), required=False, default=list)
+    locations = serializers.ListField(child=serializers.DictField(), required=False, default=list)
+    logs = serializers.ListField(child=serializers.DictField(), required=False, default=list)
+    texts = serializers.ListField(child=serializers.DictField(), required=False, default=list)
+
+    def validate(self, attrs):
+        return validate_unknown_attrs(attrs, self.initial_data, self.fields)
+
+
+class SyncCallSerializer(serializers.Serializer):
+
+    datetime_recorded = serializers.DateTimeField()
+    is_sent = serializers.BooleanField(required=True)
+    other_phone_number = serializers.CharField(max_length=50)
+    duration_secs = serializers.IntegerField()
+
+    def validate(self, attrs):
+        return validate_unknown_attrs(attrs, self.initial_data, self.fields)
+
+
+class SyncContactSerializer(serializers.Serializer):
+
+    datetime_recorded = serializers.DateTimeField()
+    name = serializers.CharField(max_length=255)
+    phone_number = serializers.CharField(max_length=50)
+
+    def validate(self, attrs):
+        return validate_unknown_attrs(attrs, self.initial_data, self.fields)
+
+
+class SyncLocationSerializer(serializers.Serializer):
+
+    datetime_recorded = serializers.DateTimeField()
+    latitude = serializers.DecimalField(max_digits=None, decimal_places=None)
+    longitude = serializers.DecimalField(max_digits=None, decimal_places=None)
+    accuracy_m = serializers.DecimalField(max_digits=None, decimal_places=None)
+
+    def validate(self, attrs):
+        return validate_unknown_attrs(attrs, self.initial_data, self.fields)
+
+
+class SyncLogSerializer(serializers.Serializer):
+
+    datetime_recorded = serializers.DateTimeField()
+    level = serializers.CharField(max_length=50)
+    message = serializers.CharField()
+
+    def validate(self, attrs):
+        return validate_unknown_attrs(attrs, self.initial_data, self.fields)
+
+
+class SyncTextSerializer(serializers.Serializer):
+
+    datetime_recorded = serializers.DateTimeField()
+    is_sent = serializers.BooleanField()
+    other_phone_number = serializers.CharField(max_length=50)
+    message = serializers.CharField()
+
+    def validate(self, attrs):
+        return validate_unknown_attrs(attrs, self.initial_data, self.fields)
+
+
 class UpdateNetworkSerializer(serializers.Serializer):
 
     output_agol = serializers.NullBooleanField(required=False)
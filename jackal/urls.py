@@ -23,6 +23,7 @@ urlpatterns = [
     path('get_phones/', jackal.GetPhonesView.as_view()),
     path('get_phone/<str:uid>', jackal.GetPhoneDetailView.as_view(), name='phone-detail'), # deprecated
     path('get_texts/', jackal.GetTextsView.as_view()),
+    path('sync/', jackal.SyncView.as_view()),
     path('update_network/', jackal.UpdateNetworkView.as_view()),
     path('update_phone/', jackal.UpdatePhoneView.as_view()),
 
@@ -1,5 +1,7 @@
 from datetime import datetime, timezone
+from django.conf import settings
 from django.contrib.gis.geos import Point
+from django.db import transaction
 from django.db.utils import IntegrityError
 from rest_framework import permissions, status, generics, views
 from rest_framework.response import Response
@@ -7,8 +9,8 @@ import uuid
 
 from activity.models import ActivityChange
 from auth.backends import CognitoAuthentication
-from caracal.common import agol
 from caracal.common.models import get_utc_datetime_now
+from caracal.common.pagination import ChangesKeysetPagination, RecordedKeysetPagination
 from jackal import connections as jackal_connections
 from jackal.decorators import check_network_exists
 from jackal.models import (
@@ -23,8 +25,17 @@ from jackal.models import (
 )
 from jackal.serializers import jackal as serializers
 from jackal.views import utilities
+from jobs import queue
 
 
+SYNC_SERIALIZERS = {
+    "calls": serializers.SyncCallSerializer,
+    "contacts": serializers.SyncContactSerializer,
+    "locations": serializers.SyncLocationSerializer,
+    "logs": serializers.SyncLogSerializer,
+    "texts": serializers.SyncTextSerializer,
+}
+
 # do not change the response format of add_*/ routes!
 
 class AddCallView(generics.GenericAPIView):
@@ -34,7 +45,7 @@ class AddCallView(generics.GenericAPIView):
     serializer_class = serializers.AddCallSerializer
 
     @check_network_exists
-    def post(self, request):
+    def post(self, request, network):
         serializer = self.get_serializer(data=request.data)
         serializer.is_valid(True)
 
@@ -44,7 +55,6 @@ class AddCallView(generics.GenericAPIView):
         other_phone_number = add_data.pop("other_phone_number")
         datetime_recorded = add_data['datetime_recorded']
 
-        network = Network.objects.get(write_key=write_key, is_active=True)
         phone = utilities.get_or_create_phone(device_id, network)
         other_phone = _get_or_create_other_phone(other_phone_number, network)
 
@@ -81,7 +91,7 @@ class AddContactView(generics.GenericAPIView):
     serializer_class = serializers.AddContactSerializer
 
     @check_network_exists
-    def post(self, request):
+    def post(self, request, network):
         serializer = self.get_serializer(data=request.data)
         serializer.is_valid(True)
 
@@ -94,12 +104,8 @@ class AddContactView(generics.GenericAPIView):
             d["phone_number"]
         )
 
-        phone_number = phone_number.replace(" ", "")
-        phone_number = phone_number.replace("(", "")
-        phone_number = phone_number.replace(")", "")
-        phone_number = phone_number.replace("-", "")
+        phone_number = utilities.clean_phone_number(phone_number)
 
-        network = Network.objects.get(write_key=write_key, is_active=True)
         phone = utilities.get_or_create_phone(device_id, network)
         other_phone = _get_or_create_other_phone(phone_number, network)
 
@@ -129,7 +135,7 @@ class AddLocationView(generics.GenericAPIView):
     serializer_class = serializers.AddLocationSerializer
 
     @check_network_exists
-    def post(self, request):
+    def post(self, request, network):
         serializer = self.get_serializer(data=request.data)
         try:
             serializer.is_valid(True)
@@ -145,7 +151,6 @@ class AddLocationView(generics.GenericAPIView):
         latitude = round(float(add_data.pop("latitude")), 6)
         accuracy_m = round(float(add_data.pop("accuracy_m")), 2)
 
-        network = Network.objects.get(write_key=write_key, is_active=True)
         phone = utilities.get_or_create_phone(device_id, network)
 
         phone.datetime_last_update = get_utc_datetime_now()
@@ -174,14 +179,13 @@ class AddLogView(generics.GenericAPIView):
     serializer_class = serializers.AddLogSerializer
 
     @check_network_exists
-    def post(self, request):
+    def post(self, request, network):
         serializer = self.get_serializer(data=request.data)
         serializer.is_valid(True)
 
         data = serializer.data
         device_id, write_key = data.pop('device_id'), data.pop('write_key')
 
-        network = Network.objects.get(write_key=write_key)
         phone = utilities.get_or_create_phone(device_id, network)
 
         phone.datetime_last_update = get_utc_datetime_now()
@@ -203,7 +207,7 @@ class AddTextView(generics.GenericAPIView):
     serializer_class = serializers.AddTextSerializer
 
     @check_network_exists
-    def post(self, request):
+    def post(self, request, network):
         serializer = self.get_serializer(data=request.data)
         serializer.is_valid(True)
 
@@ -213,7 +217,6 @@ class AddTextView(generics.GenericAPIView):
         other_phone_number = add_data.pop("other_phone_number")
         datetime_recorded = add_data['datetime_recorded']
 
-        network = Network.objects.get(write_key=write_key, is_active=True)
         phone = utilities.get_or_create_phone(device_id, network)
         other_phone = _get_or_create_other_phone(other_phone_number, network)
 
@@ -288,26 +291,29 @@ class GetCallsView(generics.ListAPIView):
 
     authentication_classes = [CognitoAuthentication]
     permission_classes = [permissions.IsAuthenticated]
+    pagination_class = RecordedKeysetPagination
     serializer_class = serializers.CallSerializer
 
     def get_queryset(self):
-        return _get_recording_queryset(self.request, Call)
+        return _get_recording_queryset(self.request, Call).select_related("other_phone")
 
 
 class GetContactsView(generics.ListAPIView):
 
     authentication_classes = [CognitoAuthentication]
     permission_classes = [permissions.IsAuthenticated]
+    pagination_class = RecordedKeysetPagination
     serializer_class = serializers.ContactSerializer
 
     def get_queryset(self):
-        return _get_recording_queryset(self.request, Contact)
+        return _get_recording_queryset(self.request, Contact).select_related("other_phone")
 
 
 class GetLocationsView(generics.ListAPIView):
 
     authentication_classes = [CognitoAuthentication]
     permission_classes = [permissions.IsAuthenticated]
+    pagination_class = RecordedKeysetPagination
     serializer_class = serializers.LocationSerializer
 
     def get_queryset(self):
@@ -318,10 +324,11 @@ class GetTextsView(generics.ListAPIView):
 
     authentication_classes = [CognitoAuthentication]
     permission_classes = [permissions.IsAuthenticated]
+    pagination_class = RecordedKeysetPagination
     serializer_class = serializers.TextSerializer
 
     def get_queryset(self):
-        return _get_recording_queryset(self.request, Text)
+        return _get_recording_queryset(self.request, Text).select_related("other_phone")
 
 
 class GetNetworkView(generics.RetrieveAPIView):
@@ -342,15 +349,22 @@ class GetPhonesView(generics.ListAPIView):
 
     authentication_classes = [CognitoAuthentication]
     permission_classes = [permissions.IsAuthenticated]
+    pagination_class = ChangesKeysetPagination
     serializer_class = serializers.GetPhonesSerializer
 
     def get_queryset(self):
-        network = self.request.user.organization.jackal_network
         try:
-            return Phone.objects.filter(network=network, is_active=True)
+            network = self.request.user.organization.jackal_network
         except Network.DoesNotExist:
             return Phone.objects.none()
 
+        # changes include deactivated phones as tombstones
+        phones = Phone.objects.filter(network=network)
+        if not ChangesKeysetPagination.is_changes_request(self.request):
+            phones = phones.filter(is_active=True)
+
+        return phones
+
 
 class GetPhoneDetailView(generics.RetrieveAPIView):
 
@@ -367,6 +381,110 @@ class GetPhoneDetailView(generics.RetrieveAPIView):
             return Phone.objects.none()
 
 
+class SyncView(generics.GenericAPIView):
+    "Adds a batch of calls, contacts, locations, logs and texts recorded by one phone."
+
+    authentication_classes = []
+    permission_classes = [permissions.AllowAny]
+    serializer_class = serializers.SyncSerializer
+
+    @check_network_exists
+    def post(self, request, network):
+        serializer = self.get_serializer(data=request.data)
+        serializer.is_valid(True)
+
+        data = serializer.validated_data
+
+        num_records = sum([len(data[recording_type]) for recording_type in SYNC_SERIALIZERS])
+        if num_records > settings.JACKAL_SYNC_MAX_RECORDS:
+            return Response({
+                'error': 'too_many_records',
+                'message': f'maximum of {settings.JACKAL_SYNC_MAX_RECORDS} records per request'
+            }, status=status.HTTP_400_BAD_REQUEST)
+
+        results = dict()
+        valid = dict()
+        for recording_type, row_serializer_class in SYNC_SERIALIZERS.items():
+            valid[recording_type] = list()
+            errors = list()
+            for index, row in enumerate(data[recording_type]):
+                row_serializer = row_serializer_class(data=row)
+                if row_serializer.is_valid():
+                    valid[recording_type].append(row_serializer.validated_data)
+                else:
+                    errors.append({"index": index, "errors": row_serializer.errors})
+
+            results[recording_type] = {
+                "accepted": len(valid[recording_type]),
+                "rejected": len(errors),
+            }
+            if errors:
+                results[recording_type]["errors"] = errors
+
+        phone = utilities.get_or_create_phone(data["device_id"], network)
+
+        for contact in valid["contacts"]:
+            contact["phone_number"] = utilities.clean_phone_number(contact["phone_number"])
+
+        phone_numbers = {row["other_phone_number"] for row in valid["calls"] + valid["texts"]}
+        phone_numbers |= {row["phone_number"] for row in valid["contacts"]}
+        other_phones = utilities.get_or_create_other_phones(phone_numbers, network)
+
+        # calls and texts imply a contact, duplicates are dropped by the unique constraints
+        contacts = [
+            Contact(datetime_recorded=row["datetime_recorded"], network=network, phone=phone,
+                    other_phone=other_phones[row["phone_number"]])
+            for row in valid["contacts"]
+        ]
+        contacts += [
+            Contact(datetime_recorded=row["datetime_recorded"], network=network, phone=phone,
+                    other_phone=other_phones[row["other_phone_number"]])
+            for row in valid["calls"] + valid["texts"]
+        ]
+
+        calls = [
+            Call(network=network, phone=phone, other_phone=other_phones[row.pop("other_phone_number")], **row)
+            for row in valid["calls"]
+        ]
+
+        locations = [
+            Location(
+                network=network,
+                phone=phone,
+                datetime_recorded=row["datetime_recorded"],
+                position=Point(round(float(row["longitude"]), 6), round(float(row["latitude"]), 6)),
+                accuracy_m=round(float(row["accuracy_m"]), 2)
+            )
+            for row in valid["locations"]
+        ]
+
+        logs = [Log(network=network, phone=phone, **row) for row in valid["logs"]]
+
+        texts = [
+            Text(network=network, phone=phone, other_phone=other_phones[row.pop("other_phone_number")], **row)
+            for row in valid["texts"]
+        ]
+
+        # the last name sent for a number wins
+        named_other_phones = dict()
+        for row in valid["contacts"]:
+            other_phone = other_phones[row["phone_number"]]
+            other_phone.name = row["name"]
+            named_other_phones[other_phone.pk] = other_phone
+
+        with transaction.atomic():
+            for model, recordings in [(Call, calls), (Contact, contacts), (Location, locations), (Log, logs), (Text, texts)]:
+                model.objects.bulk_create(recordings, ignore_conflicts=True)
+
+            if named_other_phones:
+                OtherPhone.objects.bulk_update(list(named_other_phones.values()), ["name"])
+
+            phone.datetime_last_update = get_utc_datetime_now()
+            phone.save(update_fields=["datetime_last_update"])
+
+        return Response({"success": True, **results}, status=status.HTTP_201_CREATED)
+
+
 class UpdateNetworkView(generics.GenericAPIView):
 
     authentication_classes = [CognitoAuthentication]
@@ -436,35 +554,8 @@ class UpdatePhoneView(generics.GenericAPIView):
         if phone.network.organization != user.organization:
             return Response(status=status.HTTP_403_FORBIDDEN)
 
-        agol_connection = phone.network.connections.filter(
-            agol_account__isnull=False
-        ).first()
-        if agol_connection is not None:
-
-            attributes = dict()
-            if "name" in update_data and update_data["name"] != phone.name:
-                attributes["Name"] = update_data["name"]
-
-            if len(attributes) > 0:
-
-                agol_account = agol_connection.agol_account
-
-                # TODO: this is grossly inefficient, but AGOL doesn't seem to have an update with where clause
-
-                features = agol.get_jackal_features(
-                    agol_account=agol_account,
-                    device_id=phone.device_id,
-                    layer_id=agol_connection.agol_layer_id,
-                )
-
-                print(f"Updating {len(features)} features")
-                updates = [(f.id, attributes, None) for f in features]
-
-                agol.update_features(
-                    agol_account=agol_account,
-                    layer_id=agol_connection.agol_layer_id,
-                    updates=updates,
-                )
+        # do this before updating phone so we know old values
+        agol_changed = "name" in update_data and update_data["name"] != phone.name
 
         now = datetime.utcnow().replace(tzinfo=timezone.utc)
         Phone.objects.filter(uid=phone_uid).update(datetime_updated=now, **update_data)
@@ -474,6 +565,16 @@ class UpdatePhoneView(generics.GenericAPIView):
             organization=user.organization, account=user, message=message
         )
 
+        # if there is a connected AGOL layer, features are updated on device_id in the background
+        if agol_changed and phone.network.connections.filter(agol_account__isnull=False).exists():
+            job = queue.enqueue(
+                "agol.sync_phone_features",
+                {"phone_id": phone.pk},
+                organization=user.organization,
+                idempotency_key=f"agol.sync_phone_features:{phone.pk}",
+            )
+            return Response({"job_uid": job.uid}, status=status.HTTP_200_OK)
+
         return Response(status=status.HTTP_200_OK)
 
 
@@ -1,6 +1,12 @@
 
 from django.db.utils import IntegrityError
-from jackal.models import Phone
+from jackal.models import OtherPhone, Phone
+
+
+def clean_phone_number(phone_number):
+    for char in [" ", "(", ")", "-"]:
+        phone_number = phone_number.replace(char, "")
+    return phone_number
 
 
 def get_or_create_phone(device_id, network):
@@ -12,3 +18,23 @@ def get_or_create_phone(device_id, network):
         except IntegrityError:
             return Phone.objects.get(device_id=device_id, network=network)
 
+
+def get_or_create_other_phones(phone_numbers, network):
+    "Returns a dictionary of phone_number to OtherPhone, creating any that do not exist yet."
+
+    other_phones = {
+        other_phone.phone_number: other_phone
+        for other_phone in OtherPhone.objects.filter(network=network, phone_number__in=phone_numbers)
+    }
+
+    missing = [phone_number for phone_number in phone_numbers if phone_number not in other_phones]
+    if missing:
+        # another request may create some of these in between so ignore conflicts and fetch them again
+        OtherPhone.objects.bulk_create(
+            [OtherPhone(network=network, phone_number=phone_number) for phone_number in missing],
+            ignore_conflicts=True
+        )
+        for other_phone in OtherPhone.objects.filter(network=network, phone_number__in=missing):
+            other_phones[other_phone.phone_number] = other_phone
+
+    return other_phones
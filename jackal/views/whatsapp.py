@@ -26,7 +26,7 @@ class AddWhatsAppCallView(generics.GenericAPIView):
     serializer_class = serializers.AddWhatsAppCallSerializer
 
     @check_network_exists
-    def post(self, request):
+    def post(self, request, network):
         serializer = self.get_serializer(data=request.data)
         serializer.is_valid(True)
 
@@ -36,7 +36,6 @@ class AddWhatsAppCallView(generics.GenericAPIView):
         user_jid_id = add_data.pop("user_jid_id")
         user_user_string = add_data.pop("user_user_string")
 
-        network = Network.objects.get(write_key=write_key, is_active=True)
         phone = utilities.get_or_create_phone(device_id, network)
         whatsapp_user = _get_or_create_whatsapp_user(user_jid_id, user_user_string, phone, network)
 
@@ -63,7 +62,7 @@ class AddWhatsAppGroupParticipantView(generics.GenericAPIView):
     serializer_class = serializers.AddWhatsAppGroupParticipantSerializer
 
     @check_network_exists
-    def post(self, request):
+    def post(self, request, network):
         serializer = self.get_serializer(data=request.data)
         serializer.is_valid(True)
 
@@ -76,7 +75,6 @@ class AddWhatsAppGroupParticipantView(generics.GenericAPIView):
         user_jid_id = add_data.pop("user_jid_id")
         user_user_string = add_data.pop("user_user_string")
 
-        network = Network.objects.get(write_key=write_key, is_active=True)
         phone = utilities.get_or_create_phone(device_id, network)
 
         phone.datetime_last_update = get_utc_datetime_now()
@@ -99,7 +97,7 @@ class AddWhatsAppMessageView(generics.GenericAPIView):
     serializer_class = serializers.AddWhatsAppMessageSerializer
 
     @check_network_exists
-    def post(self, request):
+    def post(self, request, network):
         serializer = self.get_serializer(data=request.data)
         serializer.is_valid(True)
 
@@ -111,7 +109,6 @@ class AddWhatsAppMessageView(generics.GenericAPIView):
         user_jid_id = add_data.pop("user_jid_id", None)
         user_user_string = add_data.pop("user_user_string", None)
 
-        network = Network.objects.get(write_key=write_key, is_active=True)
         phone = utilities.get_or_create_phone(device_id, network)
 
         phone.datetime_last_update = get_utc_datetime_now()
@@ -149,7 +146,7 @@ class AddWhatsAppUserView(generics.GenericAPIView):
     serializer_class = serializers.AddWhatsAppUserSerializer
 
     @check_network_exists
-    def post(self, request):
+    def post(self, request, network):
         serializer = self.get_serializer(data=request.data)
         serializer.is_valid(True)
 
@@ -159,7 +156,6 @@ class AddWhatsAppUserView(generics.GenericAPIView):
         user_jid_id = add_data.pop("user_jid_id")
         user_user_string = add_data.pop("user_user_string")
 
-        network = Network.objects.get(write_key=write_key, is_active=True)
         phone = utilities.get_or_create_phone(device_id, network)
 
         phone.datetime_last_update = get_utc_datetime_now()
@@ -0,0 +1,21 @@
+from django.contrib import admin
+
+from jobs.models import Job, ScheduledJob
+
+
+@admin.register(Job)
+class JobAdmin(admin.ModelAdmin):
+    list_display = ['uid', 'datetime_created', 'organization', 'name', 'status', 'attempts']
+    search_fields = ['uid', 'name', 'idempotency_key']
+    list_filter = ['status', 'name']
+    ordering = ['-datetime_created']
+    readonly_fields = ['datetime_created', 'datetime_started', 'datetime_finished', 'last_error']
+
+
+@admin.register(ScheduledJob)
+class ScheduledJobAdmin(admin.ModelAdmin):
+    list_display = ['name', 'function_name', 'rate_minutes', 'datetime_last_run', 'next_run']
+    search_fields = ['uid', 'name', 'function_name']
+    list_filter = ['function_name']
+    ordering = ['next_run']
+    readonly_fields = ['datetime_created', 'datetime_updated', 'datetime_last_run']
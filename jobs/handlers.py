@@ -0,0 +1,63 @@
+from caracal.common import agol
+from caracal.common import connections as realtime_connections
+from caracal.common.models import RealTimeIndividual
+from custom_source import connections as source_connections
+from custom_source.models import Device
+from jackal.models import Phone
+from jobs.queue import register
+
+
+register('outputs.provision_realtime_agol')(realtime_connections.provision_realtime_agol)
+register('outputs.provision_source_agol')(source_connections.provision_source_agol)
+
+
+@register('agol.sync_individual_features')
+def sync_individual_features(individual_id):
+    "Writes a collar individual's current attributes to its features in every connected AGOL layer."
+
+    individual = RealTimeIndividual.objects.select_related('account').filter(pk=individual_id).first()
+    if individual is None:
+        return
+
+    attributes = {
+        'Name': individual.name,
+        'Type': individual.subtype,
+        'Sex': individual.sex,
+        'Status': individual.status
+    }
+    _sync_device_features(individual.device_id, individual.account.connections, attributes)
+
+
+@register('agol.sync_device_features')
+def sync_device_features(device_id):
+    "Writes a custom source device's current name to its features in every connected AGOL layer."
+
+    device = Device.objects.select_related('source').filter(pk=device_id).first()
+    if device is None:
+        return
+
+    _sync_device_features(device.device_id, device.source.connections, {'Name': device.name})
+
+
+@register('agol.sync_phone_features')
+def sync_phone_features(phone_id):
+    "Writes a Jackal phone's current name to its features in every connected AGOL layer."
+
+    phone = Phone.objects.select_related('network').filter(pk=phone_id).first()
+    if phone is None:
+        return
+
+    _sync_device_features(phone.device_id, phone.network.connections, {'Name': phone.name})
+
+
+def _sync_device_features(device_id, connections, attributes):
+    # the attributes are read when the job runs, so a retry or a later rename always writes the latest values
+    agol_connections = connections.filter(agol_account__isnull=False, agol_layer_id__isnull=False)\
+        .select_related('agol_account')
+
+    num_failed = 0
+    for agol_connection in agol_connections:
+        num_failed += agol.update_device_features(device_id, attributes, agol_connection)
+
+    if num_failed > 0:
+        raise RuntimeError(f'{num_failed} feature updates failed for {device_id}')
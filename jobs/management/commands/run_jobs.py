@@ -0,0 +1,24 @@
+from django.conf import settings
+from django.core.management.base import BaseCommand
+import time
+
+from jobs import queue
+
+
+class Command(BaseCommand):
+    help = 'Runs background jobs until stopped. Several workers can run at once.'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--once', action='store_true', help='Run the jobs that are due and exit.')
+        parser.add_argument('--batch-size', type=int, default=settings.JOB_BATCH_SIZE,
+                            help='Jobs claimed at a time.')
+
+    def handle(self, *args, **options):
+        while True:
+            num_jobs = queue.run_pending_jobs(options['batch_size'])
+
+            if options['once']:
+                if num_jobs == 0:
+                    break
+            elif num_jobs == 0:
+                time.sleep(settings.JOB_POLL_SECONDS)
@@ -0,0 +1,24 @@
+from django.conf import settings
+from django.core.management.base import BaseCommand
+import time
+
+from jobs import schedules
+
+
+class Command(BaseCommand):
+    help = 'Invokes the Lambda functions of due schedules every tick until stopped. Several dispatchers can run at once.'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--once', action='store_true', help='Dispatch the schedules that are due and exit.')
+
+    def handle(self, *args, **options):
+        while True:
+            start = time.monotonic()
+            num_dispatched = schedules.dispatch_due_schedules(settings.SCHEDULER_MAX_DUE)
+            print(f'dispatched {num_dispatched} schedules')
+
+            # a full tick means more are due, dispatch them right away
+            if num_dispatched < settings.SCHEDULER_MAX_DUE:
+                if options['once']:
+                    break
+                time.sleep(max(settings.SCHEDULER_TICK_SECONDS - (time.monotonic() - start), 0))
@@ -0,0 +1,35 @@
+import caracal.common.models
+from django.db import migrations, models
+import uuid
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('jobs', '0001_initial'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='ScheduledJob',
+            fields=[
+                ('id', models.AutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('uid', models.UUIDField(default=uuid.uuid4, editable=False, unique=True)),
+                ('datetime_created', models.DateTimeField(default=caracal.common.models.get_utc_datetime_now)),
+                ('datetime_updated', models.DateTimeField(null=True)),
+                ('datetime_last_run', models.DateTimeField(null=True)),
+                ('name', models.CharField(max_length=200, unique=True)),
+                ('function_name', models.CharField(max_length=200)),
+                ('input', models.TextField(default='{}')),
+                ('rate_minutes', models.IntegerField()),
+                ('next_run', models.DateTimeField(default=caracal.common.models.get_utc_datetime_now)),
+            ],
+            options={
+                'ordering': ['-datetime_created'],
+            },
+        ),
+        migrations.AddIndex(
+            model_name='scheduledjob',
+            index=models.Index(fields=['next_run'], name='scheduled_job_next_run_idx'),
+        ),
+    ]
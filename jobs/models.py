@@ -0,0 +1,72 @@
+from django.db import models
+from django.db.models import Q
+import uuid
+
+from account.models import Organization
+from caracal.common.models import get_utc_datetime_now
+
+
+JOB_STATUSES = (
+    ('pending', 'pending'),
+    ('running', 'running'),
+    ('succeeded', 'succeeded'),
+    ('failed', 'failed'),
+)
+
+
+class Job(models.Model):
+    "Background work run by the run_jobs command, see jobs.queue."
+
+    uid = models.UUIDField(unique=True, editable=False, default=uuid.uuid4)
+    datetime_created = models.DateTimeField(default=get_utc_datetime_now)
+    datetime_started = models.DateTimeField(null=True)
+    datetime_finished = models.DateTimeField(null=True)
+
+    organization = models.ForeignKey(Organization, on_delete=models.CASCADE, related_name='jobs', null=True)
+
+    name = models.CharField(max_length=100) # registered handler
+    payload = models.TextField(default='{}') # json encoded kwargs of the handler
+    idempotency_key = models.CharField(max_length=200, null=True) # only one pending job per key
+
+    status = models.CharField(choices=JOB_STATUSES, max_length=20, default='pending')
+    attempts = models.IntegerField(default=0)
+    max_attempts = models.IntegerField(default=5)
+    run_after = models.DateTimeField(default=get_utc_datetime_now)
+    last_error = models.TextField(null=True)
+
+    class Meta:
+        ordering = ['-datetime_created']
+        indexes = [
+            models.Index(fields=['status', 'run_after'], name='job_status_run_after_idx'),
+        ]
+        constraints = [
+            models.UniqueConstraint(fields=['idempotency_key'], condition=Q(status='pending'),
+                                    name='job_pending_idempotency_key'),
+        ]
+
+    def __str__(self):
+        return f'{self.name} - {self.status}'
+
+
+class ScheduledJob(models.Model):
+    "A Lambda function run every rate_minutes by the run_scheduler command, see jobs.schedules."
+
+    uid = models.UUIDField(unique=True, editable=False, default=uuid.uuid4)
+    datetime_created = models.DateTimeField(default=get_utc_datetime_now)
+    datetime_updated = models.DateTimeField(null=True)
+    datetime_last_run = models.DateTimeField(null=True)
+
+    name = models.CharField(max_length=200, unique=True) # same as the EventBridge rule name it replaces
+    function_name = models.CharField(max_length=200)
+    input = models.TextField(default='{}') # json encoded Lambda input
+    rate_minutes = models.IntegerField()
+    next_run = models.DateTimeField(default=get_utc_datetime_now)
+
+    class Meta:
+        ordering = ['-datetime_created']
+        indexes = [
+            models.Index(fields=['next_run'], name='scheduled_job_next_run_idx'),
+        ]
+
+    def __str__(self):
+        return f'{self.name} - {self.rate_minutes} minutes'
@@ -0,0 +1,119 @@
+from datetime import timedelta
+from django.conf import settings
+from django.db import IntegrityError, transaction
+from django.db.models import Q
+import json
+import sentry_sdk
+import traceback
+
+from caracal.common.models import get_utc_datetime_now
+from jobs.models import Job
+
+
+HANDLERS = dict()
+
+
+def register(name):
+    "Registers a job handler. Handlers get the payload as kwargs and raise to be retried, so they must be idempotent."
+
+    def decorator(fn):
+        HANDLERS[name] = fn
+        return fn
+
+    return decorator
+
+
+def enqueue(name, payload, organization=None, idempotency_key=None, delay_seconds=0):
+    "Adds a job, or returns the pending job with the same idempotency key."
+
+    assert name in HANDLERS, f'no handler registered for {name}'
+
+    if idempotency_key is not None:
+        job = Job.objects.filter(idempotency_key=idempotency_key, status='pending').first()
+        if job is not None:
+            return job
+
+    try:
+        with transaction.atomic():
+            return Job.objects.create(
+                name=name, payload=json.dumps(payload), organization=organization,
+                idempotency_key=idempotency_key, max_attempts=settings.JOB_MAX_ATTEMPTS,
+                run_after=get_utc_datetime_now() + timedelta(seconds=delay_seconds)
+            )
+    except IntegrityError: # enqueued by a concurrent request
+        return Job.objects.get(idempotency_key=idempotency_key, status='pending')
+
+
+def claim_jobs(limit):
+    """
+    Marks up to limit due jobs as running and returns them. Jobs locked by other workers are skipped and jobs left
+    running past JOB_TIMEOUT_SECONDS by a dead or hung worker are claimed again, or failed if they have no
+    attempts left.
+    """
+
+    now = get_utc_datetime_now()
+    timed_out = now - timedelta(seconds=settings.JOB_TIMEOUT_SECONDS)
+
+    with transaction.atomic():
+        jobs = list(Job.objects.select_for_update(skip_locked=True).filter(
+            Q(status='pending', run_after__lte=now) |
+            Q(status='running', datetime_started__lt=timed_out)
+        ).order_by('run_after')[:limit])
+
+        claimed = list()
+        for job in jobs:
+            if job.status == 'running' and job.attempts >= job.max_attempts:
+                job.status = 'failed'
+                job.datetime_finished = now
+                job.last_error = f'timed out after {settings.JOB_TIMEOUT_SECONDS} seconds on the last attempt'
+                job.save(update_fields=['status', 'datetime_finished', 'last_error'])
+                print(f'{job.name} {job.uid}: failed after {job.attempts} attempts')
+                continue
+
+            job.status = 'running'
+            job.attempts += 1
+            job.datetime_started = now
+            job.save(update_fields=['status', 'attempts', 'datetime_started'])
+            claimed.append(job)
+
+    return claimed
+
+
+def run_job(job):
+    "Runs a claimed job and records the result, rescheduling it with backoff if it fails and has attempts left."
+
+    try:
+        HANDLERS[job.name](**json.loads(job.payload))
+    except Exception as e:
+        sentry_sdk.capture_exception(e)
+        job.last_error = traceback.format_exc()[-5000:]
+
+        if job.attempts < job.max_attempts:
+            job.status = 'pending'
+            job.run_after = get_utc_datetime_now() + \
+                timedelta(seconds=settings.JOB_RETRY_BACKOFF_SECONDS * 2 ** (job.attempts - 1))
+        else:
+            job.status = 'failed'
+            job.datetime_finished = get_utc_datetime_now()
+    else:
+        job.status = 'succeeded'
+        job.datetime_finished = get_utc_datetime_now()
+
+    try:
+        job.save(update_fields=['status', 'run_after', 'last_error', 'datetime_finished'])
+    except IntegrityError: # a newer pending job with the same key replaces the retry
+        Job.objects.filter(pk=job.pk).update(status='failed', datetime_finished=get_utc_datetime_now(),
+                                            last_error=job.last_error)
+
+    return job.status
+
+
+def run_pending_jobs(limit):
+    "Claims and runs up to limit jobs, returns the number run."
+
+    jobs = claim_jobs(limit)
+    for job in jobs:
+        status = run_job(job)
+        print(f'{job.name} {job.uid}: {status} after {job.attempts} attempts')
+
+    return len(jobs)
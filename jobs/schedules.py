@@ -0,0 +1,116 @@
+from botocore.exceptions import BotoCoreError, ClientError
+from collections import defaultdict
+from concurrent.futures import ThreadPoolExecutor
+from datetime import timedelta
+from django.conf import settings
+from django.db import transaction
+import json
+import random
+import sentry_sdk
+
+from caracal.common.aws_utils import cloudwatch, get_boto_client, _lambda
+from caracal.common.models import get_utc_datetime_now
+from jobs.models import ScheduledJob
+
+
+def schedule_lambda_function(fn_arn, fn_name, rule_input, rule_name, rate_minutes):
+    """
+    Runs the function with the input every rate_minutes. With the eventbridge backend this creates a rule per
+    schedule, with the dispatcher backend it is a ScheduledJob row run by the run_scheduler command.
+    """
+
+    if settings.SCHEDULER_BACKEND == 'eventbridge':
+        _lambda.schedule_lambda_function(fn_arn, fn_name, rule_input, rule_name, rate_minutes)
+        return
+
+    # the first run is spread over the period so schedules created together do not fall due on the same tick
+    now = get_utc_datetime_now()
+    ScheduledJob.objects.update_or_create(name=rule_name, defaults={
+        'datetime_updated': now,
+        'function_name': fn_name,
+        'input': json.dumps(rule_input),
+        'rate_minutes': rate_minutes,
+        'next_run': now + timedelta(minutes=rate_minutes * random.random())
+    })
+
+
+def schedule_lambda_functions(schedules):
+    "Schedules are dicts of schedule_lambda_function's kwargs, either all of them are created or none are."
+
+    if settings.SCHEDULER_BACKEND == 'eventbridge':
+        _lambda.schedule_lambda_functions(schedules)
+        return
+
+    with transaction.atomic():
+        for kwargs in schedules:
+            schedule_lambda_function(**kwargs)
+
+
+def delete_schedule(rule_name):
+    "Deletes a schedule created with either backend."
+
+    if rule_name is None:
+        return
+
+    num_deleted, _ = ScheduledJob.objects.filter(name=rule_name).delete()
+    if num_deleted == 0: # scheduled on EventBridge, possibly before the backend was switched
+        cloudwatch.delete_cloudwatch_rule(rule_name)
+
+
+def dispatch_due_schedules(limit):
+    """
+    Claims up to limit due schedules and invokes their functions asynchronously, SCHEDULER_BATCH_SIZE inputs per
+    invocation as {"batch": [input, ...]}. Schedules locked by another dispatcher are skipped. Returns the
+    number of schedules dispatched.
+    """
+
+    now = get_utc_datetime_now()
+
+    with transaction.atomic():
+        scheduled_jobs = list(ScheduledJob.objects.select_for_update(skip_locked=True)
+                              .filter(next_run__lte=now).order_by('next_run')[:limit])
+
+        for scheduled_job in scheduled_jobs:
+            # missed runs are skipped rather than caught up, the schedule keeps its phase
+            rate = timedelta(minutes=scheduled_job.rate_minutes)
+            scheduled_job.next_run += ((now - scheduled_job.next_run) // rate + 1) * rate
+            scheduled_job.datetime_last_run = now
+
+        ScheduledJob.objects.bulk_update(scheduled_jobs, ['next_run', 'datetime_last_run'])
+
+    scheduled_jobs_by_function = defaultdict(list)
+    for scheduled_job in scheduled_jobs:
+        scheduled_jobs_by_function[scheduled_job.function_name].append(scheduled_job)
+
+    batches = list()
+    for function_name, function_jobs in scheduled_jobs_by_function.items():
+        for i in range(0, len(function_jobs), settings.SCHEDULER_BATCH_SIZE):
+            batches.append((function_name, function_jobs[i:i + settings.SCHEDULER_BATCH_SIZE]))
+
+    with ThreadPoolExecutor(max_workers=settings.SCHEDULER_MAX_WORKERS) as executor:
+        failed = [batch for batch, success in zip(batches, executor.map(lambda batch: _invoke_batch(*batch), batches))
+                  if not success]
+
+    # runs of batches that could not be invoked are retried on the next tick instead of being lost
+    failed_ids = [scheduled_job.pk for _, batch_jobs in failed for scheduled_job in batch_jobs]
+    if len(failed_ids) > 0:
+        ScheduledJob.objects.filter(pk__in=failed_ids)\
+            .update(next_run=now + timedelta(seconds=settings.SCHEDULER_TICK_SECONDS))
+
+    return len(scheduled_jobs)
+
+
+def _invoke_batch(function_name, scheduled_jobs):
+    inputs = [json.loads(scheduled_job.input) for scheduled_job in scheduled_jobs]
+    try:
+        get_boto_client('lambda').invoke(
+            FunctionName=function_name,
+            InvocationType='Event',
+            Payload=json.dumps({'batch': inputs}).encode('utf-8')
+        )
+    except (BotoCoreError, ClientError) as e:
+        print(f'{function_name}: could not invoke batch of {len(inputs)}: {e}')
+        sentry_sdk.capture_exception(e)
+        return False
+
+    return True
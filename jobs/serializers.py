@@ -0,0 +1,11 @@
+from rest_framework import serializers
+
+from jobs.models import Job
+
+
+class GetJobSerializer(serializers.ModelSerializer):
+
+    class Meta:
+        model = Job
+        fields = ['uid', 'datetime_created', 'datetime_started', 'datetime_finished',
+                  'name', 'status', 'attempts', 'max_attempts', 'run_after']
@@ -0,0 +1,7 @@
+from django.urls import path
+
+from jobs import views
+
+urlpatterns = [
+    path('get_job/<str:uid>', views.GetJobDetailView.as_view(), name='job-detail'),
+]
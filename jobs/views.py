@@ -0,0 +1,16 @@
+from rest_framework import generics, permissions
+
+from auth.backends import CognitoAuthentication
+from jobs import serializers
+from jobs.models import Job
+
+
+class GetJobDetailView(generics.RetrieveAPIView):
+
+    authentication_classes = [CognitoAuthentication]
+    lookup_field = 'uid'
+    permission_classes = [permissions.IsAuthenticated]
+    serializer_class = serializers.GetJobSerializer
+
+    def get_queryset(self):
+        return Job.objects.filter(organization=self.request.user.organization)
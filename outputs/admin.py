@@ -1,6 +1,6 @@
 from django.contrib import admin
 
-from outputs.models import AgolAccount, DataConnection, JackalAgolConnection
+from outputs.models import AgolAccount, AgolFeatureIndex, DataConnection, JackalAgolConnection, KmzIndexVersion
 
 
 @admin.register(AgolAccount)
@@ -13,6 +13,13 @@ class AgolAccountAdmin(admin.ModelAdmin):
                        'datetime_updated', 'feature_service_url', 'group_id']
 
 
+@admin.register(AgolFeatureIndex)
+class AgolFeatureIndexAdmin(admin.ModelAdmin):
+    list_display = ['connection', 'device_id', 'agol_layer_id', 'max_object_id', 'datetime_updated']
+    search_fields = ['device_id']
+    readonly_fields = ['object_id_ranges', 'max_object_id', 'datetime_updated']
+
+
 @admin.register(DataConnection)
 class DataConnectionAdmin(admin.ModelAdmin):
     list_display = ['uid', 'datetime_created', 'organization', 'custom_source', 'drive_account', 'realtime_account',
@@ -31,3 +38,8 @@ class JackalAgolConnectionAdmin(admin.ModelAdmin):
     ordering = ['-datetime_created']
     readonly_fields = ['datetime_created', 'datetime_deleted', 'datetime_updated']
 
+
+@admin.register(KmzIndexVersion)
+class KmzIndexVersionAdmin(admin.ModelAdmin):
+    list_display = ['short_name', 'version', 'datetime_updated']
+    search_fields = ['short_name']
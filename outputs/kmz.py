@@ -0,0 +1,83 @@
+from cachetools import TTLCache
+from django.conf import settings
+from django.db import IntegrityError, transaction
+import os
+import threading
+
+from caracal.common.aws_utils import dynamodb, s3
+from outputs.models import KmzIndexVersion
+
+
+class KmzHrefIndex:
+    """
+    In-process cache of an organization's KMZ hrefs by category, stamped with the organization's KmzIndexVersion.
+    Every read checks the shared version so a bump by any writer rebuilds the index in every process. The KML
+    Lambda functions do not bump it yet, so until they do the short ttl is what picks up their new files.
+    """
+
+    def __init__(self):
+        self._cache = TTLCache(maxsize=settings.KMZ_HREF_CACHE_MAX_SIZE, ttl=settings.KMZ_HREF_CACHE_TTL_SECONDS)
+        self._lock = threading.Lock()
+
+    def get(self, short_name):
+        "Returns {category: [href, ...]} for the organization, shared between requests so it must not be modified."
+
+        version = get_kmz_version(short_name)
+
+        with self._lock:
+            hrefs, cached_version = self._cache.get(short_name, (None, None))
+        if hrefs is not None and cached_version == version:
+            return hrefs
+
+        hrefs = _get_kmz_hrefs(short_name)
+        with self._lock:
+            self._cache[short_name] = (hrefs, version)
+
+        return hrefs
+
+    def clear(self):
+        with self._lock:
+            self._cache.clear()
+
+
+kmz_hrefs = KmzHrefIndex()
+
+
+def get_kmz_version(short_name):
+    "Returns the organization's KMZ version, creating the row so writers outside the API can bump it with an UPDATE."
+
+    version = KmzIndexVersion.objects.filter(short_name=short_name).values_list('version', flat=True).first()
+    if version is not None:
+        return version
+
+    try:
+        with transaction.atomic():
+            return KmzIndexVersion.objects.create(short_name=short_name).version
+    except IntegrityError: # created by a concurrent request
+        return KmzIndexVersion.objects.get(short_name=short_name).version
+
+
+def _get_kmz_hrefs(short_name):
+
+    # [{'p': 'cd13ed3c', 'u': 'admin', 'permissions': ['all']}]
+    # todo: returning all for now...
+    credentials = dynamodb.get_dynamodb_credentials(short_name)
+
+    hrefs = dict()
+    for object_key in s3.iter_object_keys(f'{short_name}/kmz', settings.S3_USER_DATA_BUCKET, suffix='.kmz'):
+
+        parts = os.path.split(object_key)[0].split('/')[2:]
+        category = ' / '.join(parts)
+
+        if len(parts) == 0:
+            category = 'other'
+
+        if category not in hrefs.keys():
+            hrefs[category] = list()
+
+        base_href = f'https://users.caracal.cloud/{object_key}'
+        for creds in credentials:
+            href = f'{base_href}?u={creds["u"]}&p={creds["p"]}'
+            hrefs[category].append(href)
+
+    return hrefs
@@ -0,0 +1,27 @@
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('outputs', '0019_auto_20200219_1219'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='AgolFeatureIndex',
+            fields=[
+                ('id', models.AutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('device_id', models.CharField(max_length=100)),
+                ('agol_layer_id', models.CharField(max_length=100, null=True)),
+                ('object_id_ranges', models.TextField(default='[]')),
+                ('max_object_id', models.IntegerField(default=0)),
+                ('datetime_updated', models.DateTimeField(null=True)),
+                ('connection', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='agol_feature_indexes', to='outputs.DataConnection')),
+            ],
+            options={
+                'unique_together': {('connection', 'device_id')},
+            },
+        ),
+    ]
@@ -0,0 +1,20 @@
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('outputs', '0020_agolfeatureindex'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='KmzIndexVersion',
+            fields=[
+                ('id', models.AutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('short_name', models.CharField(max_length=50, unique=True)),
+                ('version', models.IntegerField(default=0)),
+                ('datetime_updated', models.DateTimeField(null=True)),
+            ],
+        ),
+    ]
@@ -1,4 +1,5 @@
 from django.db import models
+import json
 
 from account.models import Account, Organization
 from caracal.common import constants
@@ -22,6 +23,41 @@ class AgolAccount(BaseAsset):
     username = models.CharField(max_length=200, blank=True, null=True)
 
 
+class AgolFeatureIndex(models.Model):
+    "The OBJECTIDs of a device's features in a connection's AGOL layer, stored as ranges."
+
+    connection = models.ForeignKey('DataConnection', on_delete=models.CASCADE, related_name='agol_feature_indexes')
+    device_id = models.CharField(max_length=100)
+    agol_layer_id = models.CharField(max_length=100, null=True) # the connection's layer when indexed
+
+    object_id_ranges = models.TextField(default='[]') # json encoded list of inclusive [start, end]
+    max_object_id = models.IntegerField(default=0) # features above this have not been indexed yet
+    datetime_updated = models.DateTimeField(null=True)
+
+    class Meta:
+        unique_together = ['connection', 'device_id']
+
+    def add_object_ids(self, object_ids):
+        ranges = json.loads(self.object_id_ranges) + [[object_id, object_id] for object_id in object_ids]
+        self.object_id_ranges = json.dumps(_merge_ranges(ranges))
+        self.max_object_id = max([self.max_object_id] + list(object_ids))
+
+    def get_object_ids(self):
+        return [object_id for start, end in json.loads(self.object_id_ranges) for object_id in range(start, end + 1)]
+
+    def remove_object_ids(self, object_ids):
+        object_ids = set(object_ids)
+        ranges = [[object_id, object_id] for object_id in self.get_object_ids() if object_id not in object_ids]
+        self.object_id_ranges = json.dumps(_merge_ranges(ranges))
+
+    def reset(self, agol_layer_id):
+        "Starts over for a new layer, OBJECTIDs of the previous one mean nothing in it."
+        self.agol_layer_id = agol_layer_id
+        self.object_id_ranges = '[]'
+        self.max_object_id = 0
+        self.save()
+
+
 class DataConnection(BaseAsset):
 
     organization = models.ForeignKey(Organization, on_delete=models.CASCADE, related_name='connections')
@@ -76,6 +112,21 @@ class JackalAgolConnection(BaseAsset):
 
 
 
+class KmzIndexVersion(models.Model):
+    """
+    Bumped whenever KMZ files under an organization's S3 prefix change so every process rebuilds its cached
+    href index, see outputs.kmz. The KML Lambda functions bump it after writing with
+    UPDATE outputs_kmzindexversion SET version = version + 1 WHERE short_name = ...
+    """
+
+    short_name = models.CharField(max_length=50, unique=True) # organization short_name, the S3 prefix
+    version = models.IntegerField(default=0)
+    datetime_updated = models.DateTimeField(null=True)
+
+    def __str__(self):
+        return f'{self.short_name} - {self.version}'
+
+
 class RealtimeAlert(BaseAsset):
 
     organization = models.ForeignKey(Organization, on_delete=models.CASCADE)
@@ -93,3 +144,12 @@ class RealtimeAlert(BaseAsset):
     immobility_wait_min = models.IntegerField(null=True) # time to wait for an immobile individual before sending alert
     immobility_distance_m = models.IntegerField(null=True) # distance threshold individual must pass in wait min to not send alert
 
+
+def _merge_ranges(ranges):
+    merged = list()
+    for start, end in sorted(ranges):
+        if merged and start <= merged[-1][1] + 1:
+            merged[-1][1] = max(merged[-1][1], end)
+        else:
+            merged.append([start, end])
+    return merged
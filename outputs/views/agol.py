@@ -4,7 +4,6 @@ from django.shortcuts import redirect
 from django.urls import reverse
 import json
 import os
-import requests
 from rest_framework import permissions, status, generics, views
 from rest_framework.response import Response
 import sentry_sdk
@@ -13,8 +12,8 @@ from urllib.parse import urlencode
 
 from account.models import Account
 from auth.backends import CognitoAuthentication
-from caracal.common import agol
-from caracal.common.aws_utils import cloudwatch
+from caracal.common import agol, http
+from jobs import schedules
 from outputs import serializers
 from outputs.models import AgolAccount
 
@@ -38,17 +37,12 @@ class DisconnectAgolView(views.APIView):
         else:
             connections = agol_account.connections.all()
             for connection in connections:
-                cloudwatch.delete_cloudwatch_rule(connection.cloudwatch_update_rule_name)
+                schedules.delete_schedule(connection.cloudwatch_update_rule_name)
 
             now = datetime.utcnow().replace(tzinfo=timezone.utc)
             title = f'Caracal (Disconnected - {str(now).split(".")[0]})'
 
-            arcgis = saw.ArcgisAPI(
-                access_token=agol_account.oauth_access_token,   
-                refresh_token=agol_account.oauth_refresh_token, 
-                username=agol_account.username,           
-                client_id=settings.AGOL_CLIENT_ID
-            )
+            arcgis = agol.agol_clients.get(agol_account)
 
             try:
                 arcgis.services.update_feature_service(agol_account.feature_service_id, title=title)
@@ -56,10 +50,11 @@ class DisconnectAgolView(views.APIView):
                 print(str(e)) # likely agol account exists in db but no service in agol
 
             connections.delete()
+            agol.agol_clients.invalidate(agol_account.pk)
             agol_account.delete()
 
         user.agol_account = None
-        user.save()
+        user.save(update_fields=['agol_account'])
 
         return Response(status=status.HTTP_200_OK)
 
@@ -174,7 +169,7 @@ class AgolOauthResponseView(views.APIView):
             'grant_type': 'authorization_code'
         }
 
-        res = requests.post(token_url, data=data)
+        res = http.post(token_url, data=data)
         tokens = res.json()
 
         # access token occasionaly missing?
@@ -214,13 +209,8 @@ class AgolOauthResponseView(views.APIView):
                                                         username=username)
 
         # create a feature service in AGOL, update name if changed
-        arcgis = saw.ArcgisAPI(
-            access_token=access_token,   
-            refresh_token=refresh_token, 
-            username=username,           
-            client_id=settings.AGOL_CLIENT_ID
-        )
-        
+        arcgis = agol.agol_clients.get(agol_account)
+
         try:
             # get feature service and update agol_account
             service = agol.get_or_create_caracal_feature_service(agol_account)
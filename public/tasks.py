@@ -1,21 +1,17 @@
 
-import boto3, botocore
 from datetime import datetime
 from django.conf import settings
 import sentry_sdk
 import traceback
 
+from caracal.common.aws_utils import get_boto_client
+
 
 import time
 
 def send_email(subject, message, sender, recipients):
 
-    kwargs = {
-        'aws_access_key_id': settings.AWS_ACCESS_KEY_ID,
-        'aws_secret_access_key': settings.AWS_SECRET_ACCESS_KEY,
-        'region_name': settings.AWS_REGION
-    }
-    client = boto3.client('ses', **kwargs)
+    client = get_boto_client('ses')
 
     message = {
         'Body': {
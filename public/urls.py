@@ -3,6 +3,7 @@ from django.urls import include, path
 from public import views
 
 urlpatterns = [
+    path('client_metrics/', views.ClientMetricsView.as_view()),
     path('contact/', views.ContactView.as_view()),
     path('species_subtypes/', views.SpeciesSubtypesView.as_view())
 ]
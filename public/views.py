@@ -1,14 +1,27 @@
 from django.conf import settings
+from django.utils.http import parse_etags
 
 from rest_framework import permissions, status, generics, views
 from rest_framework.response import Response
 from rest_framework.throttling import AnonRateThrottle
 
-from caracal.common.aws_utils import dynamodb
+from auth.backends import CognitoAuthentication
+from caracal.common.global_config import global_config
+from caracal.common.metrics import metrics
 
 from public import serializers, tasks
 
 
+class ClientMetricsView(views.APIView):
+    "Call counts and latencies of the outbound clients in the process that serves the request."
+
+    authentication_classes = [CognitoAuthentication]
+    permission_classes = [permissions.IsAdminUser]
+
+    def get(self, request):
+        return Response(status=status.HTTP_200_OK, data=metrics.get_snapshot())
+
+
 class ContactView(generics.GenericAPIView):
 
     authentication_classes = []
@@ -41,8 +54,18 @@ class SpeciesSubtypesView(views.APIView):
     permission_classes = [permissions.AllowAny]
 
     def get(self, request):
-        global_config = dynamodb.get_global_config()
-        species_subtypes = global_config['SPECIES_SUBTYPES']
-        return Response(status=status.HTTP_200_OK, data=species_subtypes)
+        config, version = global_config.get_versioned()
+        etag = f'"{version}"'
+
+        headers = {
+            'Cache-Control': f'public, max-age={settings.GLOBAL_CONFIG_BROWSER_MAX_AGE_SECONDS}',
+            'ETag': etag
+        }
+
+        etags = parse_etags(request.META.get('HTTP_IF_NONE_MATCH', ''))
+        if etag in etags or '*' in etags:
+            return Response(status=status.HTTP_304_NOT_MODIFIED, headers=headers)
+
+        return Response(status=status.HTTP_200_OK, data=config['SPECIES_SUBTYPES'], headers=headers)
 
 
@@ -1,9 +1,10 @@
 
+from datetime import timedelta
 import json
 from rest_framework import serializers
 
-from caracal.common import connections, constants
-from caracal.common.models import RealTimeAccount, RealTimeIndividual, RealTimePosition
+from caracal.common import connections, constants, gis
+from caracal.common.models import get_utc_datetime_now, RealTimeAccount, RealTimeIndividual, RealTimePosition
 
 
 class AddAccountSerializer(serializers.Serializer):
@@ -69,17 +70,22 @@ class GetRadioIndividualsSerializer(serializers.HyperlinkedModelSerializer):
     class Meta:
         model = RealTimeIndividual
         fields = ['url', 'uid', 'datetime_created', 'datetime_updated',
-                  'status', 'name', 'sex', 'subtype', 'blood_type', 'call_sign',
-                  'phone_number']
+                  'datetime_deleted', 'is_active', 'status', 'name', 'sex', 'subtype',
+                  'blood_type', 'call_sign', 'phone_number']
 
 
 class GetRadioIndividualDetailSerializer(serializers.ModelSerializer):
 
+    path_day = serializers.SerializerMethodField()
+    def get_path_day(self, individual):
+        then = get_utc_datetime_now() - timedelta(hours=24)
+        return gis.get_queryset_path_metrics(individual.rt_positions.filter(datetime_recorded__gte=then))
+
     class Meta:
         model = RealTimeIndividual
         fields = ['url', 'uid', 'datetime_created', 'datetime_updated',
                   'status', 'name', 'subtype', 'sex', 'phone_number',
-                  'blood_type', 'call_sign']
+                  'blood_type', 'call_sign', 'path_day']
 
 
 class UpdateRadioIndividualSerializer(serializers.Serializer):
@@ -9,6 +9,7 @@ from auth.backends import CognitoAuthentication
 from caracal.common import agol, connections
 from caracal.common.decorators import check_agol_account_connected, check_source_limit
 from caracal.common.models import get_num_sources, RealTimeAccount, RealTimeIndividual
+from caracal.common.pagination import ChangesKeysetPagination
 import caracal.common.serializers as common_serializers
 from outputs.models import AgolAccount
 from radios import serializers as radios_serializers
@@ -134,6 +135,7 @@ class GetRadioIndividualsView(generics.ListAPIView):
 
     authentication_classes = [CognitoAuthentication]
     permission_classes = [permissions.IsAuthenticated]
+    pagination_class = ChangesKeysetPagination
     serializer_class = radios_serializers.GetRadioIndividualsSerializer
 
     def get_queryset(self):
@@ -150,7 +152,12 @@ class GetRadioIndividualsView(generics.ListAPIView):
         except RealTimeAccount.DoesNotExist:
             return RealTimeIndividual.objects.none()
 
-        return RealTimeIndividual.objects.filter(is_active=True, account=account)
+        # changes include deactivated individuals as tombstones
+        individuals = RealTimeIndividual.objects.filter(account=account)
+        if not ChangesKeysetPagination.is_changes_request(self.request):
+            individuals = individuals.filter(is_active=True)
+
+        return individuals
 
 
 class GetRadioIndividualDetailView(generics.RetrieveAPIView):